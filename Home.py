@@ -1,8 +1,17 @@
 import streamlit as st
 from utility import check_password 
+from logics.llm import warm_up_in_background
+from logics.metrics import start_metrics_server
+from logics.config import API_URL
 
 st.set_page_config(page_title="TravelPal", page_icon="🌍", layout="wide")
 
+# Build the agent in the background while the user is on the password screen
+# (unless the API service at TRAVELPAL_API_URL answers the questions)
+if not API_URL:
+    warm_up_in_background()
+start_metrics_server()
+
 # Check if the password is correct.  
 if not check_password():  
     st.stop()
@@ -0,0 +1,185 @@
+# -----------------------------
+# Vector Index Benchmark
+# -----------------------------
+# Compares FAISS index layouts on the TravelPal corpus: recall@k against
+# exact (Flat) search, single-query latency and serialized index size, at
+# a few settings of the search-time knob (nprobe for IVF, efSearch for HNSW).
+#
+# Usage:
+#   python -m benchmarks.index_bench [--backend hashing] [--stub]
+#   python -m benchmarks.index_bench --specs "Flat;HNSW32;IVF64,PQ32;PCA256,HNSW32" --scale 100000
+#
+# The corpus is every source the ingestion pipeline reads. --scale pads it
+# with noisy copies of the real vectors to project behaviour at a larger
+# corpus; those rows are synthetic and are labelled as such in the results.
+# Layouts are separated with ";" because factory strings contain commas.
+import os, sys, json, time, argparse, tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.replay import ROOT, RESULTS_DIR, WORKLOAD_PATH, load_workload, percentile, git_commit, point_at_stub
+
+NPROBES = [1, 4, 16, 64]
+EF_SEARCHES = [16, 64, 256]
+
+
+def default_specs(n: int, dimension: int):
+    """Flat, HNSW, IVF and IVF-PQ sized for `n` vectors, plus a PCA variant."""
+    nlist = max(1, min(int(4 * n ** 0.5), n // 39))  # FAISS wants ~39 training points per list
+    pq = next(m for m in (dimension // 16, dimension // 8, dimension // 4, 1) if m and dimension % m == 0)
+    return ["Flat", "HNSW32", f"IVF{nlist},Flat", f"IVF{nlist},PQ{pq}", f"PCA{dimension // 4},HNSW32"]
+
+
+def corpus_texts():
+    from logics.ingest import travelpal_sources, parse, clean, chunk
+    return [doc.page_content for doc in chunk(clean(parse(travelpal_sources())))]
+
+
+def embed(embeddings, texts, batch_size: int = 64):
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[i:i + batch_size]))
+    return np.asarray(vectors, dtype="float32")
+
+
+def pad_corpus(vectors, scale: int, noise: float = 0.2, seed: int = 0):
+    """Appends copies of the real vectors, each moved by ~`noise` (L2), until there are `scale` rows."""
+    if scale <= len(vectors):
+        return vectors
+    rng = np.random.default_rng(seed)
+    extra = vectors[rng.integers(0, len(vectors), scale - len(vectors))]
+    extra = extra + rng.normal(0, noise / np.sqrt(vectors.shape[1]), extra.shape).astype("float32")
+    extra /= np.linalg.norm(extra, axis=1, keepdims=True)
+    return np.vstack([vectors, extra.astype("float32")])
+
+
+def search_params(spec: str):
+    if "IVF" in spec:
+        return [{"nprobe": p} for p in NPROBES]
+    if "HNSW" in spec:
+        return [{"ef_search": ef} for ef in EF_SEARCHES]
+    return [{}]
+
+
+def bench_spec(spec: str, vectors, queries, truth, k: int, train_size: int) -> list:
+    import faiss
+    from logics.index_store import make_index, tune_index
+
+    index = make_index(vectors.shape[1], spec)
+    ids = np.arange(len(vectors), dtype="int64")
+    started = time.perf_counter()
+    if not index.is_trained:
+        try:
+            index.train(vectors[:train_size])
+        except RuntimeError as e:
+            return [{"spec": spec, "skipped": f"too few vectors to train ({len(vectors)}): {str(e).splitlines()[0][:80]}"}]
+    train_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index.add_with_ids(vectors, ids)
+    add_seconds = time.perf_counter() - started
+    size_mb = len(faiss.serialize_index(index)) / (1024 * 1024)
+
+    rows = []
+    for params in search_params(spec):
+        tune_index(index, **params)
+        latencies, hits = [], 0
+        for query, kth in zip(queries, truth):
+            started = time.perf_counter()
+            _, found = index.search(query[None, :], k)
+            latencies.append(time.perf_counter() - started)
+            # A hit is any result at least as close as the exact k-th neighbour, measured
+            # exactly (PQ distances are approximate), so ties between duplicates aren't misses
+            found = found[0][found[0] != -1]
+            exact = ((vectors[found] - query) ** 2).sum(axis=1)
+            hits += int((exact <= kth * (1 + 1e-5) + 1e-6).sum())
+        rows.append({
+            "spec": spec,
+            "params": params,
+            "recall_at_k": hits / (k * len(queries)),
+            "p50_us": percentile(latencies, 50) * 1e6,
+            "p95_us": percentile(latencies, 95) * 1e6,
+            "size_mb": size_mb,
+            "bytes_per_vector": size_mb * 1024 * 1024 / len(vectors),
+            "train_seconds": train_seconds,
+            "add_seconds": add_seconds,
+        })
+    return rows
+
+
+def print_report(results: dict):
+    c = results["corpus"]
+    print(f"\n{c['vectors']} vectors ({c['real']} real, {c['vectors'] - c['real']} synthetic), "
+          f"dim {c['dimension']}, {c['queries']} queries, recall@{results['config']['k']} vs Flat")
+    print(f"{'layout':<22} {'params':<14} {'recall':>7} {'p50 us':>9} {'p95 us':>9} {'MB':>8} {'B/vec':>7} {'build s':>8}")
+    for r in results["rows"]:
+        if "skipped" in r:
+            print(f"{r['spec']:<22} skipped: {r['skipped']}")
+            continue
+        params = ",".join(f"{k}={v}" for k, v in r["params"].items()) or "-"
+        print(f"{r['spec']:<22} {params:<14} {r['recall_at_k']:>7.3f} {r['p50_us']:>9.1f} {r['p95_us']:>9.1f} "
+              f"{r['size_mb']:>8.2f} {r['bytes_per_vector']:>7.0f} {r['train_seconds'] + r['add_seconds']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FAISS index layouts on the TravelPal corpus.")
+    parser.add_argument("--specs", help='";"-separated faiss.index_factory strings (default: sized to the corpus)')
+    parser.add_argument("--backend", help="Embedding backend (default: TRAVELPAL_EMBEDDING_BACKEND)")
+    parser.add_argument("--stub", action="store_true", help="Embed with the local OpenAI stand-in server")
+    parser.add_argument("--scale", type=int, default=0, help="Pad the corpus with synthetic vectors up to this many")
+    parser.add_argument("--queries", type=int, default=200, help="Chunk texts sampled as extra queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--train-size", type=int, default=20000)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/index-<commit>.json)")
+    args = parser.parse_args()
+
+    # Settings are read when logics is imported, so configure the environment first
+    if args.backend:
+        os.environ["TRAVELPAL_EMBEDDING_BACKEND"] = args.backend
+    if args.stub:
+        from benchmarks.stub_servers import start_stub_server
+        server, _, base_url = start_stub_server({})
+        point_at_stub(base_url, tempfile.mkdtemp(prefix="travelpal-index-bench-"))
+
+    import faiss
+    from logics.llm import get_embeddings
+
+    embeddings = get_embeddings()
+    texts = corpus_texts()
+    rng = np.random.default_rng(0)
+    sampled = [texts[i] for i in rng.choice(len(texts), min(args.queries, len(texts)), replace=False)]
+    questions = [item["question"] for item in load_workload(WORKLOAD_PATH) if item["target"] == "travelpal"]
+    real = embed(embeddings, texts)
+    queries = embed(embeddings, questions + sampled)
+    vectors = pad_corpus(real, args.scale)
+    k = min(args.k, len(vectors))
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    truth = exact.search(queries, k)[0][:, -1]  # Exact k-th nearest distance per query
+
+    specs = args.specs.split(";") if args.specs else default_specs(len(vectors), vectors.shape[1])
+    rows = []
+    for spec in specs:
+        rows.extend(bench_spec(spec.strip(), vectors, queries, truth, k, args.train_size))
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {"k": k, "backend": embeddings.model_name, "python": sys.version.split()[0], "faiss": faiss.__version__},
+        "corpus": {"vectors": len(vectors), "real": len(real), "dimension": vectors.shape[1], "queries": len(queries)},
+        "rows": rows,
+    }
+    if args.stub:
+        server.shutdown()
+
+    print_report(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"index-{results['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwrote {os.path.relpath(output, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# -----------------------------
+# Offline Replay Benchmark
+# -----------------------------
+# Replays a workload of questions through the TravelPal tools and the full
+# agent against local stand-in servers (see stub_servers.py), so nothing
+# leaves the machine and runs are comparable between commits.
+#
+# Usage:
+#   python -m benchmarks.replay [--concurrency 4] [--repeat 2] [--llm-latency 0.3]
+#   python -m benchmarks.replay --compare benchmarks/results/<sha>.json
+#
+# For each target (travelpal, mfa, weather, agent) it reports p50/p95/p99
+# latency, throughput at N concurrent sessions, and upstream calls and
+# tokens per question (counted by the stand-in servers). RAG questions also
+# report context tokens retrieved vs. packed into the prompt, and questions
+# with "expect" phrases report how many answers contain one of them (with
+# the stand-in LLM, which answers from the first context sentence, this
+# shows whether packing leads with the right material). Results are written
+# to benchmarks/results/<commit>.json.
+import os, sys, json, time, argparse, tempfile, subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.stub_servers import start_stub_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKLOAD_PATH = os.path.join(ROOT, "benchmarks", "workload.jsonl")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+TARGETS = ["travelpal", "mfa", "weather", "agent"]
+
+
+def load_workload(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "logics"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "unknown"
+    return f"{sha}-dirty" if sha and dirty else sha or "unknown"
+
+
+def point_at_stub(base_url: str, cache_dir: str):
+    """Must run before logics is imported: config is read at import time."""
+    os.environ["OPENAI_API_KEY"] = "sk-replay"
+    os.environ["OPENAI_API_BASE"] = f"{base_url}/v1"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ["TRAVELPAL_MFA_BASE_URL"] = base_url
+    os.environ["TRAVELPAL_GEOCODING_URL"] = f"{base_url}/v1/search"
+    os.environ["TRAVELPAL_CLIMATE_URL"] = f"{base_url}/v1/climate"
+    os.environ["TRAVELPAL_CACHE_DIR"] = cache_dir
+    os.environ["TRAVELPAL_CLIMATOLOGY_PATH"] = os.path.join(cache_dir, "climatology.json")
+    os.environ.setdefault("TRAVELPAL_SPACY_FALLBACK", "0")
+    # tiktoken's BPE file is downloaded on first use, which an offline run cannot do
+    os.environ.setdefault("TRAVELPAL_EMBEDDING_CTX_CHECK", "0")
+
+
+def diff_counts(before: dict, after: dict) -> dict:
+    calls = {k: v - before["calls"].get(k, 0) for k, v in after["calls"].items()}
+    tokens = {k: v - before["tokens"][k] for k, v in after["tokens"].items()}
+    return {"calls": {k: v for k, v in calls.items() if v}, "tokens": tokens}
+
+
+def context_tokens() -> dict:
+    from logics.metrics import CONTEXT_TOKENS
+    return {s.labels["kind"]: s.value for s in CONTEXT_TOKENS.collect()[0].samples if s.name.endswith("_total")}
+
+
+def answer_hit(item: dict, answer):
+    """True/False if the answer contains one of the item's expected phrases, None if it has none."""
+    if not item.get("expect"):
+        return None
+    return isinstance(answer, str) and any(phrase.lower() in answer.lower() for phrase in item["expect"])
+
+
+def run_target(func, items, concurrency: int, state) -> dict:
+    latencies, errors, hits = [], 0, []
+
+    def one(item):
+        started = time.perf_counter()
+        try:
+            answer = func(item["question"])
+            return time.perf_counter() - started, None, answer_hit(item, answer)
+        except Exception as e:
+            return time.perf_counter() - started, e, answer_hit(item, None)
+
+    before, context_before = state.snapshot(), context_tokens()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seconds, error, hit in pool.map(one, items):
+            latencies.append(seconds)
+            errors += error is not None
+            if hit is not None:
+                hits.append(hit)
+    wall = time.perf_counter() - started
+    used = diff_counts(before, state.snapshot())
+    context = {k: v - context_before.get(k, 0) for k, v in context_tokens().items()}
+
+    n = len(items)
+    return {
+        "questions": n,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_qps": n / wall if wall else None,
+        "calls_per_question": {k: v / n for k, v in used["calls"].items()},
+        "tokens_per_question": {k: v / n for k, v in used["tokens"].items()},
+        "context_tokens_per_question": {k: v / n for k, v in context.items() if v},
+        "answer_hit_rate": sum(hits) / len(hits) if hits else None,
+    }
+
+
+def print_report(results: dict):
+    print(f"\n{'target':<10} {'n':>4} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/s':>8}  calls/q  tokens/q")
+    for target, r in results["targets"].items():
+        calls = ", ".join(f"{k}={v:.2f}" for k, v in sorted(r["calls_per_question"].items())) or "-"
+        tokens = sum(r["tokens_per_question"].values())
+        print(f"{target:<10} {r['questions']:>4} {r['errors']:>4} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['throughput_qps']:>8.2f}  {calls}  {tokens:.0f}")
+        context = r.get("context_tokens_per_question")
+        if context:
+            retrieved, packed = context.get("retrieved", 0), context.get("packed", 0)
+            print(f"{'':<10} context tokens/q {retrieved:.0f} retrieved -> {packed:.0f} packed "
+                  f"({retrieved - packed:.0f} saved)")
+        if r.get("answer_hit_rate") is not None:
+            print(f"{'':<10} answers with an expected phrase: {r['answer_hit_rate']:.0%}")
+
+
+def print_comparison(results: dict, baseline: dict):
+    print(f"\nvs {baseline.get('commit', '?')} ({baseline.get('timestamp', '?')})")
+    for target, r in results["targets"].items():
+        old = baseline.get("targets", {}).get(target)
+        if not old:
+            continue
+        parts = []
+        for key in ("p50_ms", "p95_ms", "throughput_qps"):
+            if old.get(key):
+                parts.append(f"{key} {old[key]:.1f} -> {r[key]:.1f} ({(r[key] - old[key]) / old[key]:+.0%})")
+        old_tokens = sum(old["tokens_per_question"].values())
+        new_tokens = sum(r["tokens_per_question"].values())
+        parts.append(f"tokens/q {old_tokens:.0f} -> {new_tokens:.0f}")
+        if old.get("answer_hit_rate") is not None and r.get("answer_hit_rate") is not None:
+            parts.append(f"answer hits {old['answer_hit_rate']:.0%} -> {r['answer_hit_rate']:.0%}")
+        print(f"  {target:<10} " + "; ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a question workload against local stand-in servers.")
+    parser.add_argument("--workload", default=WORKLOAD_PATH)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated subset of " + ",".join(TARGETS))
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the workload this many times (later rounds hit warm caches)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds before the first chat token")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Seconds between streamed tokens")
+    parser.add_argument("--embed-latency", type=float, default=0.1)
+    parser.add_argument("--mfa-latency", type=float, default=0.2)
+    parser.add_argument("--meteo-latency", type=float, default=0.15)
+    parser.add_argument("--cache-dir", help="Reuse a cache directory (default: a fresh temporary one)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to print deltas against")
+    args = parser.parse_args()
+
+    latency = {
+        "llm": args.llm_latency, "token": args.token_latency, "embeddings": args.embed_latency,
+        "mfa": args.mfa_latency, "meteo": args.meteo_latency,
+    }
+    server, state, base_url = start_stub_server(latency)
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="travelpal-replay-")
+    point_at_stub(base_url, cache_dir)
+
+    started = time.perf_counter()
+    from logics import llm
+    llm.get_qa_chain()
+    llm.get_agent()
+    warm_up = {"seconds": time.perf_counter() - started, "upstream": state.snapshot()}
+
+    funcs = {
+        "travelpal": llm.travelpal_tool_func,
+        "mfa": llm.mfa_tool_func,
+        "weather": llm.weather_tool_func,
+        "agent": llm.run_agent,
+    }
+    workload = load_workload(args.workload)
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "concurrency": args.concurrency, "repeat": args.repeat, "latency": latency,
+            "workload": os.path.relpath(args.workload, ROOT), "python": sys.version.split()[0],
+        },
+        "warm_up": warm_up,
+        "startup_profile": llm.startup_profile(),
+        "targets": {},
+    }
+    for target in args.targets.split(","):
+        items = [item for item in workload if item["target"] == target] * args.repeat
+        if items:
+            results["targets"][target] = run_target(funcs[target], items, args.concurrency, state)
+    server.shutdown()
+
+    print_report(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
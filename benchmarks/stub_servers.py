@@ -0,0 +1,244 @@
+# -----------------------------
+# Local Stand-in Servers
+# -----------------------------
+# One threaded HTTP server that imitates the three upstreams TravelPal talks
+# to, with a configurable latency per service:
+#   - OpenAI:     POST /v1/chat/completions (incl. streaming), POST /v1/embeddings
+#   - MFA:        GET  /countries-regions/...  (travel pages with sections)
+#   - Open-Meteo: GET  /v1/search (geocoding), GET /v1/climate
+#     The geocoder only knows the countries, capitals and cities TravelPal
+#     lists, and like the real one returns no results for any other name.
+# The chat stub plays the ReAct protocol deterministically (pick a tool by
+# keyword, then answer with the observation) so the real agent can run
+# end-to-end. Every request is counted, along with approximate token usage.
+import re, json, math, time, base64, hashlib, threading
+from functools import lru_cache
+from array import array
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+EMBEDDING_DIM = 256
+
+MFA_PAGE = """<html><head><title>Travel Page - {country}</title></head><body>
+<h2>Travel Advisory</h2><p>Singaporeans travelling to {country} should exercise normal precautions.</p>
+<h2>Entry Requirements</h2><p>Check visa requirements before travel. Passports must be valid for six months.</p>
+<h3>Emergency Numbers</h3><p>Police: 112. Ambulance: 119.</p>
+<h2>Embassy of the Republic of Singapore</h2><p>Contact the Singapore mission in {country} for consular help.</p>
+</body></html>"""
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def stub_embedding(text: str):
+    """Hashed bag-of-words vector, so similar texts get similar embeddings."""
+    vec = [0.0] * EMBEDDING_DIM
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        h = int.from_bytes(hashlib.md5(word.encode()).digest()[:4], "little")
+        vec[h % EMBEDDING_DIM] += 1.0 if h & 1 else -1.0
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+@lru_cache(maxsize=1)
+def known_places() -> frozenset:
+    # Imported on first use: logics.config must not be read before
+    # point_at_stub has set the environment
+    from logics.country_resolver import CITIES
+    from logics.weather_cache import CAPITALS, city_key
+
+    names = [*CAPITALS, *CAPITALS.values(), *(city for cities in CITIES.values() for city in cities)]
+    return frozenset(city_key(name) for name in names)
+
+
+def is_known_place(name: str) -> bool:
+    from logics.weather_cache import city_key
+
+    return city_key(name) in known_places()
+
+
+def react_reply(prompt: str) -> str:
+    """Deterministic stand-in for the LLM turns TravelPal makes."""
+    if prompt.startswith("Answer the question ONLY"):
+        context = prompt.split("Context:", 1)[-1].strip()
+        first = re.split(r"(?<=[.!?])\s", context, maxsplit=1)[0]
+        return f"According to the official guidance: {first[:300]}"
+
+    if prompt.startswith("Rewrite the follow-up"):
+        # Name the place from the last earlier question, if the follow-up lacks one
+        follow_up = prompt.rsplit("Follow-up question:", 1)[1].split("\n", 1)[0].strip()
+        earlier = re.findall(r"^User: (.*)$", prompt, re.M)
+        places = re.findall(r"\b(?:in|to|for) ([A-Z][a-z]+(?: [A-Z][a-z]+)*)", earlier[-1]) if earlier else []
+        if places and not re.search(r"\b[A-Z][a-z]+\b", follow_up[1:]):
+            return f"{follow_up.rstrip('?')} in {places[-1]}?"
+        return follow_up
+
+    if "Question:" not in prompt:
+        return "Summary: the traveller asked about travel guidance."
+    # The format instructions also mention "Observation:", so only look at the
+    # scratchpad after the real question
+    question, _, scratchpad = prompt.rsplit("Question:", 1)[1].partition("\n")
+    question = question.strip()
+    if "Observation:" in scratchpad:
+        observation = scratchpad.rsplit("Observation:", 1)[1].split("\nThought:", 1)[0].strip()
+        return f"Thought: I now know the final answer.\nFinal Answer: {observation}"
+
+    lower = question.lower()
+    if re.search(r"weather|temperature|climate|hot|cold", lower):
+        tool = "Weather Helper"
+    elif re.search(r"advisory|visa|embassy|safe|emergency|entry", lower):
+        tool = "MFA Country Advisory Tool"
+    else:
+        tool = "TravelPal Singapore Policies"
+    return f"Thought: I should use {tool}.\nAction: {tool}\nAction Input: {question}"
+
+
+class StubState:
+    def __init__(self, latency: dict):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.tokens = {"prompt": 0, "completion": 0}
+
+    def count(self, service: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        with self.lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+            self.tokens["prompt"] += prompt_tokens
+            self.tokens["completion"] += completion_tokens
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"calls": dict(self.calls), "tokens": dict(self.tokens)}
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, body: dict, status: int = 200):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        # -----------------------------
+        # OpenAI
+        # -----------------------------
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            body = self._read_json()
+            if path.endswith("/embeddings"):
+                self._embeddings(body)
+            elif path.endswith("/chat/completions"):
+                self._chat(body)
+            else:
+                self._send_json({"error": "not found"}, 404)
+
+        def _embeddings(self, body):
+            time.sleep(state.latency.get("embeddings", 0))
+            inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            data = []
+            for i, text in enumerate(inputs):
+                vec = stub_embedding(text if isinstance(text, str) else " ".join(map(str, text)))
+                if body.get("encoding_format") == "base64":
+                    vec = base64.b64encode(array("f", vec).tobytes()).decode()
+                data.append({"object": "embedding", "index": i, "embedding": vec})
+            tokens = sum(approx_tokens(str(t)) for t in inputs)
+            state.count("embeddings", prompt_tokens=tokens)
+            self._send_json({
+                "object": "list", "data": data, "model": body.get("model", "stub"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+
+        def _chat(self, body):
+            time.sleep(state.latency.get("llm", 0))
+            prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []))
+            reply = react_reply(prompt)
+            usage = {"prompt_tokens": approx_tokens(prompt), "completion_tokens": approx_tokens(reply)}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            state.count("llm", usage["prompt_tokens"], usage["completion_tokens"])
+            base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body.get("model", "stub")}
+
+            if not body.get("stream"):
+                self._send_json({**base, "object": "chat.completion", "usage": usage, "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": reply},
+                }]})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for token in re.findall(r"\S+\s*|\s+", reply):
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [{
+                    "index": 0, "delta": {"content": token}, "finish_reason": None,
+                }]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(state.latency.get("token", 0))
+            done = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+            self.wfile.flush()
+            self.close_connection = True
+
+        # -----------------------------
+        # MFA & Open-Meteo
+        # -----------------------------
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.startswith("/countries-regions/"):
+                time.sleep(state.latency.get("mfa", 0))
+                state.count("mfa")
+                slug = url.path.rstrip("/").split("/")[-2]
+                page = MFA_PAGE.format(country=slug.replace("-", " ").title()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("ETag", f'"{slug}"')
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+            elif url.path.endswith("/search"):
+                time.sleep(state.latency.get("meteo", 0))
+                state.count("geocoding")
+                name = query.get("name", "")
+                if not is_known_place(name):
+                    self._send_json({"generationtime_ms": 0.1})
+                    return
+                h = int(hashlib.md5(name.lower().encode()).hexdigest(), 16)
+                self._send_json({"results": [{
+                    "name": query.get("name"), "country": "",
+                    "latitude": (h % 12000) / 100 - 60, "longitude": (h // 12000 % 36000) / 100 - 180,
+                }]})
+            elif url.path.endswith("/climate"):
+                time.sleep(state.latency.get("meteo", 0))
+                state.count("climate")
+                # Warmer near the equator, with a seasonal swing that flips by hemisphere
+                lat = float(query.get("latitude", 0))
+                days = [f"2001-{m:02d}-{d:02d}" for m in range(1, 13) for d in (1, 15)]
+                season = lambda month: math.cos((month - 7) / 6 * math.pi) * (1 if lat >= 0 else -1)
+                temps = [round(30 - 0.4 * abs(lat) + 0.15 * abs(lat) * season(int(d[5:7])), 1) for d in days]
+                self._send_json({"daily": {"time": days, "temperature_2m_mean": temps}})
+            else:
+                self._send_json({"error": "not found"}, 404)
+
+    return Handler
+
+
+def start_stub_server(latency: dict = None, port: int = 0):
+    """Starts the stand-in server in a daemon thread. Returns (server, state, base_url)."""
+    state = StubState(latency or {})
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,159 @@
+# -----------------------------
+# MFA Advisory Cache
+# -----------------------------
+# Per-country cache of MFA travel-page titles, persisted in SQLite so it
+# survives restarts and is shared by all workers. Entries younger than the
+# TTL are served directly; older ones are revalidated with ETag /
+# Last-Modified, so an unchanged page costs a 304 rather than a download.
+# If the fetch fails, the stale entry is served instead, and the page is not
+# tried again for `retry_seconds`, so an MFA outage does not cost every
+# question a timeout.
+#
+# The same database also holds the structured page sections written by the
+# background crawler (see logics/mfa_crawler.py).
+import os, time, logging, sqlite3
+
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+
+from logics.http_client import http_get, ahttp_get
+from logics.metrics import span
+from logics.single_flight import coalesce, acoalesce
+
+logger = logging.getLogger("travelpal.advisories")
+
+
+def page_title(html: str):
+    """Parses only the <title> element of an MFA page."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("title"))
+    return soup.title.string.strip() if soup.title and soup.title.string else None
+
+
+class AdvisoryCache:
+    def __init__(self, db_path: str, ttl_seconds: float = 86400, retry_seconds: float = 300):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._retry_after = {}  # url -> time before which a failed page is not fetched again
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS advisories ("
+                "country TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT, "
+                "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS advisory_sections ("
+                "country TEXT NOT NULL, section TEXT NOT NULL, content TEXT NOT NULL, "
+                "PRIMARY KEY (country, section))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS advisory_sections_by_section "
+                "ON advisory_sections (section)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, country: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM advisories WHERE country = ?", (country,)).fetchone()
+        return dict(row) if row else None
+
+    def put(self, country: str, url: str, title: str, etag: str = None, last_modified: str = None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO advisories VALUES (?, ?, ?, ?, ?, ?)",
+                (country, url, title, etag, last_modified, time.time()),
+            )
+
+    def touch(self, country: str):
+        """Marks an entry as fresh again after a 304 Not Modified."""
+        with self._connect() as conn:
+            conn.execute("UPDATE advisories SET fetched_at = ? WHERE country = ?", (time.time(), country))
+
+    def put_sections(self, country: str, sections: dict):
+        """Replaces the stored sections (section name -> text) for a country."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM advisory_sections WHERE country = ?", (country,))
+            conn.executemany(
+                "INSERT INTO advisory_sections VALUES (?, ?, ?)",
+                [(country, name, text) for name, text in sections.items()],
+            )
+
+    def sections(self, country: str) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT section, content FROM advisory_sections WHERE country = ?", (country,)
+            ).fetchall()
+        return {row["section"]: row["content"] for row in rows}
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    # -----------------------------
+    # Fetch with revalidation
+    # -----------------------------
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _handle_response(self, country: str, url: str, entry, r: httpx.Response):
+        if r.status_code == 304 and entry:
+            self.touch(country)
+            return entry["title"]
+        r.raise_for_status()
+        title = page_title(r.text)
+        self.put(country, url, title, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return title
+
+    def _cached(self, country: str, url: str):
+        """Returns (entry, True) when the entry can be served without a fetch."""
+        entry = self.get(country)
+        if entry and entry["url"] != url:
+            entry = None
+        if entry and self.is_fresh(entry):
+            return entry, True
+        return entry, time.time() < self._retry_after.get(url, 0)
+
+    def _failed(self, url: str, entry, error: Exception):
+        logger.warning("fetching %s failed (%s); serving %s", url, error, "the stale entry" if entry else "nothing")
+        self._retry_after[url] = time.time() + self.retry_seconds
+        return entry["title"] if entry else None
+
+    def title(self, country: str, url: str):
+        """Returns the advisory page title (possibly stale), or None if unknown."""
+        entry, cached = self._cached(country, url)
+        if cached:
+            return entry["title"] if entry else None
+        try:
+            # Sessions asking about the same country at once share one request
+            return coalesce("mfa_fetch", url, self._fetch, country, url, entry)
+        except Exception as e:  # Network errors, error statuses and unparseable pages alike
+            return self._failed(url, entry, e)
+
+    def _fetch(self, country: str, url: str, entry):
+        with span("mfa_fetch"):
+            r = http_get(url, headers=self.conditional_headers(entry))
+        return self._handle_response(country, url, entry, r)
+
+    async def _afetch(self, country: str, url: str, entry):
+        with span("mfa_fetch"):
+            r = await ahttp_get(url, headers=self.conditional_headers(entry))
+        return self._handle_response(country, url, entry, r)
+
+    async def atitle(self, country: str, url: str):
+        entry, cached = self._cached(country, url)
+        if cached:
+            return entry["title"] if entry else None
+        try:
+            return await acoalesce("mfa_fetch", url, self._afetch, country, url, entry)
+        except Exception as e:
+            return self._failed(url, entry, e)
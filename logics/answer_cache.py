@@ -0,0 +1,88 @@
+# -----------------------------
+# Semantic Answer Cache
+# -----------------------------
+# Keeps recent agent answers in a small FAISS inner-product index. A new
+# question whose embedding is close enough to a cached one (cosine similarity
+# above the threshold) gets the stored answer back without running the agent.
+# Embeddings barely separate "visa for Japan" from "visa for Korea", so an
+# optional `places` function (question -> set of places named) must also
+# agree before an answer is reused. Entries expire after a TTL so that stale
+# advisories age out.
+import time, threading
+
+import faiss
+import numpy as np
+
+
+class SemanticAnswerCache:
+    CANDIDATES = 4  # Near neighbours checked for a matching place set
+
+    def __init__(self, embeddings, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 512, places=None):
+        self.embeddings = embeddings
+        self.places = places or (lambda question: frozenset())
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._index = None
+        self._entries = {}  # id -> (question, answer, expires_at, places)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _vector(self, question: str):
+        vec = np.asarray([self.embeddings.embed_query(question)], dtype="float32")
+        faiss.normalize_L2(vec)
+        return vec
+
+    def _remove(self, ids):
+        if ids:
+            self._index.remove_ids(np.asarray(ids, dtype="int64"))
+            for i in ids:
+                self._entries.pop(i, None)
+
+    def _purge_expired(self):
+        now = time.time()
+        self._remove([i for i, (_, _, expires, _) in self._entries.items() if expires <= now])
+
+    def lookup(self, question: str):
+        """Returns a cached answer for a near-duplicate question, or None."""
+        if self._index is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        vec = self._vector(question)
+        places = self.places(question)
+        with self._lock:
+            self._purge_expired()
+            if self._index.ntotal:
+                scores, ids = self._index.search(vec, min(self.CANDIDATES, self._index.ntotal))
+                for score, i in zip(scores[0], ids[0]):
+                    if i == -1 or score < self.threshold:
+                        break
+                    _, answer, _, entry_places = self._entries[int(i)]
+                    if entry_places == places:
+                        self.hits += 1
+                        return answer
+            self.misses += 1
+        return None
+
+    def store(self, question: str, answer: str):
+        vec = self._vector(question)
+        places = self.places(question)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vec.shape[1]))
+            self._purge_expired()
+            if len(self._entries) >= self.max_entries:
+                # Ids are handed out in insertion order, so the smallest are oldest
+                oldest = sorted(self._entries)[: len(self._entries) - self.max_entries + 1]
+                self._remove(oldest)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vec, np.asarray([entry_id], dtype="int64"))
+            self._entries[entry_id] = (question, answer, time.time() + self.ttl_seconds, places)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,148 @@
+# -----------------------------
+# TravelPal HTTP API
+# -----------------------------
+# A headless ASGI service in front of the agent and its tools, so inference
+# can run and scale apart from the Streamlit front end (which becomes a thin
+# client when TRAVELPAL_API_URL is set).
+#
+# Usage:
+#   python -m logics.api [--workers 4] [--port 8000]
+#   uvicorn logics.api:app --workers 4 --port 8000
+#
+# Endpoints:
+#   POST /v1/ask          {"question", "memory"?} -> {"answer", "path", "question", "memory"}
+#   POST /v1/ask/stream   same body -> NDJSON: {"token"} lines, then {"done": true, ...} (or {"error"})
+#   POST /v1/tools/{travelpal|mfa|weather}   {"question"} -> {"answer"}
+#   GET  /healthz, GET /metrics
+#
+# The service is stateless: conversation memory travels with each request
+# (the "memory" returned by the last answer), so any worker can answer any
+# session. Workers share the persisted FAISS index on disk (each memory-maps
+# the current version) and the SQLite caches; answer caches, request
+# coalescing and /metrics are per worker. Each worker builds its agent and
+# tool stores before it accepts requests; `python -m logics.api` builds the
+# index once before starting them, so they do not all embed the sources.
+import json, logging, argparse
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from prometheus_client import make_asgi_app
+from pydantic import BaseModel
+
+from logics.config import API_HOST, API_PORT, API_WORKERS
+from logics import llm
+from logics.metrics import span, record_answer
+
+logger = logging.getLogger("travelpal.api")
+
+
+class AskRequest(BaseModel):
+    question: str
+    memory: Optional[dict] = None
+
+
+class ToolRequest(BaseModel):
+    question: str
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Built off the event loop, and before serving, so no request waits on a build
+    await run_in_threadpool(llm.warm_up)
+    llm.watch_travelpal_sources()
+    yield
+
+
+app = FastAPI(title="TravelPal API", lifespan=lifespan)
+app.mount("/metrics", make_asgi_app())
+
+# The tools read SQLite caches synchronously, so like the agent they run in the threadpool
+TOOLS = {
+    "travelpal": llm.travelpal_tool_func,
+    "mfa": llm.mfa_tool_func,
+    "weather": llm.weather_tool_func,
+}
+
+
+def _done(question: str, answer: str, path: str, memory) -> dict:
+    record_answer(path)
+    memory.add_turn(question, answer, background=False)
+    return {"answer": answer, "path": path, "question": question, "memory": memory.state()}
+
+
+def answer(body: AskRequest) -> dict:
+    memory = llm.new_conversation_memory(body.memory)
+    question = llm.standalone_question(body.question, memory)
+    response, path = llm.answer_without_agent(question)
+    if response is None:
+        response = llm.run_agent(question)
+        llm.cache_answer(question, response)
+    return _done(question, response, path, memory)
+
+
+def stream_answer(body: AskRequest):
+    """Yields NDJSON lines; runs in the threadpool, like the Chatbot page's streaming loop."""
+    try:
+        memory = llm.new_conversation_memory(body.memory)
+        question = llm.standalone_question(body.question, memory)
+        response, path = llm.answer_without_agent(question)
+        if response is None:
+            with span("agent"):
+                stream = llm.stream_agent(question)
+                for token in stream:
+                    yield json.dumps({"token": token}) + "\n"
+            response = stream.result
+            llm.cache_answer(question, response)
+        yield json.dumps({"done": True, **_done(question, response, path, memory)}) + "\n"
+    except Exception as e:
+        # The 200 status has already been sent, so report the failure in-band
+        logger.exception("streamed answer failed")
+        yield json.dumps({"error": str(e) or type(e).__name__}) + "\n"
+
+
+@app.post("/v1/ask")
+async def ask(body: AskRequest):
+    return await run_in_threadpool(answer, body)
+
+
+@app.post("/v1/ask/stream")
+def ask_stream(body: AskRequest):
+    return StreamingResponse(stream_answer(body), media_type="application/x-ndjson")
+
+
+@app.post("/v1/tools/{name}")
+async def tool(name: str, body: ToolRequest):
+    func = TOOLS.get(name)
+    if func is None:
+        raise HTTPException(404, f"unknown tool {name!r}; expected one of {', '.join(TOOLS)}")
+    return {"answer": await run_in_threadpool(func, body.question)}
+
+
+@app.get("/healthz")
+def healthz():
+    return {
+        "status": "ok",
+        "index_version": llm.travelpal_index_version(),
+        "startup": llm.startup_profile(),
+        "router": llm.router_stats(),
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the TravelPal HTTP API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Worker processes")
+    args = parser.parse_args()
+    if args.workers > 1:
+        llm.load_travelpal_index()  # The workers then memory-map it
+    uvicorn.run("logics.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# -----------------------------
+# TravelPal HTTP API Client
+# -----------------------------
+# Used by the Chatbot page when TRAVELPAL_API_URL is set: questions are
+# answered by the API service (logics/api.py) instead of in the Streamlit
+# process, which then only renders.
+import json
+
+import httpx
+
+from logics.config import API_URL, API_TIMEOUT
+from logics.http_client import get_client
+
+
+class RemoteAnswer:
+    """
+    Iterates over the streamed answer tokens of POST /v1/ask/stream. Once
+    exhausted, `result`, `path`, `question` and `memory` hold the final
+    answer, how it was produced, the standalone question and the
+    conversation memory to send with the next question.
+    """
+
+    def __init__(self, question: str, memory: dict = None, base_url: str = API_URL):
+        self.url = f"{base_url}/v1/ask/stream"
+        self.body = {"question": question, "memory": memory}
+        self.result = self.path = self.question = self.memory = None
+
+    def __iter__(self):
+        with get_client().stream("POST", self.url, json=self.body, timeout=httpx.Timeout(API_TIMEOUT)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if "token" in event:
+                    yield event["token"]
+                elif "error" in event:
+                    raise RuntimeError(f"TravelPal API error: {event['error']}")
+                elif event.get("done"):
+                    self.result = event["answer"]
+                    self.path = event["path"]
+                    self.question = event["question"]
+                    self.memory = event["memory"]
+        if self.result is None:
+            raise RuntimeError("TravelPal API stream ended without an answer")
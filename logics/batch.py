@@ -0,0 +1,190 @@
+# -----------------------------
+# Batch Question Answering
+# -----------------------------
+# Answers a JSONL file of questions (e.g. to re-validate answers after an
+# ICA policy change) through the agent or one tool, without the chat UI.
+#
+# Usage:
+#   python -m logics.batch questions.jsonl answers.jsonl [--target agent]
+#                          [--concurrency 4] [--rate 2]
+#
+# Input lines are {"question": ..., "target"?: ..., "id"?: ...}; "target"
+# overrides --target per question and "id" defaults to the line number.
+# Questions are read as they are needed, at most `concurrency` run at a
+# time, and no more than `rate` start per second. Each result is appended
+# to the output as soon as it is done, with its timings:
+#   {"id", "question", "target", "answer" | "error", "seconds", "wait_seconds"}
+# so an interrupted run is resumed by running the same command again:
+# questions already answered in the output are skipped (failed ones are
+# retried, and the later line supersedes the earlier one). Ctrl-C keeps the
+# answers already finished and abandons the questions still running.
+import os, sys, json, time, argparse, logging, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from logics.config import BATCH_CONCURRENCY, BATCH_RATE
+
+logger = logging.getLogger("travelpal.batch")
+
+TARGETS = ["agent", "travelpal", "mfa", "weather"]
+
+
+def target_funcs() -> dict:
+    from logics import llm
+
+    return {
+        "agent": llm.run_agent,
+        "travelpal": llm.travelpal_tool_func,
+        "mfa": llm.mfa_tool_func,
+        "weather": llm.weather_tool_func,
+    }
+
+
+class RateLimiter:
+    """Spaces out starts to at most `rate` per second (0 = unlimited), shared by all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """Blocks until the caller may start; returns the seconds waited."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return start - now
+
+
+def read_items(path: str, default_target: str):
+    """Yields the input items one at a time, with "id" and "target" filled in."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            item.setdefault("id", number)
+            item.setdefault("target", default_target)
+            yield item
+
+
+def answered_ids(path: str) -> set:
+    """Ids already answered in an earlier run's output (a torn last line is ignored)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "error" in record:
+                done.discard(record["id"])
+            else:
+                done.add(record["id"])
+    return done
+
+
+def answer_one(item: dict, funcs: dict, limiter: RateLimiter) -> dict:
+    record = {"id": item["id"], "question": item["question"], "target": item["target"]}
+    waited = limiter.wait()
+    started = time.perf_counter()
+    try:
+        record["answer"] = funcs[item["target"]](item["question"])
+    except Exception as e:
+        logger.warning("question %s failed: %s", item["id"], e)
+        record["error"] = str(e) or type(e).__name__
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    record["wait_seconds"] = round(waited, 3)
+    return record
+
+
+def run_batch(input_path: str, output_path: str, target: str = "agent",
+              concurrency: int = BATCH_CONCURRENCY, rate: float = BATCH_RATE) -> dict:
+    """Answers every question in `input_path` not yet answered in `output_path`. Returns counts."""
+    funcs = target_funcs()
+    done = answered_ids(output_path)
+    limiter = RateLimiter(rate)
+    stats = {"answered": 0, "errors": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    # Start on a new line if the last run was killed mid-write
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    else:
+        torn = False
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    interrupted = False
+    with open(output_path, "a", encoding="utf-8") as out:
+        if torn:
+            out.write("\n")
+
+        def write(future):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["errors" if "error" in record else "answered"] += 1
+
+        pending = set()
+        try:
+            for item in read_items(input_path, target):
+                if item["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                if item["target"] not in funcs:
+                    raise ValueError(f"unknown target {item['target']!r} for question {item['id']}; expected one of {', '.join(TARGETS)}")
+                # Only `concurrency` questions are read ahead, so huge files stream through
+                if len(pending) >= concurrency:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future)
+                pending.add(pool.submit(answer_one, item, funcs, limiter))
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future)
+        except KeyboardInterrupt:
+            # Answers that already finished are kept; the next run retries the rest
+            interrupted = True
+            for future in pending:
+                if future.done() and not future.cancelled():
+                    write(future)
+            raise
+        finally:
+            # On Ctrl-C the questions still running are not waited for
+            pool.shutdown(wait=not interrupted, cancel_futures=interrupted)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with the TravelPal agent or a tool.")
+    parser.add_argument("input", help="JSONL with one {\"question\": ...} per line")
+    parser.add_argument("output", help="JSONL results, appended to (and resumed from) if it exists")
+    parser.add_argument("--target", choices=TARGETS, default="agent", help="Default target for questions without one")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Questions in flight")
+    parser.add_argument("--rate", type=float, default=BATCH_RATE, help="Questions started per second (0 = no limit)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        stats = run_batch(args.input, args.output, args.target, args.concurrency, args.rate)
+    except KeyboardInterrupt:
+        print(f"\ninterrupted; run the same command again to resume from {args.output}", file=sys.stderr)
+        sys.stderr.flush()
+        # Exit without joining the pool's threads, which may still be in an agent run
+        os._exit(130)
+    print(f"{stats['answered']} answered, {stats['errors']} failed, {stats['skipped']} already done in {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -----------------------------
+# TravelPal runtime settings
+# -----------------------------
+# Every knob can be overridden with an environment variable so that the
+# Streamlit app, background jobs and scripts all agree on the same values.
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAG_PATH = os.path.join(BASE_DIR, "TravelPal RAG document.docx")
+
+# Local cache directory shared by all worker processes
+CACHE_DIR = os.environ.get("TRAVELPAL_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+INDEX_DIR = os.path.join(CACHE_DIR, "rag_index")
+# Extra sources (docx, PDF, saved HTML) indexed alongside the RAG document
+KNOWLEDGE_DIR = os.environ.get("TRAVELPAL_KNOWLEDGE_DIR", os.path.join(BASE_DIR, "knowledge"))
+INGEST_BATCH_SIZE = int(os.environ.get("TRAVELPAL_INGEST_BATCH_SIZE", "64"))
+INGEST_CONCURRENCY = int(os.environ.get("TRAVELPAL_INGEST_CONCURRENCY", "4"))
+# Seconds between checks of the sources for edits (0 disables the watcher)
+RAG_REFRESH_INTERVAL = float(os.environ.get("TRAVELPAL_RAG_REFRESH_INTERVAL", "30"))
+
+# RAG settings
+# "openai" (EMBEDDING_MODEL via the API), or a local CPU backend for fully
+# offline use: "hashing" (feature-hashed TF projection) or "onnx" (a sentence
+# encoder in ONNX_MODEL_DIR). Changing it re-embeds the index.
+EMBEDDING_BACKEND = os.environ.get("TRAVELPAL_EMBEDDING_BACKEND", "openai")
+EMBEDDING_MODEL = os.environ.get("TRAVELPAL_EMBEDDING_MODEL", "text-embedding-ada-002")
+HASHING_DIM = int(os.environ.get("TRAVELPAL_HASHING_DIM", "1024"))
+ONNX_MODEL_DIR = os.environ.get("TRAVELPAL_ONNX_MODEL_DIR", os.path.join(BASE_DIR, "models", "all-MiniLM-L6-v2"))
+# Local backends: texts per inference batch and batches run in parallel
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.environ.get("TRAVELPAL_LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+LOCAL_EMBEDDING_WORKERS = int(os.environ.get("TRAVELPAL_LOCAL_EMBEDDING_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Client-side token-length checks batch document embeddings but need tiktoken's
+# BPE file; offline runs (e.g. the replay benchmark) turn them off
+EMBEDDING_CTX_CHECK = os.environ.get("TRAVELPAL_EMBEDDING_CTX_CHECK", "1") == "1"
+# FAISS index layout as a faiss.index_factory string: "Flat" (exact), "HNSW32",
+# "IVF1024,PQ32", optionally prefixed with "PCA256," to reduce dimensions.
+# Compare layouts with `python -m benchmarks.index_bench`; changing it rebuilds the index.
+INDEX_FACTORY = os.environ.get("TRAVELPAL_INDEX_FACTORY", "Flat")
+INDEX_NPROBE = int(os.environ.get("TRAVELPAL_INDEX_NPROBE", "16"))
+INDEX_EF_SEARCH = int(os.environ.get("TRAVELPAL_INDEX_EF_SEARCH", "64"))
+INDEX_TRAIN_SIZE = int(os.environ.get("TRAVELPAL_INDEX_TRAIN_SIZE", "20000"))
+CHUNK_SIZE = int(os.environ.get("TRAVELPAL_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.environ.get("TRAVELPAL_CHUNK_OVERLAP", "100"))
+RETRIEVAL_K = int(os.environ.get("TRAVELPAL_RETRIEVAL_K", "3"))
+# "hybrid" (BM25 + vectors, with a lexical-only fast path) or "vector"
+RETRIEVAL_MODE = os.environ.get("TRAVELPAL_RETRIEVAL_MODE", "hybrid")
+RETRIEVAL_FETCH_K = int(os.environ.get("TRAVELPAL_RETRIEVAL_FETCH_K", "10"))
+RRF_K = int(os.environ.get("TRAVELPAL_RRF_K", "60"))
+LEXICAL_MIN_COVERAGE = float(os.environ.get("TRAVELPAL_LEXICAL_MIN_COVERAGE", "0.8"))
+# Tokens of retrieved text put in the RAG prompt, best sentences first (0 = whole chunks)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("TRAVELPAL_CONTEXT_TOKEN_BUDGET", "400"))
+
+# Query embedding cache (set TRAVELPAL_EMBEDDING_CACHE_DB="" to keep it in memory only)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("TRAVELPAL_EMBEDDING_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_DB = os.environ.get(
+    "TRAVELPAL_EMBEDDING_CACHE_DB", os.path.join(CACHE_DIR, "embeddings.sqlite")
+)
+
+# Semantic answer cache in front of the agent
+ANSWER_CACHE_THRESHOLD = float(os.environ.get("TRAVELPAL_ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL = float(os.environ.get("TRAVELPAL_ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SIZE = int(os.environ.get("TRAVELPAL_ANSWER_CACHE_SIZE", "512"))
+
+# Outbound HTTP (shared pooled clients)
+HTTP_TIMEOUT = float(os.environ.get("TRAVELPAL_HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("TRAVELPAL_HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("TRAVELPAL_HTTP_MAX_CONNECTIONS", "50"))
+HTTP_PER_HOST_LIMIT = int(os.environ.get("TRAVELPAL_HTTP_PER_HOST_LIMIT", "8"))
+
+# Open-Meteo endpoints
+GEOCODING_URL = os.environ.get("TRAVELPAL_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+CLIMATE_URL = os.environ.get("TRAVELPAL_CLIMATE_URL", "https://climate-api.open-meteo.com/v1/climate")
+
+# MFA advisory cache
+ADVISORY_DB = os.environ.get("TRAVELPAL_ADVISORY_DB", os.path.join(CACHE_DIR, "advisories.sqlite"))
+ADVISORY_TTL = float(os.environ.get("TRAVELPAL_ADVISORY_TTL", "86400"))
+# After a failed fetch, seconds to keep serving the stale entry before trying again
+ADVISORY_RETRY_SECONDS = float(os.environ.get("TRAVELPAL_ADVISORY_RETRY_SECONDS", "300"))
+PREWARM_MFA = os.environ.get("TRAVELPAL_PREWARM_MFA", "0") == "1"
+# Fetch MFA pages from a mirror / local stand-in instead of www.mfa.gov.sg
+MFA_BASE_URL = os.environ.get("TRAVELPAL_MFA_BASE_URL", "")
+
+# Country detection: fall back to spaCy NER when the gazetteer finds nothing
+SPACY_FALLBACK = os.environ.get("TRAVELPAL_SPACY_FALLBACK", "1") == "1"
+
+# Fast tool router in front of the ReAct agent
+ROUTER_ENABLED = os.environ.get("TRAVELPAL_ROUTER_ENABLED", "1") == "1"
+ROUTER_MIN_SIMILARITY = float(os.environ.get("TRAVELPAL_ROUTER_MIN_SIMILARITY", "0.85"))
+ROUTER_MIN_MARGIN = float(os.environ.get("TRAVELPAL_ROUTER_MIN_MARGIN", "0.03"))
+
+# Weather cache and offline climatology table
+WEATHER_DB = os.environ.get("TRAVELPAL_WEATHER_DB", os.path.join(CACHE_DIR, "weather.sqlite"))
+CLIMATOLOGY_PATH = os.environ.get("TRAVELPAL_CLIMATOLOGY_PATH", os.path.join(BASE_DIR, "climatology.json"))
+CLIMATE_MODEL = os.environ.get("TRAVELPAL_CLIMATE_MODEL", "EC_Earth3P_HR")
+CLIMATE_START = os.environ.get("TRAVELPAL_CLIMATE_START", "1991-01-01")
+CLIMATE_END = os.environ.get("TRAVELPAL_CLIMATE_END", "2020-12-31")
+# The table is not shipped; with this set, a start without it builds it in the background
+CLIMATOLOGY_AUTO_BUILD = os.environ.get("TRAVELPAL_CLIMATOLOGY_AUTO_BUILD", "0") == "1"
+
+# Chat page: messages rendered per rerun (older ones are shown on request)
+CHAT_HISTORY_WINDOW = int(os.environ.get("TRAVELPAL_CHAT_HISTORY_WINDOW", "20"))
+# Messages kept per session for display (the agent's memory is bounded separately)
+CHAT_MAX_MESSAGES = int(os.environ.get("TRAVELPAL_CHAT_MAX_MESSAGES", "200"))
+
+# Conversation memory: recent turns verbatim, older ones in a rolling summary,
+# all within MEMORY_TOKEN_BUDGET tokens (counted with TOKEN_ENCODING)
+MEMORY_TOKEN_BUDGET = int(os.environ.get("TRAVELPAL_MEMORY_TOKEN_BUDGET", "1000"))
+MEMORY_KEEP_TURNS = int(os.environ.get("TRAVELPAL_MEMORY_KEEP_TURNS", "3"))
+MEMORY_SUMMARY_TOKENS = int(os.environ.get("TRAVELPAL_MEMORY_SUMMARY_TOKENS", "300"))
+TOKEN_ENCODING = os.environ.get("TRAVELPAL_TOKEN_ENCODING", "cl100k_base")
+
+# Identical questions / upstream requests in flight at the same time share one run
+COALESCE_ENABLED = os.environ.get("TRAVELPAL_COALESCE_ENABLED", "1") == "1"
+
+# Headless HTTP API (logics/api.py). With TRAVELPAL_API_URL set, the Chatbot
+# page sends questions to that service instead of running the agent itself.
+API_HOST = os.environ.get("TRAVELPAL_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("TRAVELPAL_API_PORT", "8000"))
+API_WORKERS = int(os.environ.get("TRAVELPAL_API_WORKERS", "1"))
+API_URL = os.environ.get("TRAVELPAL_API_URL", "").rstrip("/")
+# Seconds a thin client waits for the next streamed chunk (agent runs with tools can be slow)
+API_TIMEOUT = float(os.environ.get("TRAVELPAL_API_TIMEOUT", "120"))
+
+# Batch question answering (logics/batch.py): questions in flight, and
+# questions started per second (0 = no limit, e.g. to stay under API quotas)
+BATCH_CONCURRENCY = int(os.environ.get("TRAVELPAL_BATCH_CONCURRENCY", "4"))
+BATCH_RATE = float(os.environ.get("TRAVELPAL_BATCH_RATE", "0"))
+
+# Prometheus metrics endpoint (port 0 disables it)
+METRICS_PORT = int(os.environ.get("TRAVELPAL_METRICS_PORT", "9108"))
+METRICS_ADDR = os.environ.get("TRAVELPAL_METRICS_ADDR", "127.0.0.1")
@@ -0,0 +1,127 @@
+# -----------------------------
+# Context Packing for the RAG Prompt
+# -----------------------------
+# Sits between the retriever and the "stuff" prompt. Retrieved neighbours
+# from the same source paragraph are joined where the splitter's overlap
+# repeats the end of one chunk at the start of the next, the chunks are
+# split into sentences, and those are scored against the question (query
+# terms weighted by how rare they are among the candidates). The best sentences
+# are packed into a token budget and handed to the prompt grouped by their
+# source chunk, so each keeps the chunk's reference URLs.
+import re, math
+from collections import Counter
+from itertools import permutations
+
+from langchain_core.documents import Document
+from langchain_core.documents.compressor import BaseDocumentCompressor
+
+from logics.hybrid_retriever import tokenize
+from logics.metrics import record_context
+from logics.tokens import count_tokens
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?:])\s+|\n+")
+# Shorter suffix/prefix matches are treated as coincidence, not overlap
+MIN_OVERLAP_CHARS = 20
+
+
+def edge_overlap(first: str, second: str) -> int:
+    """Length of the longest suffix of `first` that `second` starts with (0 if under MIN_OVERLAP_CHARS)."""
+    probe = second[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+    start = first.find(probe)
+    while start != -1:
+        if second.startswith(first[start:]):
+            return len(first) - start
+        start = first.find(probe, start + 1)
+    return 0
+
+
+def join_neighbours(documents):
+    """
+    [(chunk rank, text)]: chunks cut from the same source paragraph (equal
+    metadata) whose edges overlap are joined back into one text, ranked as
+    the better of the two. Nothing is removed across unrelated chunks, so
+    a sentence that two countries' pages share stays with each of them.
+    """
+    chunks = [[rank, doc.page_content] for rank, doc in enumerate(documents)]
+    joined = True
+    while joined:
+        joined = False
+        for a, b in permutations(chunks, 2):
+            if documents[a[0]].metadata != documents[b[0]].metadata:
+                continue
+            k = edge_overlap(a[1], b[1])
+            if k:
+                a[1] += b[1][k:]
+                if b[0] < a[0]:
+                    a[0] = b[0]
+                chunks.remove(b)
+                joined = True
+                break
+    return chunks
+
+
+def split_sentences(documents):
+    """[(chunk rank, position, sentence)], with chunk overlaps joined first."""
+    sentences = []
+    for rank, text in join_neighbours(documents):
+        for pos, sentence in enumerate(SENTENCE_SPLIT.split(text)):
+            sentence = sentence.strip()
+            if re.search(r"\w", sentence):
+                sentences.append((rank, pos, sentence))
+    return sentences
+
+
+def pack_context(documents, query: str, token_budget: int, min_relative_score: float = 0.2):
+    """
+    Returns (documents, stats): the highest-scoring sentences that fit in
+    `token_budget` tokens, as one document per source chunk (best first),
+    and the retrieved/packed token counts.
+    """
+    retrieved_tokens = sum(count_tokens(doc.page_content) for doc in documents)
+    sentences = split_sentences(documents)
+    terms = [set(tokenize(text)) for _, _, text in sentences]
+    df = Counter(t for ts in terms for t in ts)
+    weights = {t: math.log(1 + len(sentences) / df[t]) for t in set(tokenize(query)) if df[t]}
+    scores = [sum(weights.get(t, 0.0) for t in ts) for ts in terms]
+
+    best = max(scores, default=0.0)
+    if best > 0:
+        candidates = [i for i, score in enumerate(scores) if score >= min_relative_score * best]
+        candidates.sort(key=lambda i: (-scores[i], sentences[i][0], sentences[i][1]))
+    else:
+        # Nothing matches lexically (a paraphrased question): trust the retriever's order
+        candidates = list(range(len(sentences)))
+
+    chosen, used = [], 0
+    for i in candidates:
+        tokens = count_tokens(sentences[i][2])
+        if used + tokens <= token_budget:
+            chosen.append(i)
+            used += tokens
+
+    by_chunk = {}  # chunk rank -> sentence indexes, in the order chunks were first chosen
+    for i in chosen:
+        by_chunk.setdefault(sentences[i][0], []).append(i)
+    packed = [
+        Document(
+            page_content=" ".join(sentences[i][2] for i in sorted(ids, key=lambda i: sentences[i][1])),
+            metadata=documents[rank].metadata,
+        )
+        for rank, ids in by_chunk.items()
+    ]
+    packed_tokens = sum(count_tokens(doc.page_content) for doc in packed)
+    return packed, {"retrieved_tokens": retrieved_tokens, "packed_tokens": packed_tokens}
+
+
+class ContextPacker(BaseDocumentCompressor):
+    """Document compressor for ContextualCompressionRetriever."""
+
+    token_budget: int = 400
+    min_relative_score: float = 0.2
+
+    def compress_documents(self, documents, query, callbacks=None):
+        packed, stats = pack_context(documents, query, self.token_budget, self.min_relative_score)
+        record_context(stats["retrieved_tokens"], stats["packed_tokens"])
+        return packed
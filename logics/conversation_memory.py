@@ -0,0 +1,82 @@
+# -----------------------------
+# Conversation Memory
+# -----------------------------
+# Per-session memory for follow-up questions ("and the weather there?").
+# The last few turns are kept verbatim; older turns are folded into a
+# running summary, one LLM call per fold. Summary plus turns stay within a
+# token budget, so the prompt that uses the memory (rewriting a follow-up
+# into a standalone question) costs the same at turn 5 and at turn 500.
+#
+# Folding runs in a background thread after each answer, while the user
+# reads and types; the next question waits for it only if it is not done.
+import threading
+
+from logics.tokens import count_tokens, truncate_tokens
+
+
+class ConversationMemory:
+    def __init__(self, summarize, token_budget: int = 1000, keep_turns: int = 3, summary_tokens: int = 300):
+        """
+        `summarize(summary, lines)` returns `summary` extended with the
+        folded conversation `lines` (e.g. an LLM call).
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.turns = []  # [(question, answer, tokens)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lines(question: str, answer: str) -> str:
+        return f"User: {question}\nAssistant: {answer}"
+
+    def _over_budget(self) -> bool:
+        used = count_tokens(self.summary) + sum(tokens for _, _, tokens in self.turns)
+        return len(self.turns) > self.keep_turns or (len(self.turns) > 1 and used > self.token_budget)
+
+    def add_turn(self, question: str, answer: str, background: bool = True):
+        # A single answer never takes more than half the budget
+        answer = truncate_tokens(answer, self.token_budget // 2)
+        with self._lock:
+            self.turns.append((question, answer, count_tokens(self._lines(question, answer))))
+            if not self._over_budget():
+                return
+        if background:
+            threading.Thread(target=self._fold, name="travelpal-memory-fold", daemon=True).start()
+        else:
+            self._fold()
+
+    def _fold(self):
+        with self._lock:
+            folded = []
+            while self._over_budget():
+                question, answer, _ = self.turns.pop(0)
+                folded.append(self._lines(question, answer))
+            if folded:
+                summary = self.summarize(self.summary, "\n".join(folded))
+                self.summary = truncate_tokens(summary.strip(), self.summary_tokens)
+
+    def context(self) -> str:
+        """The summary and recent turns as prompt text ("" for a new conversation)."""
+        with self._lock:
+            parts = [f"Summary of earlier conversation: {self.summary}"] if self.summary else []
+            parts.extend(self._lines(q, a) for q, a, _ in self.turns)
+        return "\n".join(parts)
+
+    def state(self) -> dict:
+        """JSON-serialisable copy, for clients that keep the memory themselves (see logics/api.py)."""
+        with self._lock:
+            return {"summary": self.summary, "turns": [[q, a] for q, a, _ in self.turns]}
+
+    def load_state(self, state: dict):
+        # Clipped to the limits, since the state may come from a client
+        recent = state.get("turns", [])[-self.keep_turns:] if self.keep_turns else []
+        turns = [(q, truncate_tokens(a, self.token_budget // 2)) for q, a in recent]
+        with self._lock:
+            self.summary = truncate_tokens(state.get("summary", ""), self.summary_tokens)
+            self.turns = [(q, a, count_tokens(self._lines(q, a))) for q, a in turns]
+
+    def __len__(self):
+        return len(self.turns)
@@ -0,0 +1,279 @@
+# -----------------------------
+# Country Resolver (gazetteer)
+# -----------------------------
+# Finds the destination country in a question without running a full NER
+# pipeline. A token trie is built once from the MFA_COUNTRY_MAP keys plus
+# aliases, demonyms and well-known cities; matching is case- and
+# accent-insensitive and prefers the longest phrase at each position.
+# Names that are also everyday words are not matched where they are used as
+# one: "us" only counts as "US", and "turkey ham" or "fine china" are skipped.
+# spaCy is only loaded (lazily) when the gazetteer finds nothing.
+import re, unicodedata
+
+ALIASES = {
+    "United States": ["US", "USA", "u s a", "u s", "america", "united states of america", "the states"],
+    "United Kingdom": ["UK", "u k", "britain", "great britain", "england", "scotland", "wales", "northern ireland"],
+    "United Arab Emirates": ["uae", "emirates"],
+    "South Korea": ["korea", "republic of korea"],
+    "North Korea": ["dprk"],
+    "Czech Republic": ["czechia"],
+    "Turkiye": ["turkey", "türkiye"],
+    "Cote d Ivoire": ["ivory coast", "cote d'ivoire", "côte d'ivoire"],
+    "Cabo Verde": ["cape verde"],
+    "Eswatini": ["swaziland"],
+    "Myanmar": ["burma"],
+    "Macao": ["macau"],
+    "Timor-Leste": ["east timor"],
+    "Netherlands": ["holland", "the netherlands"],
+    "Kyrgyz Republic": ["kyrgyzstan"],
+    "Federated States of Micronesia": ["micronesia"],
+    "Democratic Republic of Congo": ["drc", "dr congo", "democratic republic of the congo"],
+    "Congo": ["republic of the congo", "republic of congo"],
+    "Republic of Guinea": ["guinea"],
+    "Palestinian Territories": ["palestine"],
+    "Laos": ["lao", "lao pdr"],
+    "Vietnam": ["viet nam"],
+    "Russia": ["russian federation"],
+    "China": ["mainland china", "prc"],
+    "Saint Kitts and Nevis": ["st kitts", "st kitts and nevis", "saint kitts"],
+    "Saint Lucia": ["st lucia"],
+    "Saint Vincent and the Grenadines": ["st vincent", "saint vincent"],
+    "Bosnia and Herzegovina": ["bosnia"],
+    "Trinidad and Tobago": ["trinidad"],
+    "Antigua and Barbuda": ["antigua"],
+    "Brunei": ["brunei darussalam"],
+    "North Macedonia": ["macedonia"],
+    "Bahamas": ["the bahamas"],
+    "Gambia": ["the gambia"],
+}
+
+DEMONYMS = {
+    "Japan": ["japanese"], "China": ["chinese"], "South Korea": ["korean", "south korean"],
+    "North Korea": ["north korean"], "Thailand": ["thai"], "Vietnam": ["vietnamese"],
+    "Malaysia": ["malaysian"], "Indonesia": ["indonesian"], "Philippines": ["filipino", "philippine"],
+    "India": ["indian"], "Australia": ["australian"], "United Kingdom": ["british"],
+    "United States": ["american"], "France": ["french"], "Germany": ["german"],
+    "Italy": ["italian"], "Spain": ["spanish"], "Switzerland": ["swiss"], "Netherlands": ["dutch"],
+    "Canada": ["canadian"], "Mexico": ["mexican"], "Brazil": ["brazilian"], "Russia": ["russian"],
+    "Turkiye": ["turkish"], "Egypt": ["egyptian"], "United Arab Emirates": ["emirati"],
+    "Saudi Arabia": ["saudi"], "Taiwan": ["taiwanese"], "Cambodia": ["cambodian"],
+    "Laos": ["laotian"], "Myanmar": ["burmese"], "Nepal": ["nepalese", "nepali"],
+    "Sri Lanka": ["sri lankan"], "Bangladesh": ["bangladeshi"], "Pakistan": ["pakistani"],
+    "New zealand": ["new zealander"], "Ireland": ["irish"], "Greece": ["greek"],
+    "Portugal": ["portuguese"], "Sweden": ["swedish"], "Norway": ["norwegian"],
+    "Denmark": ["danish"], "Finland": ["finnish"], "Iceland": ["icelandic"], "Austria": ["austrian"],
+    "Belgium": ["belgian"], "Poland": ["polish"], "Hungary": ["hungarian"], "Croatia": ["croatian"],
+    "Israel": ["israeli"], "Jordan": ["jordanian"], "Morocco": ["moroccan"], "Kenya": ["kenyan"],
+    "South Africa": ["south african"], "Argentina": ["argentinian", "argentine"], "Chile": ["chilean"],
+    "Peru": ["peruvian"], "Colombia": ["colombian"], "Mongolia": ["mongolian"],
+    "Maldives": ["maldivian"], "Brunei": ["bruneian"], "Qatar": ["qatari"], "Oman": ["omani"],
+    "Kuwait": ["kuwaiti"], "Bahrain": ["bahraini"], "Iran": ["iranian"], "Iraq": ["iraqi"],
+}
+
+CITIES = {
+    "Japan": ["tokyo", "osaka", "kyoto", "sapporo", "fukuoka", "okinawa", "nagoya", "hokkaido", "hiroshima", "nara"],
+    "South Korea": ["seoul", "busan", "jeju", "incheon"],
+    "China": ["beijing", "shanghai", "guangzhou", "shenzhen", "chengdu", "xian", "xi'an", "hangzhou", "chongqing", "harbin"],
+    "Thailand": ["bangkok", "phuket", "chiang mai", "pattaya", "krabi", "koh samui", "hat yai"],
+    "Malaysia": ["kuala lumpur", "penang", "johor bahru", "johor", "malacca", "melaka", "kota kinabalu", "langkawi", "ipoh", "genting", "sabah", "sarawak"],
+    "Indonesia": ["jakarta", "bali", "batam", "bintan", "yogyakarta", "surabaya", "lombok", "bandung", "medan"],
+    "Philippines": ["manila", "cebu", "boracay", "palawan", "davao"],
+    "Vietnam": ["hanoi", "ho chi minh city", "ho chi minh", "saigon", "da nang", "hoi an", "nha trang", "halong bay"],
+    "Cambodia": ["phnom penh", "siem reap"],
+    "Laos": ["vientiane", "luang prabang"],
+    "Myanmar": ["yangon", "mandalay", "bagan"],
+    "Taiwan": ["taipei", "kaohsiung", "taichung"],
+    "India": ["delhi", "new delhi", "mumbai", "bangalore", "bengaluru", "chennai", "kolkata", "goa", "hyderabad", "jaipur"],
+    "Nepal": ["kathmandu", "pokhara"],
+    "Sri Lanka": ["colombo", "kandy"],
+    "Bangladesh": ["dhaka"],
+    "Pakistan": ["karachi", "lahore", "islamabad"],
+    "United Arab Emirates": ["dubai", "abu dhabi"],
+    "Qatar": ["doha"],
+    "Saudi Arabia": ["riyadh", "jeddah", "mecca", "makkah", "medina"],
+    "Turkiye": ["istanbul", "ankara", "cappadocia", "antalya"],
+    "Egypt": ["cairo", "luxor"],
+    "Israel": ["tel aviv"],
+    "Jordan": ["amman", "petra"],
+    "Australia": ["sydney", "melbourne", "brisbane", "perth", "adelaide", "gold coast", "cairns", "canberra", "tasmania", "darwin"],
+    "New zealand": ["auckland", "wellington", "queenstown", "christchurch"],
+    "United Kingdom": ["london", "manchester", "edinburgh", "liverpool", "glasgow"],
+    "France": ["paris", "lyon", "marseille"],
+    "Germany": ["berlin", "munich", "frankfurt", "hamburg"],
+    "Italy": ["rome", "milan", "venice", "florence", "naples"],
+    "Spain": ["madrid", "barcelona", "seville"],
+    "Portugal": ["lisbon", "porto"],
+    "Netherlands": ["amsterdam", "rotterdam"],
+    "Belgium": ["brussels"],
+    "Switzerland": ["zurich", "geneva", "lucerne", "interlaken"],
+    "Austria": ["vienna", "salzburg"],
+    "Czech Republic": ["prague"],
+    "Hungary": ["budapest"],
+    "Poland": ["warsaw", "krakow"],
+    "Greece": ["athens", "santorini"],
+    "Denmark": ["copenhagen"],
+    "Sweden": ["stockholm"],
+    "Norway": ["oslo"],
+    "Finland": ["helsinki"],
+    "Iceland": ["reykjavik"],
+    "Ireland": ["dublin"],
+    "Russia": ["moscow", "st petersburg"],
+    "United States": ["new york", "los angeles", "san francisco", "las vegas", "chicago", "seattle", "boston", "hawaii", "honolulu", "orlando"],
+    "Canada": ["toronto", "vancouver", "montreal"],
+    "Mexico": ["mexico city", "cancun"],
+    "Brazil": ["rio de janeiro", "sao paulo"],
+    "Argentina": ["buenos aires"],
+    "Peru": ["lima", "cusco", "machu picchu"],
+    "Kenya": ["nairobi"],
+    "South Africa": ["cape town", "johannesburg"],
+    "Morocco": ["marrakech", "casablanca"],
+    "Mongolia": ["ulaanbaatar"],
+    "Uzbekistan": ["tashkent", "samarkand"],
+    "Kazakhstan": ["almaty", "astana"],
+}
+
+# Phrases that only match when every letter capitalised here is capitalised
+# in the text ("us" is the pronoun)
+CASED = ["US"]
+
+# Names that are also common nouns, and the neighbouring words that mean the
+# noun is meant ("turkey ham", "fine china", "guinea pig", "polish my shoes")
+COMMON_NOUN_CONTEXT = {
+    "turkey": ["ham", "bacon", "breast", "meat", "mince", "minced", "slices", "sliced", "sandwich", "sandwiches",
+               "jerky", "sausage", "sausages", "burger", "burgers", "legs", "wings", "dinner", "stuffing", "gravy",
+               "roast", "roasted", "smoked", "frozen", "cooked", "whole", "deli"],
+    "china": ["plate", "plates", "cup", "cups", "teacup", "teacups", "bowl", "bowls", "dishes", "tableware",
+              "crockery", "dinnerware", "porcelain", "vase", "vases", "set", "fine", "bone"],
+    "guinea": ["pig", "pigs", "fowl"],
+    "polish": ["my", "your", "his", "her", "our", "their", "shoe", "shoes", "nail", "nails", "remover", "silver"],
+}
+
+_END = "$"
+_PLACE = "@"  # The place a phrase names: a city from CITIES, else its country
+_CASED = "^"  # The tokens as written in CASED, for phrases that must be capitalised
+_NOUN = "~"  # COMMON_NOUN_CONTEXT words next to which the phrase is not a place
+
+
+def _raw_tokens(text: str):
+    """Strips accents and splits on anything that is not a letter or digit, keeping the case."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[a-z0-9]+", text, re.IGNORECASE)
+
+
+def normalize_tokens(text: str):
+    """Lower-cases, strips accents and splits on anything that is not a letter or digit."""
+    return [token.lower() for token in _raw_tokens(text)]
+
+
+def _capitalised_as(raw: list, written: list) -> bool:
+    return all(
+        r[k].isupper()
+        for r, w in zip(raw, written)
+        for k in range(min(len(r), len(w)))
+        if w[k].isupper()
+    )
+
+
+class CountryResolver:
+    def __init__(self, country_map: dict, aliases=ALIASES, demonyms=DEMONYMS, cities=CITIES, spacy_fallback: bool = True):
+        self.countries = set(country_map)
+        self.spacy_fallback = spacy_fallback
+        self._nlp = None
+        self._trie = {}
+        self._cased = {tuple(normalize_tokens(phrase)): _raw_tokens(phrase) for phrase in CASED}
+        for country in country_map:
+            self._add(country, country)
+        for table in (aliases, demonyms, cities):
+            for country, names in table.items():
+                if country in self.countries:
+                    for name in names:
+                        self._add(name, country, place=name if table is cities else None)
+
+    def _add(self, phrase: str, country: str, place: str = None):
+        tokens = normalize_tokens(phrase)
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = country
+        node[_PLACE] = " ".join(normalize_tokens(place)) if place else country
+        if tuple(tokens) in self._cased:
+            node[_CASED] = self._cased[tuple(tokens)]
+        if len(tokens) == 1 and tokens[0] in COMMON_NOUN_CONTEXT:
+            node[_NOUN] = frozenset(COMMON_NOUN_CONTEXT[tokens[0]])
+
+    def _matches(self, text: str):
+        """Yields the trie node of each longest phrase match in `text`, in order."""
+        raw = _raw_tokens(text)
+        tokens = [token.lower() for token in raw]
+        i = 0
+        while i < len(tokens):
+            node, match, match_end = self._trie, None, i
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node and self._is_place(node, raw, tokens, i, j + 1):
+                    match, match_end = node, j + 1
+            if match:
+                yield match
+                i = match_end
+            else:
+                i += 1
+
+    @staticmethod
+    def _is_place(node: dict, raw: list, tokens: list, start: int, end: int) -> bool:
+        if _CASED in node and not _capitalised_as(raw[start:end], node[_CASED]):
+            return False
+        if _NOUN in node:
+            neighbours = tokens[max(start - 1, 0):start] + tokens[end:end + 1]
+            return not node[_NOUN].intersection(neighbours)
+        return True
+
+    def find_all(self, text: str):
+        """Returns every country mentioned in `text`, in order of appearance."""
+        found = []
+        for node in self._matches(text):
+            if node[_END] not in found:
+                found.append(node[_END])
+        return found
+
+    def places(self, text: str):
+        """(place, country) for every country and gazetteer city named in `text`, in order of appearance."""
+        found = []
+        for node in self._matches(text):
+            if (node[_PLACE], node[_END]) not in found:
+                found.append((node[_PLACE], node[_END]))
+        return found
+
+    def find_places(self, text: str) -> frozenset:
+        """The countries and gazetteer cities named in `text` ("Tokyo" and "Osaka" stay apart)."""
+        return frozenset(place for place, _ in self.places(text))
+
+    def match(self, text: str):
+        """Returns the first gazetteer match in `text`, without the spaCy fallback."""
+        found = self.find_all(text)
+        return found[0] if found else None
+
+    def resolve(self, text: str):
+        """Returns the first MFA_COUNTRY_MAP key mentioned in `text`, or None."""
+        found = self.find_all(text)
+        if found:
+            return found[0]
+        if self.spacy_fallback:
+            return self._spacy_country(text)
+        return None
+
+    def _spacy_country(self, text: str):
+        if self._nlp is None:
+            try:
+                import spacy
+                self._nlp = spacy.load("en_core_web_sm")
+            except (ImportError, OSError):
+                self.spacy_fallback = False
+                return None
+        for ent in self._nlp(text).ents:
+            if ent.label_ == "GPE":
+                found = self.find_all(ent.text)
+                return found[0] if found else ent.text
+        return None
@@ -0,0 +1,131 @@
+# -----------------------------
+# Embedding Backends
+# -----------------------------
+# The RAG index, router and answer cache can embed text with:
+#   - "openai":  OpenAI embeddings API (default)
+#   - "hashing": a signed feature-hashing projection of word unigrams and
+#                bigrams with sublinear TF, fully offline and dependency-free
+#   - "onnx":    a local sentence encoder exported to ONNX, e.g. a quantized
+#                all-MiniLM-L6-v2 (needs onnxruntime and tokenizers;
+#                TRAVELPAL_ONNX_MODEL_DIR holds model.onnx and tokenizer.json)
+# Local backends run batches on a thread pool (numpy and onnxruntime release
+# the GIL). Each backend has an id, recorded with the index it builds so a
+# mismatch is detected when the index is loaded.
+import os, abc, math, hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from logics.hybrid_retriever import tokenize
+
+
+class LocalEmbeddings(Embeddings, abc.ABC):
+    """Base class: splits documents into batches embedded on a thread pool."""
+
+    backend_id = "local"
+    dimension = None
+
+    def __init__(self, batch_size: int = 32, workers: int = 4):
+        self.batch_size = batch_size
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+
+    @abc.abstractmethod
+    def _embed_batch(self, texts) -> np.ndarray:
+        """Returns one L2-normalised row per text."""
+
+    def embed_documents(self, texts):
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0]).tolist()
+        return [row for result in self._pool.map(self._embed_batch, batches) for row in result.tolist()]
+
+    def embed_query(self, text: str):
+        return self._embed_batch([text])[0].tolist()
+
+
+class HashingEmbeddings(LocalEmbeddings):
+    """
+    Feature-hashed bag of words and word bigrams, weighted 1 + log(tf) and
+    L2-normalised. No vocabulary or IDF table is fitted, so vectors never
+    depend on the rest of the corpus and incremental indexing stays valid;
+    stop words are dropped instead of being down-weighted by IDF.
+    """
+
+    def __init__(self, dimension: int = 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.dimension = dimension
+        self.backend_id = f"hashing-{dimension}"
+
+    def _features(self, text: str):
+        tokens = tokenize(text)
+        return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+    def _embed_batch(self, texts) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for feature, tf in self._features(text).items():
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                matrix[row, h % self.dimension] += (1.0 if h >> 63 else -1.0) * (1 + math.log(tf))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+class OnnxEmbeddings(LocalEmbeddings):
+    """Mean-pooled sentence embeddings from a local ONNX model (e.g. all-MiniLM-L6-v2)."""
+
+    def __init__(self, model_dir: str, max_length: int = 256, **kwargs):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("the onnx embedding backend needs `pip install onnxruntime tokenizers`") from e
+        super().__init__(**kwargs)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1  # Parallelism comes from the batch thread pool
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        self.backend_id = f"onnx-{os.path.basename(os.path.normpath(model_dir))}"
+
+    def _embed_batch(self, texts) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(list(texts))
+        ids = np.asarray([e.ids for e in encoded], dtype="int64")
+        mask = np.asarray([e.attention_mask for e in encoded], dtype="int64")
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feeds)[0]
+        pooled = (hidden * mask[..., None]).sum(axis=1) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+        return (pooled / np.linalg.norm(pooled, axis=1, keepdims=True)).astype("float32")
+
+
+def build_embeddings(backend: str, model: str = None, dimension: int = 1024, model_dir: str = None,
+                     batch_size: int = 32, workers: int = 4, check_ctx_length: bool = True):
+    """
+    Returns (embeddings, backend_id). The OpenAI backend's id is the bare
+    model name, so indexes and caches built before backends existed stay valid.
+    """
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings(
+            model=model,
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            check_embedding_ctx_length=check_ctx_length,
+        )
+        return embeddings, model
+    if backend == "hashing":
+        embeddings = HashingEmbeddings(dimension, batch_size=batch_size, workers=workers)
+    elif backend == "onnx":
+        embeddings = OnnxEmbeddings(model_dir, batch_size=batch_size, workers=workers)
+    else:
+        raise ValueError(f"unknown embedding backend {backend!r} (expected openai, hashing or onnx)")
+    return embeddings, embeddings.backend_id
@@ -0,0 +1,122 @@
+# -----------------------------
+# Query Embedding Cache
+# -----------------------------
+# Wraps any LangChain `Embeddings` object so that repeated questions do not
+# go back to the embedding API. Lookups go through a bounded in-memory LRU
+# first, then an optional SQLite file that every Streamlit worker shares.
+# Hits and misses are counted in travelpal_embedding_cache_total.
+import os, sqlite3, hashlib, threading
+from array import array
+from collections import OrderedDict
+
+from langchain_core.embeddings import Embeddings
+
+from logics.metrics import span, record_embedding_cache
+from logics.query_text import normalize_query
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with an LRU (and optional on-disk) cache for queries.
+    Document embeddings are passed straight through; they are already
+    persisted with the FAISS index.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, max_entries: int = 1024, db_path: str = None):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings "
+                    "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalize_query(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _disk_get(self, key: str):
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return array("f", row[0]).tolist() if row else None
+
+    def _disk_put(self, key: str, vector):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector) VALUES (?, ?)",
+                    (key, array("f", vector).tobytes()),
+                )
+        except sqlite3.Error:
+            pass  # The cache is an optimisation only
+
+    def embed_query(self, text: str):
+        key = self._key(text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                record_embedding_cache("memory_hit")
+                return vector
+
+        vector = self._disk_get(key)
+        if vector is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            record_embedding_cache("disk_hit")
+            self._remember(key, vector)
+            return vector
+
+        with span("embedding"):
+            vector = self.underlying.embed_query(text)
+        with self._lock:
+            self.misses += 1
+        record_embedding_cache("miss")
+        self._remember(key, vector)
+        self._disk_put(key, vector)
+        return vector
+
+    def embed_documents(self, texts):
+        return self.underlying.embed_documents(texts)
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters for monitoring."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._lru),
+            }
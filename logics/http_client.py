@@ -0,0 +1,85 @@
+# -----------------------------
+# Shared HTTP Clients
+# -----------------------------
+# One pooled client per process (sync) and per event loop (async), with
+# keep-alive, strict timeouts and a per-host concurrency limit, so tool calls
+# reuse connections instead of opening a new one for every request.
+import asyncio, threading, weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from logics.config import (
+    HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_PER_HOST_LIMIT,
+)
+
+TIMEOUT = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+LIMITS = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+    keepalive_expiry=30,
+)
+HEADERS = {"User-Agent": "TravelPal/1.0"}
+
+# -----------------------------
+# Sync client (Streamlit threads)
+# -----------------------------
+_client = None
+_client_lock = threading.Lock()
+_host_limits = {}
+
+
+def get_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(timeout=TIMEOUT, limits=LIMITS, headers=HEADERS, follow_redirects=True)
+        return _client
+
+
+def _host_limit(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    with _client_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(HTTP_PER_HOST_LIMIT)
+        return _host_limits[host]
+
+
+def http_get(url: str, **kwargs) -> httpx.Response:
+    with _host_limit(url):
+        return get_client().get(url, **kwargs)
+
+# -----------------------------
+# Async client (one per event loop)
+# -----------------------------
+_async_clients = weakref.WeakKeyDictionary()
+_async_host_limits = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS, headers=HEADERS, follow_redirects=True)
+        _async_clients[loop] = client
+    return client
+
+
+def _async_host_limit(url: str) -> asyncio.Semaphore:
+    limits = _async_host_limits.setdefault(asyncio.get_running_loop(), {})
+    host = urlsplit(url).netloc
+    if host not in limits:
+        limits[host] = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+    return limits[host]
+
+
+async def ahttp_get(url: str, **kwargs) -> httpx.Response:
+    async with _async_host_limit(url):
+        return await get_async_client().get(url, **kwargs)
+
+
+async def aclose_client():
+    """Closes the current event loop's client (call before the loop shuts down)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
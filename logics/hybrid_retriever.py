@@ -0,0 +1,140 @@
+# -----------------------------
+# Hybrid Lexical + Vector Retrieval
+# -----------------------------
+# A BM25 inverted index is built over the same chunks as the FAISS store.
+# Each query is scored lexically first; when the best chunk covers nearly
+# all of the query's informative terms (e.g. "chewing gum", "APEC card") the
+# lexical ranking is returned as-is and the embedding call is skipped.
+# Otherwise the BM25 and vector rankings are merged with reciprocal-rank
+# fusion, so exact-term matches and paraphrases both reach the top k.
+import math, threading
+from collections import Counter, defaultdict
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import Field
+from langchain_core.retrievers import BaseRetriever
+
+from logics.country_resolver import normalize_tokens
+from logics.metrics import record_retrieval
+
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been before being but by can could do does did for from
+get had has have how i if in into is it its may me my of on or our should so than that the their them then
+there these they this to was we were what when where which while who will with would you your
+""".split())
+
+
+def stem(token: str) -> str:
+    """Very light plural folding, so "vaporisers" matches "vaporiser"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str):
+    return [stem(t) for t in normalize_tokens(text) if t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, texts, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc, term frequency)]
+        self.lengths = []
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc, tf))
+        n = len(self.lengths)
+        self.avg_length = (sum(self.lengths) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self.max_idf = math.log(1 + (n + 0.5) / 0.5)
+
+    def search(self, query: str, k: int):
+        """
+        Returns ([(doc, score)] best first, coverage), where coverage is the
+        share of the query's IDF weight that the best document matches
+        (terms missing from the corpus count with the highest weight).
+        """
+        terms = set(tokenize(query))
+        scores = defaultdict(float)
+        matched = defaultdict(float)
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / self.avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+                matched[doc] += idf
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        total = sum(self.idf.get(t, self.max_idf) for t in terms)
+        coverage = matched[ranked[0][0]] / total if ranked and total else 0.0
+        return ranked, coverage
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60):
+    """Merges ranked id lists; each list contributes 1 / (k + rank)."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """Drop-in replacement for `vectorstore.as_retriever()` with BM25 + RRF."""
+
+    vectorstore: Any
+    bm25: Any
+    doc_ids: List[str]
+    k: int = 3
+    fetch_k: int = 10
+    rrf_k: int = 60
+    lexical_min_coverage: float = 0.8
+    lock: Any = Field(default_factory=threading.Lock)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs):
+        bm25, doc_ids = cls._lexical_index(vectorstore)
+        return cls(vectorstore=vectorstore, bm25=bm25, doc_ids=doc_ids, **kwargs)
+
+    @staticmethod
+    def _lexical_index(vectorstore):
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        texts = [vectorstore.docstore.search(i).page_content for i in doc_ids]
+        return BM25Index(texts), doc_ids
+
+    def swap(self, vectorstore):
+        """Points the retriever at a new store (after re-indexing), lexical index included."""
+        bm25, doc_ids = self._lexical_index(vectorstore)
+        with self.lock:
+            self.vectorstore, self.bm25, self.doc_ids = vectorstore, bm25, doc_ids
+
+    def _vector_ranking(self, vectorstore, query: str):
+        vector = np.asarray([vectorstore.embeddings.embed_query(query)], dtype="float32")
+        _, ids = vectorstore.index.search(vector, self.fetch_k)
+        return [vectorstore.index_to_docstore_id[i] for i in ids[0] if i != -1]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with self.lock:
+            vectorstore, bm25, doc_ids = self.vectorstore, self.bm25, self.doc_ids
+
+        ranked, coverage = bm25.search(query, self.fetch_k)
+        lexical = [doc_ids[doc] for doc, _ in ranked]
+        if len(lexical) >= self.k and coverage >= self.lexical_min_coverage:
+            record_retrieval("lexical")
+            ids = lexical[:self.k]
+        else:
+            record_retrieval("hybrid")
+            ids = reciprocal_rank_fusion([lexical, self._vector_ranking(vectorstore, query)], self.rrf_k)[:self.k]
+        return [vectorstore.docstore.search(i) for i in ids]
@@ -0,0 +1,323 @@
+# -----------------------------
+# Persistent FAISS index store
+# -----------------------------
+# The TravelPal vector index is saved to disk, one immutable version per
+# state of the source documents, in a folder keyed by the splitter
+# settings and the embedding backend. A CURRENT file names the version in use
+# and is replaced atomically, so readers always see a complete index.
+#
+# Every chunk is identified by a hash of its content, and the FAISS index
+# uses those hashes as ids (IndexIDMap2). When the sources change, only
+# the added or edited chunks are embedded; removed chunks are deleted by id
+# and everything else is reused from the previous version.
+#
+# The index layout is a faiss.index_factory string: "Flat" (exact search),
+# "HNSW32" (graph), "IVF1024,PQ32" (inverted lists over product-quantized
+# codes), optionally after a "PCA256," dimensionality reduction. Layouts
+# that need training buffer the first vectors until enough have arrived.
+import os, json, shutil, hashlib, logging
+
+import faiss
+import numpy as np
+from langchain_community.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+INDEX_FILE = "index.faiss"
+DOCS_FILE = "docs.json"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+
+logger = logging.getLogger("travelpal.index")
+
+
+def file_sha256(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def settings_key(chunk_size: int, chunk_overlap: int, model: str, index_spec: str = "Flat") -> str:
+    """Key for the settings that make saved vectors incompatible when changed."""
+    settings = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "model": model}
+    if index_spec != "Flat":
+        settings["index"] = index_spec  # Flat keeps the key it had before layouts were configurable
+    payload = json.dumps(settings, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_id(doc: Document) -> int:
+    """Stable 63-bit FAISS id derived from the chunk's text and metadata."""
+    raw = doc.page_content + "\0" + json.dumps(doc.metadata, sort_keys=True)
+    digest = hashlib.sha256(raw.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little") & ((1 << 63) - 1)
+
+
+# -----------------------------
+# Building & incremental updates
+# -----------------------------
+def _faiss_ids(index) -> list:
+    """FAISS ids in storage order (positions for indexes without an id map)."""
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.vector_to_array(index.id_map).tolist()
+    return list(range(index.ntotal))
+
+
+def _has_id_map(vectorstore: FAISS) -> bool:
+    return isinstance(vectorstore.index, faiss.IndexIDMap2)
+
+
+def make_index(dimension: int, spec: str = "Flat"):
+    """An empty id-mapped index with the given faiss.index_factory layout."""
+    return faiss.IndexIDMap2(faiss.index_factory(dimension, spec))
+
+
+def tune_index(index, nprobe: int = None, ef_search: int = None):
+    """Sets the search-time speed/recall knobs (IVF nprobe, HNSW efSearch) the index has."""
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if value:
+            try:
+                params.set_index_parameter(index, name, value)
+            except RuntimeError:
+                pass  # Not this layout's knob (e.g. Flat, or a flat fallback)
+
+
+def _train_and_add(index, pending):
+    """
+    Trains `index` on the buffered (ids, vectors) batches and adds them.
+    Too few vectors to train the layout (e.g. fewer than the IVF lists or
+    PQ centroids) falls back to a flat index.
+    """
+    ids = np.concatenate([i for i, _ in pending])
+    vectors = np.concatenate([v for _, v in pending])
+    try:
+        index.train(vectors)
+    except RuntimeError:
+        logger.warning("%d vectors are too few to train the index; using a flat index", len(vectors))
+        index = make_index(vectors.shape[1])
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+def _rebuild_without(index, removed):
+    """
+    Re-adds every vector except `removed` to an emptied copy of `index`,
+    for layouts that cannot delete in place (HNSW graphs).
+    """
+    ids = faiss.vector_to_array(index.id_map)
+    vectors = index.index.reconstruct_n(0, index.ntotal)
+    keep = ~np.isin(ids, np.asarray(removed, dtype="int64"))
+    inner = faiss.clone_index(index.index)
+    inner.reset()  # Keeps any trained transform or quantizer
+    fresh = faiss.IndexIDMap2(inner)
+    fresh.add_with_ids(vectors[keep], ids[keep])
+    return fresh
+
+
+def _copy_index(index, index_spec: str, train_size: int):
+    """
+    A modifiable copy of `index`. Memory-mapped IVF lists (OnDiskInvertedLists)
+    cannot be cloned, so such an index is rebuilt from its reconstructed
+    vectors instead (approximate for quantized layouts, but no re-embedding).
+    """
+    try:
+        return faiss.clone_index(index)
+    except RuntimeError:
+        logger.warning("cannot copy a memory-mapped %s index; rebuilding it from its stored vectors", index_spec)
+    ids = faiss.vector_to_array(index.id_map)
+    vectors = index.index.reconstruct_n(0, index.ntotal)
+    fresh = make_index(vectors.shape[1], index_spec)
+    try:
+        fresh.train(vectors[:train_size])
+    except RuntimeError:
+        fresh = make_index(vectors.shape[1])
+    fresh.add_with_ids(vectors, ids)
+    return fresh
+
+
+def batched(iterable, size: int):
+    """Yields lists of up to `size` items without materialising `iterable`."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def update_index(previous, chunks, embeddings, embed_batches=None, batch_size: int = 256,
+                 index_spec: str = "Flat", train_size: int = 20000):
+    """
+    Builds an index for `chunks` (any iterable), reusing the vectors of
+    unchanged chunks in `previous` (a FAISS store from an earlier version, or
+    None). New chunks are embedded in batches and appended as each batch
+    comes back; `embed_batches` may replace the default blocking call with
+    e.g. a concurrent one (it maps batches of (id, doc) pairs to
+    (batch, vectors) pairs). A new index uses the `index_spec` layout and
+    is trained on the first `train_size` vectors. Returns the new store and
+    {"added", "removed", "reused"} counts. `previous` itself is not modified,
+    so it can keep serving until the new store is swapped in (load it with
+    load_index(..., mmap=False) to avoid copying an IVF index the slow way).
+    """
+    if previous is not None and _has_id_map(previous):
+        index = _copy_index(previous.index, index_spec, train_size)
+        old_ids = set(_faiss_ids(index))
+    else:
+        index, old_ids = None, set()
+
+    wanted = {}
+
+    def new_chunks():
+        for doc in chunks:
+            i = chunk_id(doc)
+            if i not in wanted:
+                wanted[i] = doc
+                if i not in old_ids:
+                    yield i, doc
+
+    if embed_batches is None:
+        embed_batches = lambda batches: (
+            (batch, embeddings.embed_documents([doc.page_content for _, doc in batch])) for batch in batches
+        )
+
+    added, pending = 0, []  # pending: batches held back until the index is trained
+    for batch, vectors in embed_batches(batched(new_chunks(), batch_size)):
+        vectors = np.asarray(vectors, dtype="float32")
+        ids = np.asarray([i for i, _ in batch], dtype="int64")
+        if index is None:
+            index = make_index(vectors.shape[1], index_spec)
+        if index.is_trained:
+            index.add_with_ids(vectors, ids)
+        else:
+            pending.append((ids, vectors))
+            if sum(len(i) for i, _ in pending) >= train_size:
+                index, pending = _train_and_add(index, pending), []
+        added += len(batch)
+    if pending:
+        index = _train_and_add(index, pending)
+
+    removed = [i for i in old_ids if i not in wanted]
+    if removed:
+        try:
+            index.remove_ids(np.asarray(removed, dtype="int64"))
+        except RuntimeError:
+            index = _rebuild_without(index, removed)
+    if index is None:
+        raise ValueError("cannot build an index without any chunks")
+
+    index_to_docstore_id = {i: f"{i:016x}" for i in wanted}
+    docstore = InMemoryDocstore({f"{i:016x}": doc for i, doc in wanted.items()})
+    stats = {"added": added, "removed": len(removed), "reused": len(wanted) - added}
+    return FAISS(embeddings, index, docstore, index_to_docstore_id), stats
+
+
+# -----------------------------
+# Saving & loading versions
+# -----------------------------
+def save_index(vectorstore: FAISS, directory: str, meta: dict = None):
+    """
+    Writes the FAISS index and its chunks to `directory`.
+    The files are written to a temporary folder first and renamed into place,
+    so concurrent workers never see a half-written index.
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    faiss.write_index(vectorstore.index, os.path.join(tmp_dir, INDEX_FILE))
+
+    docs = []
+    for faiss_id in _faiss_ids(vectorstore.index):
+        doc_id = vectorstore.index_to_docstore_id[faiss_id]
+        doc = vectorstore.docstore.search(doc_id)
+        docs.append({"faiss_id": faiss_id, "id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata})
+    with open(os.path.join(tmp_dir, DOCS_FILE), "w", encoding="utf-8") as f:
+        json.dump(docs, f, ensure_ascii=False)
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta or {}, f, sort_keys=True)
+
+    try:
+        os.rename(tmp_dir, directory)
+    except OSError:
+        # Another worker finished the same index first; keep theirs.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_meta(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_index(directory: str, embeddings, backend: str = None, mmap: bool = True):
+    """
+    Memory-maps a saved index (or reads it into memory with mmap=False, for
+    an index that update_index will copy). Returns None if nothing usable is
+    on disk, including an index built by a different embedding backend than
+    `backend`.
+    """
+    index_path = os.path.join(directory, INDEX_FILE)
+    docs_path = os.path.join(directory, DOCS_FILE)
+    if not (os.path.exists(index_path) and os.path.exists(docs_path)):
+        return None
+
+    if backend is not None:
+        meta = read_meta(directory)
+        # Indexes saved before backends existed record the OpenAI model name
+        built_by = meta.get("embedding_backend", meta.get("embedding_model"))
+        if built_by != backend:
+            logger.warning("ignoring index %s: built by embedding backend %r, expected %r", directory, built_by, backend)
+            return None
+
+    try:
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY) if mmap else faiss.read_index(index_path)
+    except RuntimeError:
+        index = faiss.read_index(index_path)
+
+    with open(docs_path, encoding="utf-8") as f:
+        docs = json.load(f)
+    if len(docs) != index.ntotal:
+        return None
+
+    docstore = InMemoryDocstore(
+        {d["id"]: Document(page_content=d["page_content"], metadata=d["metadata"]) for d in docs}
+    )
+    index_to_docstore_id = {d.get("faiss_id", pos): d["id"] for pos, d in enumerate(docs)}
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def read_current(root: str):
+    """Returns the name of the version in use under `root`, or None."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_current(root: str, version: str, keep: int = KEEP_VERSIONS):
+    """Atomically points CURRENT at `version` and prunes older versions."""
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+    # Already-open (memory-mapped) indexes keep working after their folder is removed
+    versions = [
+        os.path.join(root, name) for name in os.listdir(root)
+        if name != version and os.path.isdir(os.path.join(root, name)) and ".tmp-" not in name
+    ]
+    versions.sort(key=os.path.getmtime, reverse=True)
+    for path in versions[keep - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,268 @@
+# -----------------------------
+# Knowledge Base Ingestion Pipeline
+# -----------------------------
+# Streams many sources (docx, PDF, saved HTML pages) into the TravelPal
+# index through a chain of generators:
+#
+#   travelpal_sources -> parse -> clean -> chunk -> embed (batched, concurrent) -> append
+#
+# Nothing is materialised between stages, at most `concurrency` embedding
+# batches are in flight, and each batch is appended to the FAISS index as it
+# comes back, so memory stays bounded by the batch size rather than the
+# corpus. Unchanged chunks are reused from the previous index version (see
+# index_store.update_index).
+#
+# Usage:
+#   python -m logics.ingest [--batch-size 64] [--concurrency 4] [--fetch]
+#
+# --fetch first saves the official ICA/MFA pages below into the knowledge
+# folder as HTML.
+import os, re, sys, time, logging, argparse, hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+from langchain_core.documents import Document
+
+from logics.config import (
+    RAG_PATH, KNOWLEDGE_DIR, CHUNK_SIZE, CHUNK_OVERLAP, INGEST_BATCH_SIZE, INGEST_CONCURRENCY,
+    INDEX_FACTORY, INDEX_TRAIN_SIZE,
+)
+from logics.index_store import file_sha256, update_index
+
+logger = logging.getLogger("travelpal.ingest")
+
+SOURCE_TYPES = (".docx", ".pdf", ".html", ".htm")
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+
+# The pages the TravelPal tool answers from
+OFFICIAL_PAGES = [
+    "https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/Travel-Tips",
+    "https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/I-Need-Help-Overseas",
+    "https://www.ica.gov.sg/enter-transit-depart/entering-singapore/what-you-can-bring/prohibited-controlled-dutiable-goods",
+    "https://www.ica.gov.sg/enter-depart/for-singapore-citizens/advice-for-travelling-abroad",
+    "https://www.ica.gov.sg/enter-depart/for-singapore-citizens/apec-business-travel-card",
+]
+
+
+# -----------------------------
+# Sources
+# -----------------------------
+def travelpal_sources(rag_path: str = RAG_PATH, knowledge_dir: str = KNOWLEDGE_DIR):
+    """The main RAG document plus every supported file in the knowledge folder."""
+    sources = [rag_path] if os.path.exists(rag_path) else []
+    if os.path.isdir(knowledge_dir):
+        for root, _, files in os.walk(knowledge_dir):
+            sources.extend(
+                os.path.join(root, name) for name in sorted(files) if name.lower().endswith(SOURCE_TYPES)
+            )
+    return sources
+
+
+def sources_version(sources) -> str:
+    """Changes whenever any source is added, removed or edited."""
+    h = hashlib.sha256()
+    for path in sorted(sources):
+        h.update(f"{os.path.basename(path)}\0{file_sha256(path)}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+# -----------------------------
+# Parse (one Document per paragraph / block)
+# -----------------------------
+def parse_docx(path: str):
+    from docx import Document as DocxDocument
+
+    for p in DocxDocument(path).paragraphs:
+        yield p.text, URL_PATTERN.findall(p.text)
+
+
+def parse_pdf(path: str):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("skipping %s: install pypdf to ingest PDF files", path)
+        return
+    for page in PdfReader(path).pages:
+        text = page.extract_text() or ""
+        for block in re.split(r"\n\s*\n", text):
+            yield block, URL_PATTERN.findall(block)
+
+
+def parse_html(path: str):
+    from bs4 import BeautifulSoup
+
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "form", "noscript"]):
+        tag.decompose()
+
+    # Saved pages cite their own URL, like the links inside the docx paragraphs
+    canonical = soup.find("link", rel="canonical") or soup.find("meta", property="og:url")
+    page_url = canonical and (canonical.get("href") or canonical.get("content"))
+    for block in soup.find_all(["h1", "h2", "h3", "h4", "p", "li", "td"]):
+        if block.find(["p", "li", "td"]):
+            continue  # Its text is yielded by the nested blocks
+        text = block.get_text(" ", strip=True)
+        urls = URL_PATTERN.findall(text) or ([page_url] if page_url else [])
+        yield text, urls
+
+
+PARSERS = {".docx": parse_docx, ".pdf": parse_pdf, ".html": parse_html, ".htm": parse_html}
+
+
+def parse(sources):
+    for path in sources:
+        parser = PARSERS.get(os.path.splitext(path)[1].lower())
+        if parser is None:
+            continue
+        try:
+            for text, urls in parser(path):
+                yield Document(page_content=text, metadata={"urls": urls, "source": os.path.basename(path)})
+        except Exception:
+            logger.exception("failed to parse %s; skipping it", path)
+
+
+# -----------------------------
+# Clean & Chunk
+# -----------------------------
+def clean(documents):
+    """Normalises whitespace and drops empty blocks and per-source repeats (menus, banners)."""
+    seen = set()
+    for doc in documents:
+        text = re.sub(r"\s+", " ", doc.page_content).strip()
+        key = (doc.metadata["source"], text)
+        if len(text) < 3 or key in seen:
+            continue
+        seen.add(key)
+        yield Document(page_content=text, metadata=doc.metadata)
+
+
+def chunk(documents, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for doc in documents:
+        yield from splitter.split_documents([doc])
+
+
+# -----------------------------
+# Embed (batched, concurrent, with retries)
+# -----------------------------
+def concurrent_embedder(embeddings, concurrency: int = INGEST_CONCURRENCY, attempts: int = 5):
+    """
+    Returns an `embed_batches` function for update_index that keeps up to
+    `concurrency` batches in flight, retries failed calls with exponential
+    backoff, and yields results in input order.
+    """
+    @retry(stop=stop_after_attempt(attempts), wait=wait_exponential_jitter(initial=1, max=30), reraise=True)
+    def embed(texts):
+        return embeddings.embed_documents(texts)
+
+    def embed_batches(batches):
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest-embed") as pool:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append((batch, pool.submit(embed, [doc.page_content for _, doc in batch])))
+                if len(in_flight) >= concurrency:
+                    done, future = in_flight.popleft()
+                    yield done, future.result()
+            while in_flight:
+                done, future = in_flight.popleft()
+                yield done, future.result()
+
+    return embed_batches
+
+
+def peak_rss_mb() -> float:
+    import psutil
+
+    info = psutil.Process().memory_info()
+    if hasattr(info, "peak_wset"):
+        return info.peak_wset / (1024 * 1024)  # Windows
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        return info.rss / (1024 * 1024)  # No peak reported; the current size
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Counted:
+    """Passes items through while counting them."""
+
+    def __init__(self, iterable):
+        self.iterable = iterable
+        self.count = 0
+
+    def __iter__(self):
+        for item in self.iterable:
+            self.count += 1
+            yield item
+
+
+def ingest(sources, embeddings, previous=None, batch_size: int = INGEST_BATCH_SIZE, concurrency: int = INGEST_CONCURRENCY,
+           index_spec: str = INDEX_FACTORY):
+    """
+    Runs the whole pipeline and returns (vectorstore, stats). Stats include
+    documents/sec (parsed paragraphs or blocks per second) and peak RSS.
+    """
+    started = time.perf_counter()
+    documents = Counted(clean(parse(sources)))
+    chunks = Counted(chunk(documents))
+    vectorstore, stats = update_index(
+        previous, chunks, embeddings,
+        embed_batches=concurrent_embedder(embeddings, concurrency),
+        batch_size=batch_size,
+        index_spec=index_spec,
+        train_size=INDEX_TRAIN_SIZE,
+    )
+    seconds = time.perf_counter() - started
+    stats.update({
+        "sources": len(sources),
+        "documents": documents.count,
+        "chunks": chunks.count,
+        "seconds": round(seconds, 3),
+        "documents_per_second": round(documents.count / seconds, 1) if seconds else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    })
+    return vectorstore, stats
+
+
+# -----------------------------
+# Command line
+# -----------------------------
+def fetch_official_pages(knowledge_dir: str = KNOWLEDGE_DIR):
+    """Saves the official ICA/MFA pages as HTML for ingestion."""
+    from logics.http_client import http_get
+
+    os.makedirs(knowledge_dir, exist_ok=True)
+    for url in OFFICIAL_PAGES:
+        r = http_get(url)
+        r.raise_for_status()
+        # Record where the page came from, for the reference URLs in answers
+        html = f'<link rel="canonical" href="{url}">\n{r.text}'
+        name = re.sub(r"[^a-z0-9]+", "-", url.split("://", 1)[1].lower()).strip("-") + ".html"
+        with open(os.path.join(knowledge_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"saved {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the TravelPal knowledge base into the vector index.")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Chunks per embedding request")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY, help="Embedding requests in flight")
+    parser.add_argument("--fetch", action="store_true", help="Save the official ICA/MFA pages first")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_official_pages()
+
+    from logics.llm import load_travelpal_index
+    _, version, stats = load_travelpal_index(batch_size=args.batch_size, concurrency=args.concurrency)
+    print(f"index version {version}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,15 @@
 # -----------------------------
 # Imports
 # -----------------------------
-import os, re, requests
-from datetime import datetime
-from bs4 import BeautifulSoup
-
-import streamlit as st
-from docx import Document as DocxDocument
+# Only light modules are imported here. LangChain, FAISS and the OpenAI
+# clients are imported inside the lazy getters below, so importing this
+# module (e.g. from Home.py to start the warm-up thread) stays cheap.
+import time
+_IMPORT_STARTED = time.perf_counter()
 
-from langchain.docstore.document import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import FAISS
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.chains import RetrievalQA
-from langchain.chat_models import ChatOpenAI
-from langchain.agents import Tool, initialize_agent
-from langchain.prompts import PromptTemplate
+import os, re, asyncio, logging, threading
+from datetime import datetime
+import httpx
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -23,84 +17,253 @@ load_dotenv()
 # -----------------------------
 # Base Directories & Paths
 # -----------------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-RAG_PATH = os.path.join(BASE_DIR, "TravelPal RAG document.docx")
+from logics.config import (
+    BASE_DIR, RAG_PATH, INDEX_DIR, RAG_REFRESH_INTERVAL, INGEST_BATCH_SIZE, INGEST_CONCURRENCY,
+    EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_CTX_CHECK, HASHING_DIM, ONNX_MODEL_DIR,
+    LOCAL_EMBEDDING_BATCH_SIZE, LOCAL_EMBEDDING_WORKERS, CHUNK_SIZE, CHUNK_OVERLAP, RETRIEVAL_K,
+    RETRIEVAL_MODE, RETRIEVAL_FETCH_K, RRF_K, LEXICAL_MIN_COVERAGE,
+    INDEX_FACTORY, INDEX_NPROBE, INDEX_EF_SEARCH, CONTEXT_TOKEN_BUDGET,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DB,
+    ADVISORY_DB, ADVISORY_TTL, ADVISORY_RETRY_SECONDS, PREWARM_MFA, MFA_BASE_URL,
+    SPACY_FALLBACK, CLIMATOLOGY_AUTO_BUILD,
+    ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL, ANSWER_CACHE_SIZE,
+    ROUTER_ENABLED, ROUTER_MIN_SIMILARITY, ROUTER_MIN_MARGIN,
+    MEMORY_TOKEN_BUDGET, MEMORY_KEEP_TURNS, MEMORY_SUMMARY_TOKENS,
+)
+from logics.startup import lazy_service, record_import, record_first_answer, startup_profile
+from logics.metrics import span, traced, record_route, record_router_savings
+from logics.single_flight import coalesce, acoalesce, coalesced
+from logics.mfa_countries import MFA_COUNTRY_MAP
+from logics.country_resolver import CountryResolver, ALIASES
+from logics.advisory_cache import AdvisoryCache
+from logics.mfa_crawler import match_sections, prewarm_in_background, rebase, SECTION_LABELS
+
+logger = logging.getLogger("travelpal.llm")
 
 # -----------------------------
 # Helper: Extract Country
 # -----------------------------
-import spacy
-nlp = spacy.load("en_core_web_sm")
+# Gazetteer built once from MFA_COUNTRY_MAP; spaCy is only loaded as a fallback
+country_resolver = CountryResolver(MFA_COUNTRY_MAP, spacy_fallback=SPACY_FALLBACK)
 
+@traced("extract_country")
 def extract_country(query: str):
-    doc = nlp(query)
-    countries = [ent.text for ent in doc.ents if ent.label_ == "GPE"]
-    return countries[0] if countries else None
+    return country_resolver.resolve(query)
 
 # -----------------------------
-# TravelPal RAG Loader
+# Metrics Callback
 # -----------------------------
-@st.cache_resource(show_spinner=False)
-def load_travelpal_rag(path=RAG_PATH):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"TravelPal RAG document not found at {path}")
-    doc = DocxDocument(path)
+# Times every LLM turn and vector search and counts LLM tokens
+@lazy_service
+def get_metrics_handler():
+    from logics.metrics_callbacks import MetricsCallbackHandler
+    return MetricsCallbackHandler()
 
-    documents = []
-    for p in doc.paragraphs:
-        text = p.text.strip()
-        if not text:
-            continue
-        urls = re.findall(r'https?://[^\s]+', text)
-        documents.append(Document(page_content=text, metadata={"urls": urls}))
+# -----------------------------
+# Embeddings (with query cache)
+# -----------------------------
+@lazy_service
+def get_embeddings():
+    from logics.embedding_backends import build_embeddings
+    from logics.embedding_cache import CachedQueryEmbeddings
+
+    embeddings, backend_id = build_embeddings(
+        EMBEDDING_BACKEND,
+        model=EMBEDDING_MODEL,
+        dimension=HASHING_DIM,
+        model_dir=ONNX_MODEL_DIR,
+        batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+        workers=LOCAL_EMBEDDING_WORKERS,
+        check_ctx_length=EMBEDDING_CTX_CHECK,
+    )
+    # model_name keys the query cache and the index folder by backend
+    return CachedQueryEmbeddings(
+        embeddings,
+        model_name=backend_id,
+        max_entries=EMBEDDING_CACHE_SIZE,
+        db_path=EMBEDDING_CACHE_DB or None,
+    )
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    split_docs = text_splitter.split_documents(documents)
+# -----------------------------
+# TravelPal RAG Loader
+# -----------------------------
+def load_travelpal_index(sources=None, previous=None, batch_size: int = None, concurrency: int = None):
+    """
+    Returns (vectorstore, version, stats) for the sources as they are now
+    (default: the RAG document plus the knowledge folder). A version already
+    on disk is memory-mapped (stats is None); otherwise the ingestion
+    pipeline embeds only the chunks that differ from `previous` (or the
+    version in CURRENT, read into memory since update_index copies it).
+    """
+    from logics.index_store import settings_key, save_index, load_index, read_current, write_current, tune_index
+    from logics.ingest import travelpal_sources, sources_version, ingest
+
+    sources = travelpal_sources() if sources is None else sources
+    if not sources:
+        raise FileNotFoundError(f"TravelPal RAG document not found at {RAG_PATH}")
+    embeddings = get_embeddings()
+
+    backend = embeddings.model_name
+    root = os.path.join(INDEX_DIR, settings_key(CHUNK_SIZE, CHUNK_OVERLAP, backend, INDEX_FACTORY))
+    version = sources_version(sources)
+    vectorstore, stats = load_index(os.path.join(root, version), embeddings, backend), None
+    if vectorstore is None:
+        if previous is None:
+            current = read_current(root)
+            previous = load_index(os.path.join(root, current), embeddings, backend, mmap=False) if current else None
+        vectorstore, stats = ingest(
+            sources, embeddings, previous,
+            batch_size=batch_size or INGEST_BATCH_SIZE,
+            concurrency=concurrency or INGEST_CONCURRENCY,
+        )
+        save_index(vectorstore, os.path.join(root, version), meta={
+            "sources": [os.path.basename(p) for p in sources],
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "embedding_backend": backend,
+            "index_factory": INDEX_FACTORY,
+            **stats,
+        })
+        logger.info("indexed %d sources: %s", len(sources), stats)
+    if read_current(root) != version:
+        write_current(root, version)
+    tune_index(vectorstore.index, nprobe=INDEX_NPROBE, ef_search=INDEX_EF_SEARCH)
+    return vectorstore, version, stats
+
+def load_travelpal_rag(sources=None):
+    vectorstore, version, _ = load_travelpal_index(sources)
+    _rag_state["version"] = version
+    if RETRIEVAL_MODE == "vector":
+        return vectorstore.as_retriever(search_kwargs={"k": RETRIEVAL_K})
+
+    # BM25 over the same chunks, fused with the vector ranking; strongly
+    # lexical questions skip the embedding call
+    from logics.hybrid_retriever import HybridRetriever
+    return HybridRetriever.from_vectorstore(
+        vectorstore,
+        k=RETRIEVAL_K,
+        fetch_k=RETRIEVAL_FETCH_K,
+        rrf_k=RRF_K,
+        lexical_min_coverage=LEXICAL_MIN_COVERAGE,
+    )
 
-    embeddings = OpenAIEmbeddings(api_key=os.environ.get("OPENAI_API_KEY"))
-    vectorstore = FAISS.from_documents(split_docs, embeddings)
-    return vectorstore.as_retriever(search_kwargs={"k": 3})
+@lazy_service
+def get_retriever():
+    return load_travelpal_rag()
 
-travelpal_retriever = load_travelpal_rag()
+# -----------------------------
+# Refreshing the RAG Index
+# -----------------------------
+# Edits to the sources are picked up without a restart: the changed chunks
+# are re-embedded into a new version while the old one keeps serving, then
+# the retriever (shared with the QA chain) is pointed at the new store.
+_rag_state = {"version": None, "signature": None}
+_refresh_lock = threading.Lock()
+
+def travelpal_index_version():
+    """The index version being served (None until the retriever is built)."""
+    return _rag_state["version"]
+
+def refresh_travelpal_index() -> bool:
+    """Re-indexes the sources if they changed. Returns True if a new version was swapped in."""
+    from logics.ingest import travelpal_sources, sources_version
+
+    if not get_retriever.is_built():
+        return False  # The first build will read the current sources anyway
+    with _refresh_lock:
+        sources = travelpal_sources()
+        if not sources or sources_version(sources) == _rag_state["version"]:
+            return False
+        retriever = get_retriever()
+        # The served store is memory-mapped; the update starts from CURRENT read into memory
+        vectorstore, version, _ = load_travelpal_index(sources)
+        if hasattr(retriever, "swap"):
+            retriever.swap(vectorstore)  # Rebuilds the BM25 index too
+        else:
+            retriever.vectorstore = vectorstore
+        _rag_state["version"] = version
+    return True
+
+def _sources_signature():
+    from logics.ingest import travelpal_sources
+    return [(p, os.path.getmtime(p)) for p in travelpal_sources()]
+
+def watch_travelpal_sources(interval: float = RAG_REFRESH_INTERVAL):
+    """Polls the sources' mtimes in a daemon thread and refreshes the index on change."""
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                signature = _sources_signature()
+                if signature != _rag_state["signature"]:
+                    _rag_state["signature"] = signature
+                    refresh_travelpal_index()
+            except Exception:
+                logger.exception("refreshing the TravelPal index failed; still serving the previous version")
+
+    if interval > 0:
+        _rag_state["signature"] = _sources_signature()
+        threading.Thread(target=watch, name="travelpal-index-watch", daemon=True).start()
 
 # -----------------------------
 # LLM Setup
 # -----------------------------
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.4,
-    api_key=os.environ.get("OPENAI_API_KEY")
-)
+@lazy_service
+def get_llm():
+    from langchain.chat_models import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0.4,
+        streaming=True,
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        callbacks=[get_metrics_handler()],
+    )
 
-prompt = PromptTemplate(
-    template=(
-        "Answer the question ONLY using the information provided in the context below. "
-        "Do NOT use your own knowledge or assume anything.\n\n"
-        "Context:\n{context}\n\nQuestion: {question}\nAnswer:"
-    ),
-    input_variables=["context", "question"]
+PROMPT_TEMPLATE = (
+    "Answer the question ONLY using the information provided in the context below. "
+    "Do NOT use your own knowledge or assume anything.\n\n"
+    "Context:\n{context}\n\nQuestion: {question}\nAnswer:"
 )
 
 # -----------------------------
 # TravelPal Tool
 # -----------------------------
-def travelpal_tool_func(query: str):
-    # Run RetrievalQA
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=travelpal_retriever,
+# Built once: the chain retrieves the top-k chunks a single time and returns
+# them alongside the answer, so the reference URLs come from the same search.
+@lazy_service
+def get_qa_chain():
+    from langchain.chains import RetrievalQA
+    from langchain.prompts import PromptTemplate
+
+    prompt = PromptTemplate(template=PROMPT_TEMPLATE, input_variables=["context", "question"])
+    retriever = get_retriever()
+    if CONTEXT_TOKEN_BUDGET > 0:
+        # Only the sentences that match the question, within the token budget
+        from langchain.retrievers import ContextualCompressionRetriever
+        from logics.context_packer import ContextPacker
+
+        retriever = ContextualCompressionRetriever(
+            base_compressor=ContextPacker(token_budget=CONTEXT_TOKEN_BUDGET),
+            base_retriever=retriever,
+        )
+    return RetrievalQA.from_chain_type(
+        llm=get_llm(),
+        retriever=retriever,
         chain_type="stuff",
-        chain_type_kwargs={"prompt": prompt}
+        chain_type_kwargs={"prompt": prompt},
+        return_source_documents=True,
     )
-    answer = qa_chain.run(query)
+
+def format_travelpal_answer(result: dict) -> str:
+    answer = result["result"]
 
     # Collect relevant URLs from the retrieved documents
-    docs = travelpal_retriever.get_relevant_documents(query)
     urls = []
-    for d in docs:
+    for d in result["source_documents"]:
         if "urls" in d.metadata:
             urls.extend(d.metadata["urls"])
-    urls = list(set(urls))  # Remove duplicates
+    urls = list(dict.fromkeys(urls))  # Remove duplicates, keep order
 
     # Make URLs clickable in Markdown
     if urls:
@@ -109,306 +272,487 @@ def travelpal_tool_func(query: str):
 
     return answer
 
-
-travelpal_tool = Tool(
-    name="TravelPal Singapore Policies",
-    func=travelpal_tool_func,
-    description=(
-        "Use this tool to answer Singapore travel-related questions. "
-        "You must retrieve information from the following official sources:\n"
-        "- Travel Tips from MFA (before travelling and while already overseas): https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/Travel-Tips\n"
-        "- MFA Assistance for Singaporeans Overseas (how to get help abroad): https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/I-Need-Help-Overseas\n"
-        "- ICA Guidelines on Prohibited, Controlled, and Dutiable Goods when entering Singapore: https://www.ica.gov.sg/enter-transit-depart/entering-singapore/what-you-can-bring/prohibited-controlled-dutiable-goods\n"
-        "- ICA advice for Singapore citizens travelling abroad or returning to Singapore: https://www.ica.gov.sg/enter-depart/for-singapore-citizens/advice-for-travelling-abroad\n"
-        "- APEC Business Travel Card information: https://www.ica.gov.sg/enter-depart/for-singapore-citizens/apec-business-travel-card\n\n"
-        "Instructions for the tool output:\n"
-        "1. Summarise information from the relevant sources to answer the user's question.\n"
-        "2. Include the specific reference URL(s) used in the answer.\n"
-        "3. Do NOT tell the user to refer to TravelPal policies.\n"
-        "4. Provide a clear, concise, and factual response.\n"
-    ),
+# Passing the handler here (not only to the LLM) lets it see the retriever run
+@traced("travelpal_tool")
+@coalesced("travelpal_tool")
+def travelpal_tool_func(query: str):
+    return format_travelpal_answer(get_qa_chain()({"query": query}, callbacks=[get_metrics_handler()]))
+
+@traced("travelpal_tool")
+@coalesced("travelpal_tool")
+async def atravelpal_tool_func(query: str):
+    return format_travelpal_answer(await get_qa_chain().acall({"query": query}, callbacks=[get_metrics_handler()]))
+
+TRAVELPAL_TOOL_DESCRIPTION = (
+    "Use this tool to answer Singapore travel-related questions. "
+    "You must retrieve information from the following official sources:\n"
+    "- Travel Tips from MFA (before travelling and while already overseas): https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/Travel-Tips\n"
+    "- MFA Assistance for Singaporeans Overseas (how to get help abroad): https://www.mfa.gov.sg/Consular-Services/Singapore-Citizens/I-Need-Help-Overseas\n"
+    "- ICA Guidelines on Prohibited, Controlled, and Dutiable Goods when entering Singapore: https://www.ica.gov.sg/enter-transit-depart/entering-singapore/what-you-can-bring/prohibited-controlled-dutiable-goods\n"
+    "- ICA advice for Singapore citizens travelling abroad or returning to Singapore: https://www.ica.gov.sg/enter-depart/for-singapore-citizens/advice-for-travelling-abroad\n"
+    "- APEC Business Travel Card information: https://www.ica.gov.sg/enter-depart/for-singapore-citizens/apec-business-travel-card\n\n"
+    "Instructions for the tool output:\n"
+    "1. Summarise information from the relevant sources to answer the user's question.\n"
+    "2. Include the specific reference URL(s) used in the answer.\n"
+    "3. Do NOT tell the user to refer to TravelPal policies.\n"
+    "4. Provide a clear, concise, and factual response.\n"
 )
 
 # -----------------------------
 # MFA Tool
 # -----------------------------
+# Advisory titles are cached per country and revalidated with ETag/Last-Modified.
+# Pages crawled by logics/mfa_crawler.py also provide structured sections.
+@lazy_service
+def get_advisory_cache():
+    cache = AdvisoryCache(ADVISORY_DB, ttl_seconds=ADVISORY_TTL, retry_seconds=ADVISORY_RETRY_SECONDS)
+    if PREWARM_MFA:
+        prewarm_in_background(cache, base_url=MFA_BASE_URL or None)
+    return cache
+
+NO_COUNTRY_ANSWER = "I couldn’t detect a valid country for the MFA advisory."
+
+def format_mfa_answer(country: str, url: str, title_text: str, query: str) -> str:
+    answer = f"{title_text}: [{url}]({url})"
+
+    # Add the locally stored sections the question asks about
+    sections = get_advisory_cache().sections(country)
+    for name in match_sections(query):
+        if name in sections:
+            answer += f"\n\n**{SECTION_LABELS[name]}:** {sections[name][:800]}"
+    return answer
 
-MFA_COUNTRY_MAP = {
-    "Afghanistan": "https://www.mfa.gov.sg/countries-regions/a/afghanistan/travel-page",
-    "Albania": "https://www.mfa.gov.sg/countries-regions/a/albania/travel-page",
-    "Algeria": "https://www.mfa.gov.sg/countries-regions/a/algeria/travel-page",
-    "Angola": "https://www.mfa.gov.sg/countries-regions/a/angola/travel-page",
-    "Antigua and Barbuda": "https://www.mfa.gov.sg/countries-regions/a/antigua-and-barbuda/travel-page",
-    "Argentina": "https://www.mfa.gov.sg/countries-regions/a/argentina/travel-page",
-    "Armenia": "https://www.mfa.gov.sg/countries-regions/a/armenia/travel-page",
-    "Australia": "https://www.mfa.gov.sg/countries-regions/a/australia/travel-page",
-    "Austria": "https://www.mfa.gov.sg/countries-regions/a/austria/travel-page",
-    "Azerbaijan": "https://www.mfa.gov.sg/countries-regions/a/azerbaijan/travel-page",
-    "Bahamas": "https://www.mfa.gov.sg/countries-regions/b/bahamas/travel-page",
-    "Bahrain": "https://www.mfa.gov.sg/countries-regions/b/bahrain/travel-page",
-    "Bangladesh": "https://www.mfa.gov.sg/countries-regions/b/bangladesh/travel-page",
-    "Barbados": "https://www.mfa.gov.sg/countries-regions/b/barbados/travel-page",
-    "Belarus": "https://www.mfa.gov.sg/countries-regions/b/belarus/travel-page",
-    "Belgium": "https://www.mfa.gov.sg/countries-regions/b/belgium/travel-page",
-    "Belize": "https://www.mfa.gov.sg/countries-regions/b/belize/travel-page",
-    "Benin": "https://www.mfa.gov.sg/countries-regions/b/benin/travel-page",
-    "Bhutan": "https://www.mfa.gov.sg/countries-regions/b/bhutan/travel-page",
-    "Bolivia": "https://www.mfa.gov.sg/countries-regions/b/bolivia-plurinational-state-of/travel-page",
-    "Bosnia and Herzegovina": "https://www.mfa.gov.sg/countries-regions/b/bosnia-and-herzegovina/travel-page",
-    "Botswana": "https://www.mfa.gov.sg/countries-regions/b/botswana/travel-page",
-    "Brazil": "https://www.mfa.gov.sg/countries-regions/b/brazil/travel-page",
-    "Brunei": "https://www.mfa.gov.sg/countries-regions/b/brunei-darussalam/travel-page",
-    "Bulgaria": "https://www.mfa.gov.sg/countries-regions/b/bulgaria/travel-page",
-    "Burkina Faso": "https://www.mfa.gov.sg/countries-regions/b/burkina-faso/travel-page",
-    "Cabo Verde": "https://www.mfa.gov.sg/countries-regions/c/cabo-verde/travel-page",
-    "Cambodia": "https://www.mfa.gov.sg/countries-regions/c/cambodia/travel-page",
-    "Cameroon": "https://www.mfa.gov.sg/countries-regions/c/cameroon/travel-page",
-    "Canada": "https://www.mfa.gov.sg/countries-regions/c/canada/travel-page",
-    "Chad": "https://www.mfa.gov.sg/countries-regions/c/chad/travel-page",
-    "Chile": "https://www.mfa.gov.sg/countries-regions/c/chile/travel-page",
-    "China": "https://www.mfa.gov.sg/countries-regions/c/china/travel-page",
-    "Colombia": "https://www.mfa.gov.sg/countries-regions/c/colombia/travel-page",
-    "Comoros": "https://www.mfa.gov.sg/countries-regions/c/comoros/travel-page",
-    "Congo": "https://www.mfa.gov.sg/countries-regions/c/congo/travel-page",
-    "Democratic Republic of Congo": "https://www.mfa.gov.sg/countries-regions/d/democratic-republic-of-congo/travel-page",
-    "Cook Islands": "https://www.mfa.gov.sg/countries-regions/c/cook-islands/travel-page",
-    "Costa Rica": "https://www.mfa.gov.sg/countries-regions/c/costa-rica/travel-page",
-    "Cote d Ivoire": "https://www.mfa.gov.sg/countries-regions/c/cote-d-ivoire/travel-page",
-    "Croatia": "https://www.mfa.gov.sg/countries-regions/c/croatia/travel-page",
-    "Cuba": "https://www.mfa.gov.sg/countries-regions/c/cuba/travel-page",
-    "Czech Republic": "https://www.mfa.gov.sg/countries-regions/c/czech-republic/travel-page",
-    "Denmark": "https://www.mfa.gov.sg/countries-regions/d/denmark/travel-page",
-    "Djibouti": "https://www.mfa.gov.sg/countries-regions/d/djibouti/travel-page",
-    "Dominica": "https://www.mfa.gov.sg/countries-regions/d/dominica/travel-page",
-    "Dominican Republic": "https://www.mfa.gov.sg/countries-regions/d/dominican-republic/travel-page",
-    "Ecuador": "https://www.mfa.gov.sg/countries-regions/e/ecuador/travel-page",
-    "Egypt": "https://www.mfa.gov.sg/countries-regions/e/egypt/travel-page",
-    "El Salvador": "https://www.mfa.gov.sg/countries-regions/e/el-salvador/travel-page",
-    "Estonia": "https://www.mfa.gov.sg/countries-regions/e/estonia/travel-page",
-    "Eswatini": "https://www.mfa.gov.sg/countries-regions/e/eswatini/travel-page",
-    "Ethiopia": "https://www.mfa.gov.sg/countries-regions/e/ethiopia/travel-page",
-    "Federated States of Micronesia": "https://www.mfa.gov.sg/countries-regions/f/federated-states-of-micronesia/travel-page",
-    "Fiji": "https://www.mfa.gov.sg/countries-regions/f/fiji/travel-page",
-    "Finland": "https://www.mfa.gov.sg/countries-regions/f/finland/travel-page",
-    "France": "https://www.mfa.gov.sg/countries-regions/f/france/travel-page",
-    "Gabon": "https://www.mfa.gov.sg/countries-regions/g/gabon/travel-page",
-    "Gambia": "https://www.mfa.gov.sg/countries-regions/g/gambia/travel-page",
-    "Georgia": "https://www.mfa.gov.sg/countries-regions/g/georgia/travel-page",
-    "Germany": "https://www.mfa.gov.sg/countries-regions/g/germany/travel-page",
-    "Ghana": "https://www.mfa.gov.sg/countries-regions/g/ghana/travel-page",
-    "Greece": "https://www.mfa.gov.sg/countries-regions/g/greece/travel-page",
-    "Grenada": "https://www.mfa.gov.sg/countries-regions/g/grenada/travel-page",
-    "Guatemala": "https://www.mfa.gov.sg/countries-regions/g/guatemala/travel-page",
-    "Republic of Guinea": "https://www.mfa.gov.sg/countries-regions/g/republic-of-guinea/travel-page",
-    "Guinea-Bissau": "https://www.mfa.gov.sg/countries-regions/g/guinea-bissau/travel-page",
-    "Guyana": "https://www.mfa.gov.sg/countries-regions/g/guyana/travel-page",
-    "Haiti": "https://www.mfa.gov.sg/countries-regions/h/haiti/travel-page",
-    "Honduras": "https://www.mfa.gov.sg/countries-regions/h/honduras/travel-page",
-    "Hong Kong": "https://www.mfa.gov.sg/countries-regions/h/hong-kong/travel-page",
-    "Hungary": "https://www.mfa.gov.sg/countries-regions/h/hungary/travel-page",
-    "Iceland": "https://www.mfa.gov.sg/countries-regions/i/iceland/travel-page",
-    "India": "https://www.mfa.gov.sg/countries-regions/i/india/travel-page",
-    "Indonesia": "https://www.mfa.gov.sg/countries-regions/i/indonesia/travel-page",
-    "Iran": "https://www.mfa.gov.sg/countries-regions/i/iran-islamic-republic-of/travel-page",
-    "Iraq": "https://www.mfa.gov.sg/countries-regions/i/iraq/travel-page",
-    "Ireland": "https://www.mfa.gov.sg/countries-regions/i/ireland/travel-page",
-    "Israel": "https://www.mfa.gov.sg/countries-regions/i/israel/travel-page",
-    "Italy": "https://www.mfa.gov.sg/countries-regions/i/italy/travel-page",
-    "Jamaica": "https://www.mfa.gov.sg/countries-regions/j/jamaica/travel-page",
-    "Japan": "https://www.mfa.gov.sg/countries-regions/j/japan/travel-page",
-    "Jordan": "https://www.mfa.gov.sg/countries-regions/j/jordan/travel-page",
-    "Kazakhstan": "https://www.mfa.gov.sg/countries-regions/k/kazakhstan/travel-page",
-    "Kenya": "https://www.mfa.gov.sg/countries-regions/k/kenya/travel-page",
-    "Kiribati": "https://www.mfa.gov.sg/countries-regions/k/kiribati/travel-page",
-    "North Korea": "https://www.mfa.gov.sg/countries-regions/k/korea-democratic-peoples-republic-of/travel-page",
-    "South Korea": "https://www.mfa.gov.sg/countries-regions/k/korea-republic-of/travel-page",
-    "Kuwait": "https://www.mfa.gov.sg/countries-regions/k/kuwait/travel-page",
-    "Kyrgyz Republic": "https://www.mfa.gov.sg/countries-regions/k/kyrgyz-republic/travel-page",
-    "Laos": "https://www.mfa.gov.sg/countries-regions/l/lao-peoples-democratic-republic/travel-page",
-    "Latvia":"https://www.mfa.gov.sg/countries-regions/l/latvia/travel-page",
-    "Lebanon": "https://www.mfa.gov.sg/countries-regions/l/lebanon/travel-page",
-    "Lesotho": "https://www.mfa.gov.sg/countries-regions/l/lesotho/travel-page",
-    "Liberia": "https://www.mfa.gov.sg/countries-regions/l/liberia/travel-page",
-    "Libya": "https://www.mfa.gov.sg/countries-regions/l/libya/travel-page",
-    "Liechtenstein": "https://www.mfa.gov.sg/countries-regions/l/liechtenstein/travel-page",
-    "Lithuania": "https://www.mfa.gov.sg/countries-regions/l/lithuania/travel-page",
-    "Luxembourg": "https://www.mfa.gov.sg/countries-regions/l/luxembourg/travel-page",
-    "Macao": "https://www.mfa.gov.sg/countries-regions/m/macao/travel-page",
-    "Madagascar": "https://www.mfa.gov.sg/countries-regions/m/madagascar/travel-page",
-    "Malawi": "https://www.mfa.gov.sg/countries-regions/m/malawi/travel-page",
-    "Malaysia": "https://www.mfa.gov.sg/countries-regions/m/malaysia/travel-page",
-    "Maldives": "https://www.mfa.gov.sg/countries-regions/m/maldives/travel-page",
-    "Mali": "https://www.mfa.gov.sg/countries-regions/m/mali/travel-page",
-    "Marshall Islands": "https://www.mfa.gov.sg/countries-regions/m/marshall-islands/travel-page",
-    "Mauritania": "https://www.mfa.gov.sg/countries-regions/m/mauritania/travel-page",
-    "Mauritius": "https://www.mfa.gov.sg/countries-regions/m/mauritius/travel-page",
-    "Mexico": "https://www.mfa.gov.sg/countries-regions/m/mexico/travel-page",
-    "Moldova": "https://www.mfa.gov.sg/countries-regions/m/moldova/travel-page",
-    "Mongolia": "https://www.mfa.gov.sg/countries-regions/m/mongolia/travel-page",
-    "Montenegro": "https://www.mfa.gov.sg/countries-regions/m/montenegro/travel-page",
-    "Morocco": "https://www.mfa.gov.sg/countries-regions/m/morocco/travel-page",
-    "Mozambique": "https://www.mfa.gov.sg/countries-regions/m/mozambique/travel-page",
-    "Myanmar": "https://www.mfa.gov.sg/countries-regions/m/myanmar/travel-page",
-    "Namibia": "https://www.mfa.gov.sg/countries-regions/n/namibia/travel-page",
-    "Nauru": "https://www.mfa.gov.sg/countries-regions/n/nauru/travel-page",
-    "Nepal": "https://www.mfa.gov.sg/countries-regions/n/nepal/travel-page",
-    "Netherlands": "https://www.mfa.gov.sg/countries-regions/n/netherlands/travel-page",
-    "New zealand": "https://www.mfa.gov.sg/countries-regions/n/new-zealand/travel-page",
-    "Nicaragua": "https://www.mfa.gov.sg/countries-regions/n/nicaragua/travel-page",
-    "Niger": "https://www.mfa.gov.sg/countries-regions/n/niger/travel-page",
-    "Nigeria": "https://www.mfa.gov.sg/countries-regions/n/nigeria/travel-page",
-    "Niue": "https://www.mfa.gov.sg/countries-regions/n/niue/travel-page",
-    "North Macedonia": "https://www.mfa.gov.sg/countries-regions/n/north-macedonia/travel-page",
-    "Norway": "https://www.mfa.gov.sg/countries-regions/n/norway/travel-page",
-    "Oman": "https://www.mfa.gov.sg/countries-regions/o/oman/travel-page",
-    "Pakistan": "https://www.mfa.gov.sg/countries-regions/p/pakistan/travel-page",
-    "Palau": "https://www.mfa.gov.sg/countries-regions/p/palau/travel-page",
-    "Palestinian Territories": "https://www.mfa.gov.sg/countries-regions/p/palestinian-territories/travel-page",
-    "Panama": "https://www.mfa.gov.sg/countries-regions/p/panama/travel-page",
-    "Papua New Guinea": "https://www.mfa.gov.sg/countries-regions/p/papua-new-guinea/travel-page",
-    "Paraguay": "https://www.mfa.gov.sg/countries-regions/p/paraguay/travel-page",
-    "Peru": "https://www.mfa.gov.sg/countries-regions/p/peru/travel-page",
-    "Philippines": "https://www.mfa.gov.sg/countries-regions/p/philippines/travel-page",
-    "Poland": "https://www.mfa.gov.sg/countries-regions/p/poland/travel-page",
-    "Portugal": "https://www.mfa.gov.sg/countries-regions/p/portugal/travel-page",
-    "Qatar": "https://www.mfa.gov.sg/countries-regions/q/qatar/travel-page",
-    "Romania": "https://www.mfa.gov.sg/countries-regions/r/romania/travel-page",
-    "Russia": "https://www.mfa.gov.sg/countries-regions/r/russian-federation/travel-page",
-    "Rwanda": "https://www.mfa.gov.sg/countries-regions/r/rwanda/travel-page",
-    "Saint Kitts and Nevis": "https://www.mfa.gov.sg/countries-regions/s/saint-kitts-and-nevis/travel-page",
-    "Saint Lucia": "https://www.mfa.gov.sg/countries-regions/s/saint-lucia/travel-page",
-    "Saint Vincent and the Grenadines": "https://www.mfa.gov.sg/countries-regions/s/saint-vincent-and-the-grenadines/travel-page",
-    "Samoa": "https://www.mfa.gov.sg/countries-regions/s/samoa/travel-page",
-    "Saudi Arabia": "https://www.mfa.gov.sg/countries-regions/s/saudi-arabia/travel-page",
-    "Senegal": "https://www.mfa.gov.sg/countries-regions/s/senegal/travel-page",
-    "Serbia": "https://www.mfa.gov.sg/countries-regions/s/serbia/travel-page",
-    "Seychelles": "https://www.mfa.gov.sg/countries-regions/s/seychelles/travel-page",
-    "Sierra Leone": "https://www.mfa.gov.sg/countries-regions/s/sierra-leone/travel-page",
-    "Slovakia": "https://www.mfa.gov.sg/countries-regions/s/slovakia/travel-page",
-    "Slovenia": "https://www.mfa.gov.sg/countries-regions/s/slovenia/travel-page",
-    "Solomon Islands": "https://www.mfa.gov.sg/countries-regions/s/solomon-islands/travel-page",
-    "Somalia": "https://www.mfa.gov.sg/countries-regions/s/somalia/travel-page",
-    "South Africa": "https://www.mfa.gov.sg/countries-regions/s/south-africa/travel-page",
-    "Spain": "https://www.mfa.gov.sg/countries-regions/s/spain/travel-page",
-    "Sri Lanka": "https://www.mfa.gov.sg/countries-regions/s/sri-lanka/travel-page",
-    "Suriname": "https://www.mfa.gov.sg/countries-regions/s/suriname/travel-page",
-    "Sweden": "https://www.mfa.gov.sg/countries-regions/s/sweden/travel-page",
-    "Switzerland": "https://www.mfa.gov.sg/countries-regions/s/switzerland/travel-page",
-    "Syria": "https://www.mfa.gov.sg/countries-regions/s/syrian-arab-republic/travel-page",
-    "Taiwan": "https://www.mfa.gov.sg/countries-regions/t/taiwan/travel-page",
-    "Tajikistan": "https://www.mfa.gov.sg/countries-regions/t/tajikistan/travel-page",
-    "Tanzania": "https://www.mfa.gov.sg/countries-regions/t/tanzania-united-republic-of/travel-page",
-    "Thailand": "https://www.mfa.gov.sg/countries-regions/t/thailand/travel-page",
-    "Timor-Leste": "https://www.mfa.gov.sg/countries-regions/t/timor-leste/travel-page",
-    "Togo": "https://www.mfa.gov.sg/countries-regions/t/togo/travel-page",
-    "Tonga": "https://www.mfa.gov.sg/countries-regions/t/tonga/travel-page",
-    "Trinidad and Tobago": "https://www.mfa.gov.sg/countries-regions/t/trinidad-and-tobago/travel-page",
-    "Tunisia": "https://www.mfa.gov.sg/countries-regions/t/tunisia/travel-page",
-    "Turkiye": "https://www.mfa.gov.sg/countries-regions/t/turkiye/travel-page",
-    "Turkmenistan": "https://www.mfa.gov.sg/countries-regions/t/turkmenistan/travel-page",
-    "Tuvalu": "https://www.mfa.gov.sg/countries-regions/t/tuvalu/travel-page",
-    "Uganda": "https://www.mfa.gov.sg/countries-regions/u/uganda/travel-page",
-    "Ukraine": "https://www.mfa.gov.sg/countries-regions/u/ukraine/travel-page",
-    "United Arab Emirates": "https://www.mfa.gov.sg/countries-regions/u/united-arab-emirates/travel-page",
-    "United Kingdom": "https://www.mfa.gov.sg/countries-regions/u/united-kingdom/travel-page",
-    "United States": "https://www.mfa.gov.sg/countries-regions/u/united-states/travel-page",
-    "Uruguay": "https://www.mfa.gov.sg/countries-regions/u/uruguay/travel-page",
-    "Uzbekistan": "https://www.mfa.gov.sg/countries-regions/u/uzbekistan/travel-page",
-    "Vanuatu": "https://www.mfa.gov.sg/countries-regions/v/vanuatu/travel-page",
-    "Venezuela": "https://www.mfa.gov.sg/countries-regions/v/venezuela-bolivarian-republic-of/travel-page",
-    "Vietnam": "https://www.mfa.gov.sg/countries-regions/v/viet-nam/travel-page",
-    "Yemen": "https://www.mfa.gov.sg/countries-regions/y/yemen/travel-page",
-    "Zambia": "https://www.mfa.gov.sg/countries-regions/z/zambia/travel-page",
-    "Zimbabwe": "https://www.mfa.gov.sg/countries-regions/z/zimbabwe/travel-page"
-}
+def mfa_fetch_url(url: str) -> str:
+    return rebase(url, MFA_BASE_URL) if MFA_BASE_URL else url
 
+@traced("mfa_tool")
+@coalesced("mfa_tool")
 def mfa_tool_func(query: str):
     country = extract_country(query)
-    if not country or country.title() not in MFA_COUNTRY_MAP:
-        return "I couldn’t detect a valid country for the MFA advisory."
+    if not country or country not in MFA_COUNTRY_MAP:
+        return NO_COUNTRY_ANSWER
     
-    url = MFA_COUNTRY_MAP[country.title()]
-    try:
-        r = requests.get(url, timeout=5)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        title_text = soup.title.string.strip() if soup.title else f"MFA Travel Advisory for {country}"
-    except:
-        title_text = f"MFA Travel Advisory for {country}"
-
-    return f"{title_text}: [{url}]({url})"
-
-mfa_tool = Tool(
-    name="MFA Country Advisory Tool",
-    func=mfa_tool_func,
-    description=("Use this tool to answer country-specific travel questions based on official MFA "
-        "travel advisory content. The tool contains information for each country in the following categories:\n\n"
-        
-        "1. Country travel advisories and alerts\n"
-        "2. Entry and exit requirements\n"
-        "3. Safety and security information\n"
-        "4. Local laws and regulations\n"
-        "5. General travel advice and precautions\n"
-        "6. Local emergency contact numbers\n"
-        "7. Mission contact details\n\n"
-
-        #  "This tool must NOT be used for weather-related queries. "
-        # "For any question involving weather, temperatures, forecasts, seasons, or climate conditions, "
-        # "you must activate `weather_tool_func` instead.\n\n"
-        
-        "When responding to the user:\n"
-        "- Retrieve relevant information only from the provided MFA country advisory content.\n"
-        "- Summarise the information clearly and accurately.\n"
-        "- Include the specific clickable URL(s) used as references.\n"
-        "- Ensure the answer is user-friendly, factual, and concise.\n"
-    )
+    url = MFA_COUNTRY_MAP[country]
+    title_text = get_advisory_cache().title(country, mfa_fetch_url(url)) or f"MFA Travel Advisory for {country}"
+    return format_mfa_answer(country, url, title_text, query)
+
+@traced("mfa_tool")
+@coalesced("mfa_tool")
+async def amfa_tool_func(query: str):
+    country = extract_country(query)
+    if not country or country not in MFA_COUNTRY_MAP:
+        return NO_COUNTRY_ANSWER
+
+    url = MFA_COUNTRY_MAP[country]
+    title_text = await get_advisory_cache().atitle(country, mfa_fetch_url(url)) or f"MFA Travel Advisory for {country}"
+    return format_mfa_answer(country, url, title_text, query)
+
+MFA_TOOL_DESCRIPTION = ("Use this tool to answer country-specific travel questions based on official MFA "
+    "travel advisory content. The tool contains information for each country in the following categories:\n\n"
+    
+    "1. Country travel advisories and alerts\n"
+    "2. Entry and exit requirements\n"
+    "3. Safety and security information\n"
+    "4. Local laws and regulations\n"
+    "5. General travel advice and precautions\n"
+    "6. Local emergency contact numbers\n"
+    "7. Mission contact details\n\n"
+
+    #  "This tool must NOT be used for weather-related queries. "
+    # "For any question involving weather, temperatures, forecasts, seasons, or climate conditions, "
+    # "you must activate `weather_tool_func` instead.\n\n"
+    
+    "When responding to the user:\n"
+    "- Retrieve relevant information only from the provided MFA country advisory content.\n"
+    "- Summarise the information clearly and accurately.\n"
+    "- Include the specific clickable URL(s) used as references.\n"
+    "- Ensure the answer is user-friendly, factual, and concise.\n"
 )
 
 # -----------------------------
 # Weather Tool
 # -----------------------------
-def get_weather(city: str, month: int):
-    url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}"
-    loc = requests.get(url).json()
-    if "results" not in loc:
-        return f"Sorry, I couldn’t find {city}."
-    lat, lon = loc["results"][0]["latitude"], loc["results"][0]["longitude"]
-
-    weather_url = f"https://climate-api.open-meteo.com/v1/climate?latitude={lat}&longitude={lon}&month={month}"
-    wdata = requests.get(weather_url).json()
-    temp = wdata.get("data", {}).get("temperature_2m_mean")
+WEATHER_UNAVAILABLE = "Weather data unavailable."
+PLACE_NOT_FOUND = "Sorry, I couldn’t find {}."
 
+def format_weather(city: str, month: int, temp) -> str:
     if temp is not None:
         return f"The average temperature in {city.title()} in month {month} is around {temp}°C."
-    return "Weather data unavailable."
+    return WEATHER_UNAVAILABLE
+
+# Coordinates and monthly normals are cached in memory and SQLite, and seeded
+# from the climatology table in logics/climatology.json when it has been built
+@lazy_service
+def get_weather_store():
+    from logics.weather_cache import WeatherStore, build_in_background
+    store = WeatherStore()
+    if CLIMATOLOGY_AUTO_BUILD:
+        build_in_background(store)
+    return store
+
+def weather_location(city: str) -> str:
+    # A bare country name is looked up via its capital
+    from logics.weather_cache import CAPITALS, city_key
+    country = country_resolver.match(city)
+    if country and city_key(city) == city_key(country):
+        return CAPITALS[country]
+    return city
+
+def get_weather(city: str, month: int):
+    store = get_weather_store()
+    try:
+        coords = store.coordinates(weather_location(city))
+        if coords is None:
+            return PLACE_NOT_FOUND.format(city)
+        temp = store.monthly_temperature(*coords, month)
+    except (httpx.HTTPError, ValueError):
+        return WEATHER_UNAVAILABLE
+    return format_weather(city, month, temp)
+
+async def aget_weather(city: str, month: int):
+    store = get_weather_store()
+    try:
+        coords = await store.acoordinates(weather_location(city))
+        if coords is None:
+            return PLACE_NOT_FOUND.format(city)
+        temp = await store.amonthly_temperature(*coords, month)
+    except (httpx.HTTPError, ValueError):
+        return WEATHER_UNAVAILABLE
+    return format_weather(city, month, temp)
+
+# Place names with "and" in them stay whole when a question lists several places
+PLACES_WITH_AND = re.compile(r"\b(?:%s)\b" % "|".join(sorted(
+    (re.escape(name) for name in [*MFA_COUNTRY_MAP, *(a for names in ALIASES.values() for a in names)] if " and " in name.lower()),
+    key=len, reverse=True,
+)), re.IGNORECASE)
+# "... this month", "... in December", "... today": when, not where
+TRAILING_TIME = re.compile(
+    r"\s+(?:(?:this|next|last|in|during|around|over)\s+(?:the\s+)?"
+    r"(?:month|week|weekend|year|summer|winter|spring|autumn|fall|holidays?|january|february|march|april|may|june"
+    r"|july|august|september|october|november|december)|today|tomorrow|now|currently)\b.*$",
+    re.IGNORECASE,
+)
 
+def parse_cities(query: str):
+    match = re.search(r'\bin ([A-Za-z\s,]+)', query)
+    text = match.group(1) if match else query
+    protected = [m.span() for m in PLACES_WITH_AND.finditer(text)]
+    cities, start = [], 0
+    for sep in re.finditer(r',|\band\b', text):
+        if not any(a <= sep.start() < b for a, b in protected):
+            cities.append(text[start:sep.start()])
+            start = sep.end()
+    cities.append(text[start:])
+    cities = [TRAILING_TIME.sub("", c).strip() for c in cities]
+    return [c for c in cities if c] or [query.strip()]
+
+@traced("weather_tool")
+@coalesced("weather_tool")
 def weather_tool_func(query: str):
-    match = re.search(r'in ([A-Za-z\s]+)', query)
-    city = match.group(1).strip() if match else query.strip()
     month = datetime.now().month
-    return get_weather(city, month)
+    return "\n".join(get_weather(city, month) for city in parse_cities(query))
 
-weather_tool = Tool(
-    name="Weather Helper",
-    func=weather_tool_func,
-    description="Provides average monthly temperature for a given city.",
-)
+@traced("weather_tool")
+@coalesced("weather_tool")
+async def aweather_tool_func(query: str):
+    # Independent cities are geocoded and looked up concurrently
+    month = datetime.now().month
+    results = await asyncio.gather(*(aget_weather(city, month) for city in parse_cities(query)))
+    return "\n".join(results)
+
+WEATHER_TOOL_DESCRIPTION = "Provides average monthly temperature for a given city."
 
 # -----------------------------
 # Assemble Tools & Initialize Agent
 # -----------------------------
-tools = [travelpal_tool, mfa_tool, weather_tool]
-
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent_type="zero-shot-react-description",
-    verbose=False,
-    handle_parsing_errors= True
+@lazy_service
+def get_tools():
+    from langchain.agents import Tool
+
+    travelpal_tool = Tool(
+        name="TravelPal Singapore Policies",
+        func=travelpal_tool_func,
+        coroutine=atravelpal_tool_func,
+        description=TRAVELPAL_TOOL_DESCRIPTION,
+    )
+    mfa_tool = Tool(
+        name="MFA Country Advisory Tool",
+        func=mfa_tool_func,
+        coroutine=amfa_tool_func,
+        description=MFA_TOOL_DESCRIPTION,
+    )
+    weather_tool = Tool(
+        name="Weather Helper",
+        func=weather_tool_func,
+        coroutine=aweather_tool_func,
+        description=WEATHER_TOOL_DESCRIPTION,
+    )
+    return [travelpal_tool, mfa_tool, weather_tool]
+
+@lazy_service
+def get_agent():
+    from langchain.agents import initialize_agent
+
+    return initialize_agent(
+        tools=get_tools(),
+        llm=get_llm(),
+        agent_type="zero-shot-react-description",
+        verbose=False,
+        handle_parsing_errors= True
+    )
+
+def _agent_finished(started: float):
+    stats = get_router().stats
+    stats.record_agent(time.perf_counter() - started)
+    record_router_savings(stats.snapshot()["estimated_seconds_saved"])
+    record_first_answer()
+
+def run_agent(query: str) -> str:
+    started = time.perf_counter()
+    with span("agent"):
+        # Sessions asking the same question at the same time share one agent run
+        answer = coalesce("agent", query, get_agent().run, query)
+    _agent_finished(started)
+    return answer
+
+async def arun_agent(query: str) -> str:
+    """Runs the agent on the current event loop, awaiting the async tools."""
+    started = time.perf_counter()
+    with span("agent"):
+        answer = await acoalesce("agent", query, get_agent().arun, query)
+    _agent_finished(started)
+    return answer
+
+def stream_agent(query: str):
+    """Runs the agent and yields final-answer tokens as they are generated."""
+    from logics.streaming import AgentStream
+    started = time.perf_counter()
+    agent = get_agent()
+    # Only the session that starts a coalesced run sees its tokens; the
+    # others get the whole answer when it finishes
+    return AgentStream(
+        agent, query,
+        on_complete=lambda: _agent_finished(started),
+        run=lambda q, callbacks: coalesce("agent", q, agent.run, q, callbacks=callbacks),
+    )
+
+# -----------------------------
+# Fast Tool Router
+# -----------------------------
+# Clear-cut questions go straight to a tool, saving the agent's tool-choice
+# and rephrasing LLM turns. Ambiguous ones fall back to the agent.
+ROUTED_TOOLS = {
+    "travelpal": travelpal_tool_func,
+    "mfa": mfa_tool_func,
+    "weather": weather_tool_func,
+}
+
+@lazy_service
+def get_router():
+    from logics.router import ToolRouter
+
+    return ToolRouter(
+        get_embeddings(),
+        country_resolver.match,
+        weather_places,
+        min_similarity=ROUTER_MIN_SIMILARITY,
+        min_margin=ROUTER_MIN_MARGIN,
+    )
+
+def weather_places(query: str):
+    """
+    The gazetteer places a question names, as the weather tool reads them.
+    A country is dropped when one of its cities is named too.
+    """
+    found = country_resolver.places(query)
+    with_cities = {country for place, country in found if place != country}
+    return [place for place, country in found if place != country or country not in with_cities]
+
+def route_question(query: str):
+    """Answers with a single tool when the router is confident, else returns None."""
+    if not ROUTER_ENABLED:
+        return None
+    router = get_router()
+    started = time.perf_counter()
+    with span("router"):
+        route = router.route(query)
+    if route is None:
+        router.stats.record_fallback()
+        record_route("fallback")
+        return None
+    answer = ROUTED_TOOLS[route.intent](route.tool_input or query)
+    router.stats.record_routed(route.intent, time.perf_counter() - started)
+    record_route(route.intent)
+    record_router_savings(router.stats.snapshot()["estimated_seconds_saved"])
+    record_first_answer()
+    return answer
+
+def router_stats() -> dict:
+    """Routed-vs-fallback counts and rate, and the estimated agent time saved (also in /metrics and /healthz)."""
+    return get_router().stats.snapshot()
+
+def answer_without_agent(question: str):
+    """
+    Returns (answer, path) from the answer cache ("cache") or the tool
+    router ("router"), or (None, "agent") when the agent has to answer.
+    """
+    answer_cache = get_answer_cache()
+    with span("answer_cache"):
+        response = answer_cache.lookup(question)
+    if response is not None:
+        return response, "cache"
+    response = route_question(question)
+    if response is not None:
+        cache_answer(question, response)
+        return response, "router"
+    return None, "agent"
+
+def question_places(question: str) -> frozenset:
+    """Countries and cities a question names; the answer cache only reuses answers about the same ones."""
+    from logics.router import WEATHER_WORDS
+
+    places = set(country_resolver.find_places(question))
+    if WEATHER_WORDS.search(question):
+        # Cities outside the gazetteer, as the weather tool will read them
+        places.update(" ".join(city.lower().split()) for city in parse_cities(question))
+    return frozenset(places)
+
+# Near-duplicate questions are answered from here instead of re-running the agent
+@lazy_service
+def get_answer_cache():
+    from logics.answer_cache import SemanticAnswerCache
+
+    return SemanticAnswerCache(
+        get_embeddings(),
+        threshold=ANSWER_CACHE_THRESHOLD,
+        ttl_seconds=ANSWER_CACHE_TTL,
+        max_entries=ANSWER_CACHE_SIZE,
+        places=question_places,
+    )
+
+# Tool answers reporting a failure (also when the agent passes them on). They
+# are not cached, so a brief outage or a missed place is not served to every
+# similar question for the cache's whole TTL.
+FAILED_ANSWER = re.compile("|".join(
+    re.escape(message).replace(re.escape("{}"), ".+")
+    for message in [NO_COUNTRY_ANSWER, WEATHER_UNAVAILABLE, PLACE_NOT_FOUND]
+))
+
+def cache_answer(question: str, answer: str):
+    """Stores an answer in the answer cache unless it reports a tool failure."""
+    if answer and not FAILED_ANSWER.search(answer):
+        get_answer_cache().store(question, answer)
+
+# -----------------------------
+# Conversation Memory
+# -----------------------------
+# Follow-ups are rewritten into standalone questions before the answer
+# cache, router and agent see them, so none of those need the history and
+# cached answers are keyed on what was actually asked.
+SUMMARY_PROMPT = (
+    "Progressively summarize the conversation between a traveller and TravelPal, adding onto "
+    "the current summary. Keep the countries, cities, dates and topics the traveller asked about. "
+    "Return only the new summary.\n\n"
+    "Current summary:\n{summary}\n\nNew lines of conversation:\n{lines}\n\nNew summary:"
 )
 
-# llm.py
-__all__ = ["agent", "travelpal_tool_func", "mfa_tool", "weather_tool_func"]
+CONDENSE_PROMPT = (
+    "Rewrite the follow-up question as a standalone question that can be understood without "
+    "the conversation, e.g. by naming the country or city it refers to. If it is already "
+    "standalone, return it unchanged. Return only the question.\n\n"
+    "Conversation:\n{history}\n\nFollow-up question: {question}\nStandalone question:"
+)
 
+def summarize_turns(summary: str, lines: str) -> str:
+    with span("memory_summary"):
+        return get_llm().invoke(SUMMARY_PROMPT.format(summary=summary or "(none)", lines=lines)).content
 
+def new_conversation_memory(state: dict = None):
+    """Memory for one chat session, optionally restored from ConversationMemory.state()."""
+    from logics.conversation_memory import ConversationMemory
 
+    memory = ConversationMemory(
+        summarize_turns,
+        token_budget=MEMORY_TOKEN_BUDGET,
+        keep_turns=MEMORY_KEEP_TURNS,
+        summary_tokens=MEMORY_SUMMARY_TOKENS,
+    )
+    if state:
+        memory.load_state(state)
+    return memory
+
+# Words that point back at an earlier turn ("is it safe there?", "what about vapes?")
+FOLLOW_UP_REFERENCE = re.compile(
+    r"\b(there|it|its|they|them|their|that|those|these|this|same)\b|^\W*(and|also|what about|how about)\b",
+    re.IGNORECASE,
+)
+
+def needs_condensing(question: str) -> bool:
+    """True for follow-ups with a reference to resolve and no country or city of their own."""
+    return bool(FOLLOW_UP_REFERENCE.search(question)) and not country_resolver.find_places(question)
+
+def standalone_question(question: str, memory=None) -> str:
+    """
+    Resolves references to earlier turns with one LLM call. Questions that
+    stand on their own (the first one, or any naming its place and without
+    a reference) are returned as-is, so the cache and router see them at once.
+    """
+    history = memory.context() if memory is not None else ""
+    if not history or not needs_condensing(question):
+        return question
+    with span("condense"):
+        rewritten = get_llm().invoke(CONDENSE_PROMPT.format(history=history, question=question)).content
+    return rewritten.strip() or question
+
+# -----------------------------
+# Warm-up & Legacy Names
+# -----------------------------
+_warm_up_started = threading.Event()
+
+def warm_up():
+    """Builds the agent, RAG chain, answer cache and tool stores, so the first question does not."""
+    get_agent()
+    get_qa_chain()
+    get_answer_cache()
+    get_advisory_cache()
+    get_weather_store()  # Loads the climatology table, or starts building it if enabled
+
+def warm_up_in_background():
+    """Runs warm_up() in a daemon thread and starts the document watcher (once per process)."""
+    if _warm_up_started.is_set():
+        return
+    _warm_up_started.set()
+    threading.Thread(target=warm_up, name="travelpal-warm-up", daemon=True).start()
+    watch_travelpal_sources()
+
+# `from logics.llm import agent` etc. still work, building the object on first access
+_LAZY_NAMES = {
+    "agent": get_agent,
+    "llm": get_llm,
+    "embeddings": get_embeddings,
+    "travelpal_retriever": get_retriever,
+    "qa_chain": get_qa_chain,
+    "tools": get_tools,
+    "travelpal_tool": lambda: get_tools()[0],
+    "mfa_tool": lambda: get_tools()[1],
+    "weather_tool": lambda: get_tools()[2],
+    "advisory_cache": get_advisory_cache,
+    "answer_cache": get_answer_cache,
+}
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        return _LAZY_NAMES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# llm.py
+__all__ = [
+    "agent", "run_agent", "arun_agent", "stream_agent", "answer_cache", "embeddings",
+    "travelpal_tool_func", "mfa_tool", "weather_tool_func",
+    "atravelpal_tool_func", "amfa_tool_func", "aweather_tool_func",
+    "get_agent", "get_answer_cache", "warm_up", "warm_up_in_background", "startup_profile",
+    "route_question", "router_stats", "refresh_travelpal_index", "travelpal_index_version",
+    "new_conversation_memory", "standalone_question", "answer_without_agent", "cache_answer",
+]
+
+record_import(__name__, _IMPORT_STARTED)
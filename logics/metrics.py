@@ -0,0 +1,134 @@
+# -----------------------------
+# Per-stage Metrics
+# -----------------------------
+# Timing spans around each stage of answering a question (country
+# detection, embedding, retrieval, LLM turns, MFA/Open-Meteo fetches, each
+# tool and the agent run) feed Prometheus histograms and error counters.
+# start_metrics_server() exposes them on a local endpoint, once per process.
+#
+#   with span("retrieval"): ...        # a block
+#   @traced("mfa_tool")                # a sync or async function
+import time, asyncio, logging, threading
+from contextlib import contextmanager
+from functools import wraps
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from logics.config import METRICS_PORT, METRICS_ADDR
+
+logger = logging.getLogger("travelpal.metrics")
+
+# From cache hits (~1 ms) to slow agent runs (~30 s)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    "travelpal_stage_seconds", "Time spent in each stage of answering a question", ["stage"], buckets=BUCKETS
+)
+STAGE_ERRORS = Counter("travelpal_stage_errors_total", "Stages that raised an exception", ["stage"])
+LLM_TOKENS = Counter("travelpal_llm_tokens_total", "LLM tokens used", ["kind"])
+ANSWERS = Counter("travelpal_answers_total", "Chatbot answers by the path that produced them", ["path"])
+RETRIEVALS = Counter("travelpal_retrievals_total", "RAG retrievals by path (lexical-only or hybrid)", ["path"])
+COALESCED = Counter(
+    "travelpal_coalesced_total", "Calls that waited for an identical in-flight call instead of running", ["operation"]
+)
+CONTEXT_TOKENS = Counter(
+    "travelpal_context_tokens_total", "RAG context tokens retrieved and packed into the prompt", ["kind"]
+)
+EMBEDDING_CACHE = Counter(
+    "travelpal_embedding_cache_total", "Query embedding lookups by result (memory hit, disk hit or miss)", ["result"]
+)
+ROUTER_DECISIONS = Counter(
+    "travelpal_router_decisions_total", "Questions the router sent to a tool, or to the agent (fallback)", ["route"]
+)
+ROUTER_SECONDS_SAVED = Gauge(
+    "travelpal_router_estimated_seconds_saved",
+    "Routed questions times the difference between the mean agent and mean routed answer time",
+)
+
+
+@contextmanager
+def span(stage: str):
+    """Times the block into travelpal_stage_seconds and counts exceptions."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def traced(stage: str):
+    """Decorator form of span() for sync and async functions."""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_answer(path: str):
+    ANSWERS.labels(path).inc()
+
+
+def record_retrieval(path: str):
+    RETRIEVALS.labels(path).inc()
+
+
+def record_coalesced(operation: str):
+    COALESCED.labels(operation).inc()
+
+
+def record_context(retrieved: int, packed: int):
+    CONTEXT_TOKENS.labels("retrieved").inc(retrieved)
+    CONTEXT_TOKENS.labels("packed").inc(packed)
+
+
+def record_embedding_cache(result: str):
+    EMBEDDING_CACHE.labels(result).inc()
+
+
+def record_route(route: str):
+    ROUTER_DECISIONS.labels(route).inc()
+
+
+def record_router_savings(seconds):
+    ROUTER_SECONDS_SAVED.set(seconds or 0.0)
+
+
+def record_tokens(prompt: int = 0, completion: int = 0):
+    if prompt:
+        LLM_TOKENS.labels("prompt").inc(prompt)
+    if completion:
+        LLM_TOKENS.labels("completion").inc(completion)
+
+
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, addr: str = METRICS_ADDR) -> bool:
+    """Serves /metrics on `addr:port` (once per process). Returns True if it is running."""
+    global _server_started
+    if not port:
+        return False
+    with _server_lock:
+        if not _server_started:
+            try:
+                start_http_server(port, addr=addr)
+                _server_started = True
+                logger.info("serving metrics on http://%s:%d/metrics", addr, port)
+            except OSError as e:
+                # Another worker process already owns the port
+                logger.warning("metrics endpoint not started on %s:%d: %s", addr, port, e)
+        return _server_started
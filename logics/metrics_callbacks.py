@@ -0,0 +1,71 @@
+# -----------------------------
+# LangChain Metrics Callback
+# -----------------------------
+# Attached to the chat model and the retriever, so every LLM turn (agent
+# steps, RetrievalQA answers, routed tool calls) and every vector search is
+# timed and counted, whichever code path made it.
+import time, threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from logics.metrics import STAGE_SECONDS, STAGE_ERRORS, record_tokens
+from logics.tokens import count_tokens
+
+# Tokens the chat format adds around each message (role, separators)
+TOKENS_PER_MESSAGE = 4
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self._prompt_tokens = {}
+
+    def _start(self, run_id, prompt_tokens: int = 0):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+            self._prompt_tokens[run_id] = prompt_tokens
+
+    def _finish(self, run_id, stage: str, error: bool = False):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            prompt_tokens = self._prompt_tokens.pop(run_id, 0)
+        if started is not None:
+            STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+        if error:
+            STAGE_ERRORS.labels(stage).inc()
+        return prompt_tokens
+
+    # LLM turns (prompts are counted up front: streamed responses carry no usage)
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, sum(count_tokens(p) for p in prompts))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, sum(
+            count_tokens(m.content if isinstance(m.content, str) else str(m.content)) + TOKENS_PER_MESSAGE
+            for batch in messages for m in batch
+        ))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens = self._finish(run_id, "llm")
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            record_tokens(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+        else:
+            # Streamed responses carry no usage block: the prompt as counted
+            # at the start, and the generated text
+            completion = sum(count_tokens(g.text) for generations in response.generations for g in generations)
+            record_tokens(prompt_tokens, completion)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "llm", error=True)
+
+    # Vector search
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._finish(run_id, "retrieval")
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "retrieval", error=True)
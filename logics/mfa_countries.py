@@ -0,0 +1,193 @@
+# -----------------------------
+# MFA Country Travel Pages
+# -----------------------------
+# Country name -> official MFA travel page. Shared by the MFA tool, the
+# advisory crawler and the country resolver.
+MFA_COUNTRY_MAP = {
+    "Afghanistan": "https://www.mfa.gov.sg/countries-regions/a/afghanistan/travel-page",
+    "Albania": "https://www.mfa.gov.sg/countries-regions/a/albania/travel-page",
+    "Algeria": "https://www.mfa.gov.sg/countries-regions/a/algeria/travel-page",
+    "Angola": "https://www.mfa.gov.sg/countries-regions/a/angola/travel-page",
+    "Antigua and Barbuda": "https://www.mfa.gov.sg/countries-regions/a/antigua-and-barbuda/travel-page",
+    "Argentina": "https://www.mfa.gov.sg/countries-regions/a/argentina/travel-page",
+    "Armenia": "https://www.mfa.gov.sg/countries-regions/a/armenia/travel-page",
+    "Australia": "https://www.mfa.gov.sg/countries-regions/a/australia/travel-page",
+    "Austria": "https://www.mfa.gov.sg/countries-regions/a/austria/travel-page",
+    "Azerbaijan": "https://www.mfa.gov.sg/countries-regions/a/azerbaijan/travel-page",
+    "Bahamas": "https://www.mfa.gov.sg/countries-regions/b/bahamas/travel-page",
+    "Bahrain": "https://www.mfa.gov.sg/countries-regions/b/bahrain/travel-page",
+    "Bangladesh": "https://www.mfa.gov.sg/countries-regions/b/bangladesh/travel-page",
+    "Barbados": "https://www.mfa.gov.sg/countries-regions/b/barbados/travel-page",
+    "Belarus": "https://www.mfa.gov.sg/countries-regions/b/belarus/travel-page",
+    "Belgium": "https://www.mfa.gov.sg/countries-regions/b/belgium/travel-page",
+    "Belize": "https://www.mfa.gov.sg/countries-regions/b/belize/travel-page",
+    "Benin": "https://www.mfa.gov.sg/countries-regions/b/benin/travel-page",
+    "Bhutan": "https://www.mfa.gov.sg/countries-regions/b/bhutan/travel-page",
+    "Bolivia": "https://www.mfa.gov.sg/countries-regions/b/bolivia-plurinational-state-of/travel-page",
+    "Bosnia and Herzegovina": "https://www.mfa.gov.sg/countries-regions/b/bosnia-and-herzegovina/travel-page",
+    "Botswana": "https://www.mfa.gov.sg/countries-regions/b/botswana/travel-page",
+    "Brazil": "https://www.mfa.gov.sg/countries-regions/b/brazil/travel-page",
+    "Brunei": "https://www.mfa.gov.sg/countries-regions/b/brunei-darussalam/travel-page",
+    "Bulgaria": "https://www.mfa.gov.sg/countries-regions/b/bulgaria/travel-page",
+    "Burkina Faso": "https://www.mfa.gov.sg/countries-regions/b/burkina-faso/travel-page",
+    "Cabo Verde": "https://www.mfa.gov.sg/countries-regions/c/cabo-verde/travel-page",
+    "Cambodia": "https://www.mfa.gov.sg/countries-regions/c/cambodia/travel-page",
+    "Cameroon": "https://www.mfa.gov.sg/countries-regions/c/cameroon/travel-page",
+    "Canada": "https://www.mfa.gov.sg/countries-regions/c/canada/travel-page",
+    "Chad": "https://www.mfa.gov.sg/countries-regions/c/chad/travel-page",
+    "Chile": "https://www.mfa.gov.sg/countries-regions/c/chile/travel-page",
+    "China": "https://www.mfa.gov.sg/countries-regions/c/china/travel-page",
+    "Colombia": "https://www.mfa.gov.sg/countries-regions/c/colombia/travel-page",
+    "Comoros": "https://www.mfa.gov.sg/countries-regions/c/comoros/travel-page",
+    "Congo": "https://www.mfa.gov.sg/countries-regions/c/congo/travel-page",
+    "Democratic Republic of Congo": "https://www.mfa.gov.sg/countries-regions/d/democratic-republic-of-congo/travel-page",
+    "Cook Islands": "https://www.mfa.gov.sg/countries-regions/c/cook-islands/travel-page",
+    "Costa Rica": "https://www.mfa.gov.sg/countries-regions/c/costa-rica/travel-page",
+    "Cote d Ivoire": "https://www.mfa.gov.sg/countries-regions/c/cote-d-ivoire/travel-page",
+    "Croatia": "https://www.mfa.gov.sg/countries-regions/c/croatia/travel-page",
+    "Cuba": "https://www.mfa.gov.sg/countries-regions/c/cuba/travel-page",
+    "Czech Republic": "https://www.mfa.gov.sg/countries-regions/c/czech-republic/travel-page",
+    "Denmark": "https://www.mfa.gov.sg/countries-regions/d/denmark/travel-page",
+    "Djibouti": "https://www.mfa.gov.sg/countries-regions/d/djibouti/travel-page",
+    "Dominica": "https://www.mfa.gov.sg/countries-regions/d/dominica/travel-page",
+    "Dominican Republic": "https://www.mfa.gov.sg/countries-regions/d/dominican-republic/travel-page",
+    "Ecuador": "https://www.mfa.gov.sg/countries-regions/e/ecuador/travel-page",
+    "Egypt": "https://www.mfa.gov.sg/countries-regions/e/egypt/travel-page",
+    "El Salvador": "https://www.mfa.gov.sg/countries-regions/e/el-salvador/travel-page",
+    "Estonia": "https://www.mfa.gov.sg/countries-regions/e/estonia/travel-page",
+    "Eswatini": "https://www.mfa.gov.sg/countries-regions/e/eswatini/travel-page",
+    "Ethiopia": "https://www.mfa.gov.sg/countries-regions/e/ethiopia/travel-page",
+    "Federated States of Micronesia": "https://www.mfa.gov.sg/countries-regions/f/federated-states-of-micronesia/travel-page",
+    "Fiji": "https://www.mfa.gov.sg/countries-regions/f/fiji/travel-page",
+    "Finland": "https://www.mfa.gov.sg/countries-regions/f/finland/travel-page",
+    "France": "https://www.mfa.gov.sg/countries-regions/f/france/travel-page",
+    "Gabon": "https://www.mfa.gov.sg/countries-regions/g/gabon/travel-page",
+    "Gambia": "https://www.mfa.gov.sg/countries-regions/g/gambia/travel-page",
+    "Georgia": "https://www.mfa.gov.sg/countries-regions/g/georgia/travel-page",
+    "Germany": "https://www.mfa.gov.sg/countries-regions/g/germany/travel-page",
+    "Ghana": "https://www.mfa.gov.sg/countries-regions/g/ghana/travel-page",
+    "Greece": "https://www.mfa.gov.sg/countries-regions/g/greece/travel-page",
+    "Grenada": "https://www.mfa.gov.sg/countries-regions/g/grenada/travel-page",
+    "Guatemala": "https://www.mfa.gov.sg/countries-regions/g/guatemala/travel-page",
+    "Republic of Guinea": "https://www.mfa.gov.sg/countries-regions/g/republic-of-guinea/travel-page",
+    "Guinea-Bissau": "https://www.mfa.gov.sg/countries-regions/g/guinea-bissau/travel-page",
+    "Guyana": "https://www.mfa.gov.sg/countries-regions/g/guyana/travel-page",
+    "Haiti": "https://www.mfa.gov.sg/countries-regions/h/haiti/travel-page",
+    "Honduras": "https://www.mfa.gov.sg/countries-regions/h/honduras/travel-page",
+    "Hong Kong": "https://www.mfa.gov.sg/countries-regions/h/hong-kong/travel-page",
+    "Hungary": "https://www.mfa.gov.sg/countries-regions/h/hungary/travel-page",
+    "Iceland": "https://www.mfa.gov.sg/countries-regions/i/iceland/travel-page",
+    "India": "https://www.mfa.gov.sg/countries-regions/i/india/travel-page",
+    "Indonesia": "https://www.mfa.gov.sg/countries-regions/i/indonesia/travel-page",
+    "Iran": "https://www.mfa.gov.sg/countries-regions/i/iran-islamic-republic-of/travel-page",
+    "Iraq": "https://www.mfa.gov.sg/countries-regions/i/iraq/travel-page",
+    "Ireland": "https://www.mfa.gov.sg/countries-regions/i/ireland/travel-page",
+    "Israel": "https://www.mfa.gov.sg/countries-regions/i/israel/travel-page",
+    "Italy": "https://www.mfa.gov.sg/countries-regions/i/italy/travel-page",
+    "Jamaica": "https://www.mfa.gov.sg/countries-regions/j/jamaica/travel-page",
+    "Japan": "https://www.mfa.gov.sg/countries-regions/j/japan/travel-page",
+    "Jordan": "https://www.mfa.gov.sg/countries-regions/j/jordan/travel-page",
+    "Kazakhstan": "https://www.mfa.gov.sg/countries-regions/k/kazakhstan/travel-page",
+    "Kenya": "https://www.mfa.gov.sg/countries-regions/k/kenya/travel-page",
+    "Kiribati": "https://www.mfa.gov.sg/countries-regions/k/kiribati/travel-page",
+    "North Korea": "https://www.mfa.gov.sg/countries-regions/k/korea-democratic-peoples-republic-of/travel-page",
+    "South Korea": "https://www.mfa.gov.sg/countries-regions/k/korea-republic-of/travel-page",
+    "Kuwait": "https://www.mfa.gov.sg/countries-regions/k/kuwait/travel-page",
+    "Kyrgyz Republic": "https://www.mfa.gov.sg/countries-regions/k/kyrgyz-republic/travel-page",
+    "Laos": "https://www.mfa.gov.sg/countries-regions/l/lao-peoples-democratic-republic/travel-page",
+    "Latvia":"https://www.mfa.gov.sg/countries-regions/l/latvia/travel-page",
+    "Lebanon": "https://www.mfa.gov.sg/countries-regions/l/lebanon/travel-page",
+    "Lesotho": "https://www.mfa.gov.sg/countries-regions/l/lesotho/travel-page",
+    "Liberia": "https://www.mfa.gov.sg/countries-regions/l/liberia/travel-page",
+    "Libya": "https://www.mfa.gov.sg/countries-regions/l/libya/travel-page",
+    "Liechtenstein": "https://www.mfa.gov.sg/countries-regions/l/liechtenstein/travel-page",
+    "Lithuania": "https://www.mfa.gov.sg/countries-regions/l/lithuania/travel-page",
+    "Luxembourg": "https://www.mfa.gov.sg/countries-regions/l/luxembourg/travel-page",
+    "Macao": "https://www.mfa.gov.sg/countries-regions/m/macao/travel-page",
+    "Madagascar": "https://www.mfa.gov.sg/countries-regions/m/madagascar/travel-page",
+    "Malawi": "https://www.mfa.gov.sg/countries-regions/m/malawi/travel-page",
+    "Malaysia": "https://www.mfa.gov.sg/countries-regions/m/malaysia/travel-page",
+    "Maldives": "https://www.mfa.gov.sg/countries-regions/m/maldives/travel-page",
+    "Mali": "https://www.mfa.gov.sg/countries-regions/m/mali/travel-page",
+    "Marshall Islands": "https://www.mfa.gov.sg/countries-regions/m/marshall-islands/travel-page",
+    "Mauritania": "https://www.mfa.gov.sg/countries-regions/m/mauritania/travel-page",
+    "Mauritius": "https://www.mfa.gov.sg/countries-regions/m/mauritius/travel-page",
+    "Mexico": "https://www.mfa.gov.sg/countries-regions/m/mexico/travel-page",
+    "Moldova": "https://www.mfa.gov.sg/countries-regions/m/moldova/travel-page",
+    "Mongolia": "https://www.mfa.gov.sg/countries-regions/m/mongolia/travel-page",
+    "Montenegro": "https://www.mfa.gov.sg/countries-regions/m/montenegro/travel-page",
+    "Morocco": "https://www.mfa.gov.sg/countries-regions/m/morocco/travel-page",
+    "Mozambique": "https://www.mfa.gov.sg/countries-regions/m/mozambique/travel-page",
+    "Myanmar": "https://www.mfa.gov.sg/countries-regions/m/myanmar/travel-page",
+    "Namibia": "https://www.mfa.gov.sg/countries-regions/n/namibia/travel-page",
+    "Nauru": "https://www.mfa.gov.sg/countries-regions/n/nauru/travel-page",
+    "Nepal": "https://www.mfa.gov.sg/countries-regions/n/nepal/travel-page",
+    "Netherlands": "https://www.mfa.gov.sg/countries-regions/n/netherlands/travel-page",
+    "New zealand": "https://www.mfa.gov.sg/countries-regions/n/new-zealand/travel-page",
+    "Nicaragua": "https://www.mfa.gov.sg/countries-regions/n/nicaragua/travel-page",
+    "Niger": "https://www.mfa.gov.sg/countries-regions/n/niger/travel-page",
+    "Nigeria": "https://www.mfa.gov.sg/countries-regions/n/nigeria/travel-page",
+    "Niue": "https://www.mfa.gov.sg/countries-regions/n/niue/travel-page",
+    "North Macedonia": "https://www.mfa.gov.sg/countries-regions/n/north-macedonia/travel-page",
+    "Norway": "https://www.mfa.gov.sg/countries-regions/n/norway/travel-page",
+    "Oman": "https://www.mfa.gov.sg/countries-regions/o/oman/travel-page",
+    "Pakistan": "https://www.mfa.gov.sg/countries-regions/p/pakistan/travel-page",
+    "Palau": "https://www.mfa.gov.sg/countries-regions/p/palau/travel-page",
+    "Palestinian Territories": "https://www.mfa.gov.sg/countries-regions/p/palestinian-territories/travel-page",
+    "Panama": "https://www.mfa.gov.sg/countries-regions/p/panama/travel-page",
+    "Papua New Guinea": "https://www.mfa.gov.sg/countries-regions/p/papua-new-guinea/travel-page",
+    "Paraguay": "https://www.mfa.gov.sg/countries-regions/p/paraguay/travel-page",
+    "Peru": "https://www.mfa.gov.sg/countries-regions/p/peru/travel-page",
+    "Philippines": "https://www.mfa.gov.sg/countries-regions/p/philippines/travel-page",
+    "Poland": "https://www.mfa.gov.sg/countries-regions/p/poland/travel-page",
+    "Portugal": "https://www.mfa.gov.sg/countries-regions/p/portugal/travel-page",
+    "Qatar": "https://www.mfa.gov.sg/countries-regions/q/qatar/travel-page",
+    "Romania": "https://www.mfa.gov.sg/countries-regions/r/romania/travel-page",
+    "Russia": "https://www.mfa.gov.sg/countries-regions/r/russian-federation/travel-page",
+    "Rwanda": "https://www.mfa.gov.sg/countries-regions/r/rwanda/travel-page",
+    "Saint Kitts and Nevis": "https://www.mfa.gov.sg/countries-regions/s/saint-kitts-and-nevis/travel-page",
+    "Saint Lucia": "https://www.mfa.gov.sg/countries-regions/s/saint-lucia/travel-page",
+    "Saint Vincent and the Grenadines": "https://www.mfa.gov.sg/countries-regions/s/saint-vincent-and-the-grenadines/travel-page",
+    "Samoa": "https://www.mfa.gov.sg/countries-regions/s/samoa/travel-page",
+    "Saudi Arabia": "https://www.mfa.gov.sg/countries-regions/s/saudi-arabia/travel-page",
+    "Senegal": "https://www.mfa.gov.sg/countries-regions/s/senegal/travel-page",
+    "Serbia": "https://www.mfa.gov.sg/countries-regions/s/serbia/travel-page",
+    "Seychelles": "https://www.mfa.gov.sg/countries-regions/s/seychelles/travel-page",
+    "Sierra Leone": "https://www.mfa.gov.sg/countries-regions/s/sierra-leone/travel-page",
+    "Slovakia": "https://www.mfa.gov.sg/countries-regions/s/slovakia/travel-page",
+    "Slovenia": "https://www.mfa.gov.sg/countries-regions/s/slovenia/travel-page",
+    "Solomon Islands": "https://www.mfa.gov.sg/countries-regions/s/solomon-islands/travel-page",
+    "Somalia": "https://www.mfa.gov.sg/countries-regions/s/somalia/travel-page",
+    "South Africa": "https://www.mfa.gov.sg/countries-regions/s/south-africa/travel-page",
+    "Spain": "https://www.mfa.gov.sg/countries-regions/s/spain/travel-page",
+    "Sri Lanka": "https://www.mfa.gov.sg/countries-regions/s/sri-lanka/travel-page",
+    "Suriname": "https://www.mfa.gov.sg/countries-regions/s/suriname/travel-page",
+    "Sweden": "https://www.mfa.gov.sg/countries-regions/s/sweden/travel-page",
+    "Switzerland": "https://www.mfa.gov.sg/countries-regions/s/switzerland/travel-page",
+    "Syria": "https://www.mfa.gov.sg/countries-regions/s/syrian-arab-republic/travel-page",
+    "Taiwan": "https://www.mfa.gov.sg/countries-regions/t/taiwan/travel-page",
+    "Tajikistan": "https://www.mfa.gov.sg/countries-regions/t/tajikistan/travel-page",
+    "Tanzania": "https://www.mfa.gov.sg/countries-regions/t/tanzania-united-republic-of/travel-page",
+    "Thailand": "https://www.mfa.gov.sg/countries-regions/t/thailand/travel-page",
+    "Timor-Leste": "https://www.mfa.gov.sg/countries-regions/t/timor-leste/travel-page",
+    "Togo": "https://www.mfa.gov.sg/countries-regions/t/togo/travel-page",
+    "Tonga": "https://www.mfa.gov.sg/countries-regions/t/tonga/travel-page",
+    "Trinidad and Tobago": "https://www.mfa.gov.sg/countries-regions/t/trinidad-and-tobago/travel-page",
+    "Tunisia": "https://www.mfa.gov.sg/countries-regions/t/tunisia/travel-page",
+    "Turkiye": "https://www.mfa.gov.sg/countries-regions/t/turkiye/travel-page",
+    "Turkmenistan": "https://www.mfa.gov.sg/countries-regions/t/turkmenistan/travel-page",
+    "Tuvalu": "https://www.mfa.gov.sg/countries-regions/t/tuvalu/travel-page",
+    "Uganda": "https://www.mfa.gov.sg/countries-regions/u/uganda/travel-page",
+    "Ukraine": "https://www.mfa.gov.sg/countries-regions/u/ukraine/travel-page",
+    "United Arab Emirates": "https://www.mfa.gov.sg/countries-regions/u/united-arab-emirates/travel-page",
+    "United Kingdom": "https://www.mfa.gov.sg/countries-regions/u/united-kingdom/travel-page",
+    "United States": "https://www.mfa.gov.sg/countries-regions/u/united-states/travel-page",
+    "Uruguay": "https://www.mfa.gov.sg/countries-regions/u/uruguay/travel-page",
+    "Uzbekistan": "https://www.mfa.gov.sg/countries-regions/u/uzbekistan/travel-page",
+    "Vanuatu": "https://www.mfa.gov.sg/countries-regions/v/vanuatu/travel-page",
+    "Venezuela": "https://www.mfa.gov.sg/countries-regions/v/venezuela-bolivarian-republic-of/travel-page",
+    "Vietnam": "https://www.mfa.gov.sg/countries-regions/v/viet-nam/travel-page",
+    "Yemen": "https://www.mfa.gov.sg/countries-regions/y/yemen/travel-page",
+    "Zambia": "https://www.mfa.gov.sg/countries-regions/z/zambia/travel-page",
+    "Zimbabwe": "https://www.mfa.gov.sg/countries-regions/z/zimbabwe/travel-page"
+}
@@ -0,0 +1,178 @@
+# -----------------------------
+# MFA Advisory Pre-warmer
+# -----------------------------
+# Walks every page in MFA_COUNTRY_MAP with bounded parallelism and a rate
+# limit, extracts the structured sections promised by the MFA tool
+# (advisories, entry requirements, emergency numbers, mission contacts, ...)
+# and stores them in the local advisory database. The MFA tool then answers
+# from local data instead of going over the network per question.
+#
+# Usage:
+#   python -m logics.mfa_crawler [--concurrency 4] [--rate 2] [--base-url http://127.0.0.1:8000]
+#
+# --base-url swaps the scheme and host of every MFA URL, so the crawler can be
+# run against a local HTTP stand-in.
+import re, time, asyncio, logging, argparse, threading
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+from bs4 import BeautifulSoup, NavigableString
+
+from logics.config import ADVISORY_DB, ADVISORY_TTL, MFA_BASE_URL
+from logics.http_client import ahttp_get, aclose_client
+from logics.advisory_cache import AdvisoryCache, page_title
+from logics.mfa_countries import MFA_COUNTRY_MAP
+
+logger = logging.getLogger("travelpal.mfa_crawler")
+
+HEADINGS = ["h1", "h2", "h3", "h4"]
+MAX_SECTION_CHARS = 4000
+
+# Section name -> keywords, checked in order (first match wins for headings)
+SECTION_KEYWORDS = [
+    ("emergency_numbers", ["emergency", "police", "ambulance", "hotline"]),
+    ("mission_contacts", ["embassy", "high commission", "consulate", "mission", "contact"]),
+    ("entry_requirements", ["entry", "exit", "visa", "passport", "immigration"]),
+    ("advisories", ["advisory", "advisories", "alert", "notice"]),
+    ("safety", ["safety", "security", "crime", "scam"]),
+    ("local_laws", ["law", "regulation", "customs", "illegal"]),
+    ("general_advice", ["general", "precaution", "tips", "health", "advice"]),
+]
+
+SECTION_LABELS = {
+    "emergency_numbers": "Local emergency numbers",
+    "mission_contacts": "Mission contact details",
+    "entry_requirements": "Entry and exit requirements",
+    "advisories": "Travel advisories and alerts",
+    "safety": "Safety and security",
+    "local_laws": "Local laws and regulations",
+    "general_advice": "General travel advice",
+}
+
+
+def match_sections(text: str):
+    """Returns the section names whose keywords appear in `text`, in priority order."""
+    text = text.lower()
+    return [name for name, words in SECTION_KEYWORDS if any(w in text for w in words)]
+
+
+def extract_sections(html: str) -> dict:
+    """Groups page text under the nearest preceding heading's section."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "footer"]):
+        tag.decompose()
+
+    sections = {}
+    for heading in soup.find_all(HEADINGS):
+        title = heading.get_text(" ", strip=True)
+        names = match_sections(title)
+        if not names:
+            continue
+        parts = []
+        for el in heading.next_elements:
+            if getattr(el, "name", None) in HEADINGS:
+                break
+            if isinstance(el, NavigableString):
+                parts.append(str(el))
+        text = re.sub(r"\s+", " ", " ".join(parts)).strip()
+        text = text[len(title):].strip() if text.startswith(title) else text
+        if text:
+            merged = f"{sections.get(names[0], '')} {text}".strip()
+            sections[names[0]] = merged[:MAX_SECTION_CHARS]
+    return sections
+
+
+def rebase(url: str, base_url: str) -> str:
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+class RateLimiter:
+    """Spaces out request starts to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def crawl(country_map: dict, cache: AdvisoryCache, concurrency: int = 4, rate: float = 2.0, base_url: str = None) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+
+    async def fetch_one(country: str, url: str):
+        if base_url:
+            url = rebase(url, base_url)
+        async with semaphore:
+            await limiter.wait()
+            entry = cache.get(country)
+            # Pages the MFA tool fetched have a title and validators but no
+            # sections yet, so a 304 would leave them without any
+            if entry and (entry["url"] != url or not cache.sections(country)):
+                entry = None
+            try:
+                r = await ahttp_get(url, headers=cache.conditional_headers(entry))
+                if r.status_code == 304 and entry:
+                    cache.touch(country)
+                    stats["not_modified"] += 1
+                    return
+                r.raise_for_status()
+                sections = extract_sections(r.text)
+                cache.put(country, url, page_title(r.text), r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                cache.put_sections(country, sections)
+            except httpx.HTTPError as e:
+                logger.warning("fetching %s failed: %s", url, e)
+                stats["failed"] += 1
+                return
+            except Exception:
+                # One malformed page must not abort the rest of the crawl
+                logger.exception("processing %s failed", url)
+                stats["failed"] += 1
+                return
+            stats["fetched"] += 1
+
+    try:
+        await asyncio.gather(*(fetch_one(c, u) for c, u in country_map.items()))
+    finally:
+        await aclose_client()
+    return stats
+
+
+def prewarm_in_background(cache: AdvisoryCache, **kwargs) -> threading.Thread:
+    """Runs a full crawl in a daemon thread (used at app start-up)."""
+    thread = threading.Thread(
+        target=lambda: asyncio.run(crawl(MFA_COUNTRY_MAP, cache, **kwargs)),
+        name="mfa-prewarm",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl all MFA country pages into the local advisory store.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="Max requests per second")
+    parser.add_argument("--base-url", default=MFA_BASE_URL or None, help="Replace the MFA host, e.g. with a local stand-in server")
+    parser.add_argument("--db", default=ADVISORY_DB)
+    args = parser.parse_args()
+
+    cache = AdvisoryCache(args.db, ttl_seconds=ADVISORY_TTL)
+    start = time.perf_counter()
+    stats = asyncio.run(crawl(MFA_COUNTRY_MAP, cache, args.concurrency, args.rate, args.base_url))
+    elapsed = time.perf_counter() - start
+    print(f"Crawled {len(MFA_COUNTRY_MAP)} pages in {elapsed:.1f}s: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# -----------------------------
+# Query Normalization
+# -----------------------------
+# How questions are normalized for cache and coalescing keys, so that "Is
+# Japan safe?" and "is japan safe" share an entry. Kept free of third-party
+# imports: logics.llm loads it (via single_flight) on its light import path.
+import re
+
+
+def normalize_query(text: str) -> str:
+    """Lower-cases, collapses whitespace and drops trailing punctuation."""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(" ?!.")
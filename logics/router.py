@@ -0,0 +1,196 @@
+# -----------------------------
+# Fast Tool Router
+# -----------------------------
+# Picks the tool for clear-cut questions without asking the ReAct agent.
+# Keyword rules and the country gazetteer decide first; if they are not
+# conclusive a small nearest-example classifier over labelled intents is
+# consulted. Anything still ambiguous returns None and goes to the agent.
+# The weather tool answers for the current month about the places it is
+# given, so weather questions are only routed when the gazetteer finds a
+# place in them and they name no other time of year.
+import re, threading
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+# tool_input: what to pass to the tool instead of the question, if anything
+Route = namedtuple("Route", ["intent", "confidence", "reason", "tool_input"], defaults=(None,))
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+# "May" only counts after a preposition, so "may I ..." is not a month
+MONTH_NAMES = re.compile(
+    r"\b(%s)\b|\b(?:in|during|of|for|by|until|early|late|mid)[\s-]+(may)\b" % "|".join(m for m in MONTHS if m != "may"), re.I
+)
+OTHER_TIMES = re.compile(r"\b(?:(?:next|last|coming|following) month|summer|winter|spring|autumn)\b", re.I)
+
+WEATHER_WORDS = re.compile(
+    r"\b(weather|temperature|temperatures|climate|forecast|hot|cold|warm|rain|rainy|snow|humid|humidity|season)\b", re.I
+)
+TRAVELPAL_WORDS = re.compile(
+    r"\b(ica|prohibited|controlled|dutiable|duty|duty-free|customs|apec|chewing gum|vape|vapes|e-vaporisers?|"
+    r"cigarettes?|tobacco|alcohol|medication|medicine|firearms?|bring (?:back|in|into)|travel tips|"
+    r"help overseas|consular|eregister|lost (?:my )?passport|passport renewal)\b", re.I
+)
+MFA_WORDS = re.compile(
+    r"\b(advisory|advisories|alert|alerts|safe|safety|security|entry|exit|visa|visas|embassy|"
+    r"high commission|consulate|mission|emergency|local laws?|requirements?)\b", re.I
+)
+
+def names_other_month(query: str, month: int = None) -> bool:
+    """True if `query` asks about a time of year other than `month` (default: now)."""
+    month = month or datetime.now().month
+    if OTHER_TIMES.search(query):
+        return True
+    return any(MONTHS.index((m.group(1) or m.group(2)).lower()) + 1 != month for m in MONTH_NAMES.finditer(query))
+
+
+INTENT_EXAMPLES = {
+    "travelpal": [
+        "What items are prohibited when entering Singapore?",
+        "Can I bring chewing gum into Singapore?",
+        "How much duty-free alcohol can I bring back to Singapore?",
+        "Am I allowed to bring e-vaporisers into Singapore?",
+        "How do I apply for an APEC Business Travel Card?",
+        "What should I do if I lose my passport overseas?",
+        "Travel tips for Singaporeans before going abroad",
+        "How can MFA help me while I am overseas?",
+    ],
+    "mfa": [
+        "Is there a travel advisory for Thailand?",
+        "Do I need a visa to visit Japan?",
+        "What are the entry requirements for Australia?",
+        "Is it safe to travel to Egypt right now?",
+        "Where is the Singapore embassy in France?",
+        "What is the emergency number in South Korea?",
+        "What local laws should I know in the United Arab Emirates?",
+        "Contact details of the Singapore mission in India",
+    ],
+    "weather": [
+        "What is the weather like in Tokyo?",
+        "How hot is Bangkok this month?",
+        "What is the average temperature in London?",
+        "Is it cold in Seoul now?",
+        "What's the climate in Sydney in December?",
+        "Will it be rainy in Bali?",
+        "What should I pack for the weather in Paris?",
+        "Temperature in Kuala Lumpur",
+    ],
+}
+
+
+class RouterStats:
+    """Routed-vs-fallback counts and an estimate of the latency saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routed = {}
+        self.fallback = 0
+        self.routed_seconds = 0.0
+        self.agent_runs = 0
+        self.agent_seconds = 0.0
+
+    def record_routed(self, intent: str, seconds: float):
+        with self._lock:
+            self.routed[intent] = self.routed.get(intent, 0) + 1
+            self.routed_seconds += seconds
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallback += 1
+
+    def record_agent(self, seconds: float):
+        with self._lock:
+            self.agent_runs += 1
+            self.agent_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routed = sum(self.routed.values())
+            total = routed + self.fallback
+            avg_agent = self.agent_seconds / self.agent_runs if self.agent_runs else None
+            avg_routed = self.routed_seconds / routed if routed else None
+            saved = None
+            if avg_agent is not None and avg_routed is not None:
+                saved = routed * (avg_agent - avg_routed)
+            return {
+                "routed": dict(self.routed),
+                "fallback": self.fallback,
+                "routed_rate": routed / total if total else 0.0,
+                "avg_routed_seconds": avg_routed,
+                "avg_agent_seconds": avg_agent,
+                "estimated_seconds_saved": saved,
+            }
+
+
+class ToolRouter:
+    def __init__(self, embeddings, match_country, match_places, min_similarity: float = 0.85, min_margin: float = 0.03, examples=INTENT_EXAMPLES):
+        self.embeddings = embeddings
+        self.match_country = match_country
+        self.match_places = match_places
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.examples = examples
+        self.stats = RouterStats()
+        self._matrix = None
+        self._labels = None
+        self._lock = threading.Lock()
+
+    def _example_matrix(self):
+        with self._lock:
+            if self._matrix is None:
+                labels, texts = [], []
+                for intent, examples in self.examples.items():
+                    labels.extend([intent] * len(examples))
+                    texts.extend(examples)
+                matrix = np.asarray(self.embeddings.embed_documents(texts), dtype="float32")
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._matrix, self._labels = matrix, labels
+            return self._matrix, self._labels
+
+    def rule_route(self, query: str):
+        weather = bool(WEATHER_WORDS.search(query))
+        travelpal = bool(TRAVELPAL_WORDS.search(query))
+        mfa = bool(MFA_WORDS.search(query))
+        country = self.match_country(query)
+
+        if weather and not travelpal and not mfa:
+            return Route("weather", 0.9, "weather keywords")
+        if travelpal and not weather and not country:
+            return Route("travelpal", 0.9, "ICA/MFA policy keywords")
+        if country and mfa and not weather and not travelpal:
+            return Route("mfa", 0.9, f"advisory keywords + country ({country})")
+        return None
+
+    def classify(self, query: str):
+        matrix, labels = self._example_matrix()
+        vec = np.asarray(self.embeddings.embed_query(query), dtype="float32")
+        vec /= np.linalg.norm(vec)
+        sims = matrix @ vec
+
+        best = {}
+        for label, sim in zip(labels, sims):
+            best[label] = max(best.get(label, -1.0), float(sim))
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        (intent, top), (_, second) = ranked[0], ranked[1]
+        if top < self.min_similarity or top - second < self.min_margin:
+            return None
+        if intent == "mfa" and not self.match_country(query):
+            return None
+        return Route(intent, top, f"nearest example (margin {top - second:.2f})")
+
+    def weather_route(self, query: str, route: Route):
+        if names_other_month(query):
+            return None
+        places = self.match_places(query)
+        if not places:
+            return None
+        return route._replace(tool_input=", ".join(places))
+
+    def route(self, query: str):
+        """Returns a Route when confident, otherwise None (use the agent)."""
+        route = self.rule_route(query) or self.classify(query)
+        if route is not None and route.intent == "weather":
+            return self.weather_route(query, route)
+        return route
@@ -0,0 +1,109 @@
+# -----------------------------
+# Request Coalescing (single-flight)
+# -----------------------------
+# When many sessions ask the same thing at once (an advisory in the news),
+# only the first caller runs the agent, tool or upstream request; callers
+# that arrive while it is in flight wait for it and get the same result (or
+# exception). Keys are namespaced by the operation and normalized like the
+# query caches, so "Is Japan safe?" and "is japan safe" share one run.
+#
+# Sync and async callers share the same in-flight calls: the shared
+# object is a concurrent.futures.Future, which threads can block on and
+# event loops can await.
+import asyncio, threading
+from concurrent.futures import Future
+from functools import wraps
+
+from logics.config import COALESCE_ENABLED
+from logics.query_text import normalize_query
+from logics.metrics import record_coalesced
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Returns (future, True) for the caller that must run the call, (future, False) for waiters."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            record_coalesced(key[0])
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key, func, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            record_coalesced(key[0])
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# One per process, shared by every Streamlit session
+flights = SingleFlight()
+
+
+def flight_key(name: str, value) -> tuple:
+    return (name, normalize_query(value) if isinstance(value, str) else value)
+
+
+def coalesce(name: str, value, func, *args, **kwargs):
+    """Runs func(*args, **kwargs) unless an identical `name`/`value` call is in flight."""
+    if not COALESCE_ENABLED:
+        return func(*args, **kwargs)
+    return flights.do(flight_key(name, value), func, *args, **kwargs)
+
+
+async def acoalesce(name: str, value, func, *args, **kwargs):
+    if not COALESCE_ENABLED:
+        return await func(*args, **kwargs)
+    return await flights.ado(flight_key(name, value), func, *args, **kwargs)
+
+
+def coalesced(name: str):
+    """Decorator for sync and async functions of one query string."""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(query: str):
+                return await acoalesce(name, query, func, query)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(query: str):
+            return coalesce(name, query, func, query)
+        return wrapper
+    return decorate
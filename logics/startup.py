@@ -0,0 +1,67 @@
+# -----------------------------
+# Lazy Services & Start-up Profiling
+# -----------------------------
+# Heavy objects (LLM client, retriever, agent, ...) are built on first use by
+# getters decorated with @lazy_service. Each build is timed, and together
+# with the module import time and the time to the first answer this forms
+# the start-up profile, which is logged and available via startup_profile().
+import time, logging, threading
+from functools import wraps
+
+logger = logging.getLogger("travelpal.startup")
+
+PROCESS_STARTED = time.perf_counter()
+_profile = {"import_seconds": {}, "build_seconds": {}, "first_answer_seconds": None}
+_profile_lock = threading.Lock()
+
+
+def record_import(module: str, started: float):
+    """Called at the end of a module to record how long its import took."""
+    seconds = time.perf_counter() - started
+    with _profile_lock:
+        _profile["import_seconds"][module] = seconds
+    logger.info("imported %s in %.3fs", module, seconds)
+
+
+def record_first_answer():
+    """Records the time from process start to the first answer (once)."""
+    with _profile_lock:
+        if _profile["first_answer_seconds"] is not None:
+            return
+        _profile["first_answer_seconds"] = time.perf_counter() - PROCESS_STARTED
+    logger.info("first answer after %.3fs", _profile["first_answer_seconds"])
+
+
+def startup_profile() -> dict:
+    with _profile_lock:
+        return {
+            "import_seconds": dict(_profile["import_seconds"]),
+            "build_seconds": dict(_profile["build_seconds"]),
+            "first_answer_seconds": _profile["first_answer_seconds"],
+        }
+
+
+def lazy_service(builder):
+    """
+    Turns a zero-argument builder into a thread-safe getter that builds the
+    object once, on first call, and records how long the build took.
+    """
+    lock = threading.Lock()
+    instance = []
+
+    @wraps(builder)
+    def getter():
+        if instance:
+            return instance[0]
+        with lock:
+            if not instance:
+                started = time.perf_counter()
+                instance.append(builder())
+                seconds = time.perf_counter() - started
+                with _profile_lock:
+                    _profile["build_seconds"][builder.__name__] = seconds
+                logger.info("built %s in %.3fs", builder.__name__, seconds)
+        return instance[0]
+
+    getter.is_built = lambda: bool(instance)
+    return getter
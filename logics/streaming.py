@@ -0,0 +1,83 @@
+# -----------------------------
+# Streaming Agent Output
+# -----------------------------
+# The ReAct agent writes "Thought: ... Final Answer: ..." in its last LLM
+# turn. The callback handler below watches the token stream of every LLM
+# turn and forwards only what comes after "Final Answer:" so the UI can show
+# the answer while it is still being generated.
+import queue, threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+FINAL_ANSWER_PREFIX = "Final Answer:"
+_DONE = object()
+
+
+class FinalAnswerStreamHandler(BaseCallbackHandler):
+    def __init__(self, token_queue: queue.Queue):
+        self.token_queue = token_queue
+        self._buffer = ""
+        self._streaming = False
+
+    def _reset(self):
+        self._buffer = ""
+        self._streaming = False
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._reset()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._reset()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self._streaming:
+            self.token_queue.put(token)
+            return
+        self._buffer += token
+        if FINAL_ANSWER_PREFIX in self._buffer:
+            self._streaming = True
+            rest = self._buffer.split(FINAL_ANSWER_PREFIX, 1)[1].lstrip()
+            if rest:
+                self.token_queue.put(rest)
+
+
+class AgentStream:
+    """
+    Iterates over final-answer tokens while the agent runs in a worker thread.
+    After iteration, `result` holds the agent's full answer, which callers
+    should display in place of the streamed text (they can differ when the
+    agent falls back after a parsing error).
+    """
+
+    def __init__(self, agent, query: str, on_complete=None, run=None):
+        self.agent = agent
+        self.query = query
+        self.on_complete = on_complete
+        # run(query, callbacks) -> answer; defaults to agent.run
+        self.run = run or (lambda q, callbacks: agent.run(q, callbacks=callbacks))
+        self.result = None
+        self.error = None
+        self._queue = queue.Queue()
+
+    def _run(self):
+        try:
+            handler = FinalAnswerStreamHandler(self._queue)
+            self.result = self.run(self.query, [handler])
+            if self.on_complete:
+                self.on_complete()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        while True:
+            token = self._queue.get()
+            if token is _DONE:
+                break
+            yield token
+        thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,47 @@
+# -----------------------------
+# Token Counting
+# -----------------------------
+# Prompt budgets (conversation memory, retrieved context) are measured in
+# tiktoken tokens. tiktoken downloads its BPE file on first use; when that
+# is impossible (offline, sandboxed) counts fall back to ~4 characters per
+# token, which is close for English text.
+import logging, threading
+
+from logics.config import TOKEN_ENCODING
+
+logger = logging.getLogger("travelpal.tokens")
+
+CHARS_PER_TOKEN = 4
+_encoding = None
+_lock = threading.Lock()
+
+
+def get_encoding():
+    """The tiktoken encoding, or None when it cannot be loaded."""
+    global _encoding
+    if _encoding is None:
+        with _lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+                except Exception:
+                    logger.warning("tiktoken encoding %s unavailable; estimating tokens from length", TOKEN_ENCODING)
+                    _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` down to at most `max_tokens` tokens."""
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,390 @@
+# -----------------------------
+# Weather Cache & Climatology
+# -----------------------------
+# Two cache levels for the Weather Helper, each kept in memory and in SQLite:
+#   city name        -> (latitude, longitude)
+#   (lat, lon, month) -> mean temperature (°C)
+# A city's coordinates never change and monthly climate normals barely do,
+# so entries never expire. One climate API call fetches all 12 months.
+#
+# A climatology table for the capitals and major cities of every
+# MFA_COUNTRY_MAP country is kept in logics/climatology.json. When that file
+# is present it is loaded at start-up, so most weather questions need no
+# network call. It is not part of the repository; build it ahead of
+# deployment (network required) with
+#   python -m logics.weather_cache --build
+# or set TRAVELPAL_CLIMATOLOGY_AUTO_BUILD=1 to have the app build it in the
+# background on its first start. Cities whose temperatures cannot be fetched
+# are left out, and a table without any temperatures is never written.
+import os, json, time, sqlite3, asyncio, logging, argparse, threading
+from collections import defaultdict
+
+import httpx
+
+from logics.config import (
+    WEATHER_DB, CLIMATOLOGY_PATH, GEOCODING_URL, CLIMATE_URL,
+    CLIMATE_MODEL, CLIMATE_START, CLIMATE_END,
+)
+from logics.http_client import http_get, ahttp_get, aclose_client
+from logics.metrics import span
+from logics.single_flight import coalesce, acoalesce
+from logics.country_resolver import CITIES, normalize_tokens
+from logics.mfa_countries import MFA_COUNTRY_MAP
+
+logger = logging.getLogger("travelpal.weather")
+
+# A build lock older than this is left over from a process that died
+BUILD_LOCK_SECONDS = 3600
+
+CAPITALS = {
+    "Afghanistan": "Kabul", "Albania": "Tirana", "Algeria": "Algiers", "Angola": "Luanda",
+    "Antigua and Barbuda": "St. John's", "Argentina": "Buenos Aires", "Armenia": "Yerevan",
+    "Australia": "Canberra", "Austria": "Vienna", "Azerbaijan": "Baku", "Bahamas": "Nassau",
+    "Bahrain": "Manama", "Bangladesh": "Dhaka", "Barbados": "Bridgetown", "Belarus": "Minsk",
+    "Belgium": "Brussels", "Belize": "Belmopan", "Benin": "Porto-Novo", "Bhutan": "Thimphu",
+    "Bolivia": "La Paz", "Bosnia and Herzegovina": "Sarajevo", "Botswana": "Gaborone",
+    "Brazil": "Brasilia", "Brunei": "Bandar Seri Begawan", "Bulgaria": "Sofia",
+    "Burkina Faso": "Ouagadougou", "Cabo Verde": "Praia", "Cambodia": "Phnom Penh",
+    "Cameroon": "Yaounde", "Canada": "Ottawa", "Chad": "N'Djamena", "Chile": "Santiago",
+    "China": "Beijing", "Colombia": "Bogota", "Comoros": "Moroni", "Congo": "Brazzaville",
+    "Democratic Republic of Congo": "Kinshasa", "Cook Islands": "Avarua", "Costa Rica": "San Jose",
+    "Cote d Ivoire": "Yamoussoukro", "Croatia": "Zagreb", "Cuba": "Havana",
+    "Czech Republic": "Prague", "Denmark": "Copenhagen", "Djibouti": "Djibouti",
+    "Dominica": "Roseau", "Dominican Republic": "Santo Domingo", "Ecuador": "Quito",
+    "Egypt": "Cairo", "El Salvador": "San Salvador", "Estonia": "Tallinn", "Eswatini": "Mbabane",
+    "Ethiopia": "Addis Ababa", "Federated States of Micronesia": "Palikir", "Fiji": "Suva",
+    "Finland": "Helsinki", "France": "Paris", "Gabon": "Libreville", "Gambia": "Banjul",
+    "Georgia": "Tbilisi", "Germany": "Berlin", "Ghana": "Accra", "Greece": "Athens",
+    "Grenada": "St. George's", "Guatemala": "Guatemala City", "Republic of Guinea": "Conakry",
+    "Guinea-Bissau": "Bissau", "Guyana": "Georgetown", "Haiti": "Port-au-Prince",
+    "Honduras": "Tegucigalpa", "Hong Kong": "Hong Kong", "Hungary": "Budapest",
+    "Iceland": "Reykjavik", "India": "New Delhi", "Indonesia": "Jakarta", "Iran": "Tehran",
+    "Iraq": "Baghdad", "Ireland": "Dublin", "Israel": "Jerusalem", "Italy": "Rome",
+    "Jamaica": "Kingston", "Japan": "Tokyo", "Jordan": "Amman", "Kazakhstan": "Astana",
+    "Kenya": "Nairobi", "Kiribati": "Tarawa", "North Korea": "Pyongyang", "South Korea": "Seoul",
+    "Kuwait": "Kuwait City", "Kyrgyz Republic": "Bishkek", "Laos": "Vientiane", "Latvia": "Riga",
+    "Lebanon": "Beirut", "Lesotho": "Maseru", "Liberia": "Monrovia", "Libya": "Tripoli",
+    "Liechtenstein": "Vaduz", "Lithuania": "Vilnius", "Luxembourg": "Luxembourg", "Macao": "Macau",
+    "Madagascar": "Antananarivo", "Malawi": "Lilongwe", "Malaysia": "Kuala Lumpur",
+    "Maldives": "Male", "Mali": "Bamako", "Marshall Islands": "Majuro", "Mauritania": "Nouakchott",
+    "Mauritius": "Port Louis", "Mexico": "Mexico City", "Moldova": "Chisinau",
+    "Mongolia": "Ulaanbaatar", "Montenegro": "Podgorica", "Morocco": "Rabat", "Mozambique": "Maputo",
+    "Myanmar": "Naypyidaw", "Namibia": "Windhoek", "Nauru": "Yaren", "Nepal": "Kathmandu",
+    "Netherlands": "Amsterdam", "New zealand": "Wellington", "Nicaragua": "Managua",
+    "Niger": "Niamey", "Nigeria": "Abuja", "Niue": "Alofi", "North Macedonia": "Skopje",
+    "Norway": "Oslo", "Oman": "Muscat", "Pakistan": "Islamabad", "Palau": "Ngerulmud",
+    "Palestinian Territories": "Ramallah", "Panama": "Panama City",
+    "Papua New Guinea": "Port Moresby", "Paraguay": "Asuncion", "Peru": "Lima",
+    "Philippines": "Manila", "Poland": "Warsaw", "Portugal": "Lisbon", "Qatar": "Doha",
+    "Romania": "Bucharest", "Russia": "Moscow", "Rwanda": "Kigali",
+    "Saint Kitts and Nevis": "Basseterre", "Saint Lucia": "Castries",
+    "Saint Vincent and the Grenadines": "Kingstown", "Samoa": "Apia", "Saudi Arabia": "Riyadh",
+    "Senegal": "Dakar", "Serbia": "Belgrade", "Seychelles": "Victoria", "Sierra Leone": "Freetown",
+    "Slovakia": "Bratislava", "Slovenia": "Ljubljana", "Solomon Islands": "Honiara",
+    "Somalia": "Mogadishu", "South Africa": "Pretoria", "Spain": "Madrid", "Sri Lanka": "Colombo",
+    "Suriname": "Paramaribo", "Sweden": "Stockholm", "Switzerland": "Bern", "Syria": "Damascus",
+    "Taiwan": "Taipei", "Tajikistan": "Dushanbe", "Tanzania": "Dodoma", "Thailand": "Bangkok",
+    "Timor-Leste": "Dili", "Togo": "Lome", "Tonga": "Nuku'alofa", "Trinidad and Tobago": "Port of Spain",
+    "Tunisia": "Tunis", "Turkiye": "Ankara", "Turkmenistan": "Ashgabat", "Tuvalu": "Funafuti",
+    "Uganda": "Kampala", "Ukraine": "Kyiv", "United Arab Emirates": "Abu Dhabi",
+    "United Kingdom": "London", "United States": "Washington", "Uruguay": "Montevideo",
+    "Uzbekistan": "Tashkent", "Vanuatu": "Port Vila", "Venezuela": "Caracas", "Vietnam": "Hanoi",
+    "Yemen": "Sanaa", "Zambia": "Lusaka", "Zimbabwe": "Harare",
+}
+
+
+def city_key(city: str) -> str:
+    return " ".join(normalize_tokens(city))
+
+
+def coord_key(lat: float, lon: float):
+    return round(lat, 2), round(lon, 2)
+
+
+def climate_params(lat: float, lon: float) -> dict:
+    return {
+        "latitude": lat, "longitude": lon,
+        "start_date": CLIMATE_START, "end_date": CLIMATE_END,
+        "models": CLIMATE_MODEL, "daily": "temperature_2m_mean",
+    }
+
+
+def monthly_means(payload: dict) -> dict:
+    """Averages the daily series of a climate API response per calendar month."""
+    daily = payload.get("daily", {})
+    sums, counts = defaultdict(float), defaultdict(int)
+    for day, temp in zip(daily.get("time", []), daily.get("temperature_2m_mean", [])):
+        if temp is None:
+            continue
+        month = int(day[5:7])
+        sums[month] += temp
+        counts[month] += 1
+    return {m: round(sums[m] / counts[m], 1) for m in sums}
+
+
+def pick_location(payload: dict, country: str = None):
+    results = payload.get("results") or []
+    if country:
+        for r in results:
+            if r.get("country", "").lower() == country.lower():
+                return r
+    return results[0] if results else None
+
+
+class WeatherStore:
+    def __init__(self, db_path: str = WEATHER_DB, climatology_path: str = CLIMATOLOGY_PATH):
+        self.db_path = db_path
+        self._coords = {}
+        self._temps = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "city TEXT PRIMARY KEY, latitude REAL NOT NULL, longitude REAL NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS climate ("
+                "latitude REAL NOT NULL, longitude REAL NOT NULL, month INTEGER NOT NULL, "
+                "temperature REAL NOT NULL, PRIMARY KEY (latitude, longitude, month))"
+            )
+        if climatology_path and os.path.exists(climatology_path):
+            self.load_climatology(climatology_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def load_climatology(self, path: str):
+        """Seeds the in-memory caches from a prebuilt climatology table."""
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        with self._lock:
+            for key, row in table["cities"].items():
+                coords = coord_key(row["latitude"], row["longitude"])
+                self._coords[key] = coords
+                for month, temp in enumerate(row["monthly_mean_c"], start=1):
+                    if temp is not None:
+                        self._temps[(*coords, month)] = temp
+
+    # -----------------------------
+    # Level 1: city -> coordinates
+    # -----------------------------
+    def cached_coordinates(self, city: str):
+        key = city_key(city)
+        with self._lock:
+            if key in self._coords:
+                return self._coords[key]
+        with self._connect() as conn:
+            row = conn.execute("SELECT latitude, longitude FROM geocode WHERE city = ?", (key,)).fetchone()
+        if row:
+            with self._lock:
+                self._coords[key] = tuple(row)
+            return tuple(row)
+        return None
+
+    def store_coordinates(self, city: str, lat: float, lon: float):
+        key, coords = city_key(city), coord_key(lat, lon)
+        with self._lock:
+            self._coords[key] = coords
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)", (key, *coords, time.time()))
+        return coords
+
+    # Concurrent misses for the same city or coordinates share one request
+    def coordinates(self, city: str, country: str = None):
+        coords = self.cached_coordinates(city)
+        if coords:
+            return coords
+        return coalesce("geocoding", (city_key(city), country), self._geocode, city, country)
+
+    async def acoordinates(self, city: str, country: str = None):
+        coords = self.cached_coordinates(city)
+        if coords:
+            return coords
+        return await acoalesce("geocoding", (city_key(city), country), self._ageocode, city, country)
+
+    def _geocode(self, city: str, country: str = None):
+        with span("geocoding"):
+            r = http_get(GEOCODING_URL, params={"name": city, "count": 10})
+        r.raise_for_status()
+        loc = pick_location(r.json(), country)
+        return self.store_coordinates(city, loc["latitude"], loc["longitude"]) if loc else None
+
+    async def _ageocode(self, city: str, country: str = None):
+        with span("geocoding"):
+            r = await ahttp_get(GEOCODING_URL, params={"name": city, "count": 10})
+        r.raise_for_status()
+        loc = pick_location(r.json(), country)
+        return self.store_coordinates(city, loc["latitude"], loc["longitude"]) if loc else None
+
+    # -----------------------------
+    # Level 2: (lat, lon, month) -> temperature
+    # -----------------------------
+    def cached_temperature(self, lat: float, lon: float, month: int):
+        key = (*coord_key(lat, lon), month)
+        with self._lock:
+            if key in self._temps:
+                return self._temps[key]
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT temperature FROM climate WHERE latitude = ? AND longitude = ? AND month = ?", key
+            ).fetchone()
+        if row:
+            with self._lock:
+                self._temps[key] = row[0]
+            return row[0]
+        return None
+
+    def store_months(self, lat: float, lon: float, months: dict):
+        coords = coord_key(lat, lon)
+        with self._lock:
+            for month, temp in months.items():
+                self._temps[(*coords, month)] = temp
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO climate VALUES (?, ?, ?, ?)",
+                [(*coords, month, temp) for month, temp in months.items()],
+            )
+
+    def monthly_temperature(self, lat: float, lon: float, month: int):
+        temp = self.cached_temperature(lat, lon, month)
+        if temp is not None:
+            return temp
+        return coalesce("climate", coord_key(lat, lon), self._climate, lat, lon).get(month)
+
+    async def amonthly_temperature(self, lat: float, lon: float, month: int):
+        temp = self.cached_temperature(lat, lon, month)
+        if temp is not None:
+            return temp
+        return (await acoalesce("climate", coord_key(lat, lon), self._aclimate, lat, lon)).get(month)
+
+    def _climate(self, lat: float, lon: float) -> dict:
+        with span("climate"):
+            r = http_get(CLIMATE_URL, params=climate_params(lat, lon))
+        r.raise_for_status()
+        months = monthly_means(r.json())
+        self.store_months(lat, lon, months)
+        return months
+
+    async def _aclimate(self, lat: float, lon: float) -> dict:
+        with span("climate"):
+            r = await ahttp_get(CLIMATE_URL, params=climate_params(lat, lon))
+        r.raise_for_status()
+        months = monthly_means(r.json())
+        self.store_months(lat, lon, months)
+        return months
+
+# -----------------------------
+# Climatology table builder
+# -----------------------------
+def climatology_cities():
+    """Yields (city, country) for every capital and listed major city."""
+    for country, capital in CAPITALS.items():
+        yield capital, country
+    for country, cities in CITIES.items():
+        if country in MFA_COUNTRY_MAP:
+            for city in cities:
+                yield city.title(), country
+
+
+async def build_climatology(store: WeatherStore, concurrency: int = 4) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    table = {}
+
+    async def build_one(city: str, country: str):
+        async with semaphore:
+            try:
+                coords = await store.acoordinates(city, country)
+                if coords is None:
+                    return
+                temps = [await store.amonthly_temperature(*coords, month) for month in range(1, 13)]
+            except (httpx.HTTPError, ValueError):
+                return
+        if all(temp is None for temp in temps):
+            return
+        table[city_key(city)] = {
+            "name": city, "country": country,
+            "latitude": coords[0], "longitude": coords[1],
+            "monthly_mean_c": temps,
+        }
+
+    try:
+        await asyncio.gather(*(build_one(c, k) for c, k in climatology_cities()))
+    finally:
+        await aclose_client()
+    return {"model": CLIMATE_MODEL, "period": [CLIMATE_START, CLIMATE_END], "cities": table}
+
+
+def has_temperatures(table: dict) -> bool:
+    return any(temp is not None for row in table["cities"].values() for temp in row["monthly_mean_c"])
+
+
+def write_climatology(table: dict, path: str):
+    """Writes the table atomically; refuses one without any temperatures (e.g. built while rate-limited)."""
+    if not has_temperatures(table):
+        raise ValueError("the climatology table has no temperatures")
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_in_background(store: WeatherStore, path: str = CLIMATOLOGY_PATH, concurrency: int = 2):
+    """
+    Builds the climatology table in a daemon thread if `path` does not exist
+    yet, filling `store` as it goes and writing the file for later starts.
+    Only one process builds at a time; returns the thread, or None.
+    """
+    if os.path.exists(path):
+        return None
+    lock_path = f"{path}.building"
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        if time.time() - os.path.getmtime(lock_path) < BUILD_LOCK_SECONDS:
+            return None  # Another worker is building it
+    except OSError:
+        return None  # Read-only install
+
+    def build():
+        try:
+            table = asyncio.run(build_climatology(store, concurrency))
+            # Offline or rate-limited: nothing to save, so the next start tries again
+            if has_temperatures(table):
+                write_climatology(table, path)
+                logger.info("built the climatology table for %d cities", len(table["cities"]))
+        except Exception:
+            logger.exception("building the climatology table failed")
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=build, name="climatology-build", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather cache utilities.")
+    parser.add_argument("--build", action="store_true", help="Fetch the climatology table for all capitals and major cities")
+    parser.add_argument("--output", default=CLIMATOLOGY_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    if not args.build:
+        parser.print_help()
+        return
+
+    store = WeatherStore(climatology_path=None)
+    table = asyncio.run(build_climatology(store, args.concurrency))
+    if not has_temperatures(table):
+        parser.exit(1, "No temperatures could be fetched; nothing written\n")
+    write_climatology(table, args.output)
+    print(f"Wrote {len(table['cities'])} cities to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
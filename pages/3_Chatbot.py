@@ -1,6 +1,9 @@
 import streamlit as st
-from logics.llm import agent
-import re
+from logics.llm import stream_agent, answer_without_agent, cache_answer, new_conversation_memory, standalone_question
+from logics.api_client import RemoteAnswer
+from logics.metrics import span, record_answer, start_metrics_server
+from logics.config import CHAT_HISTORY_WINDOW, CHAT_MAX_MESSAGES, API_URL
+import re, textwrap
 
 
 # -----------------------------
@@ -12,6 +15,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Per-stage latency, error and token metrics on a local /metrics endpoint
+start_metrics_server()
+
 
 # -----------------------------
 # Title
@@ -71,6 +77,8 @@ a {
 # -----------------------------
 # Helper Function
 # -----------------------------
+MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
+
 def make_links_clickable(text: str) -> str:
     """
     Converts Markdown-style links [text](url) to HTML clickable links.
@@ -84,35 +92,120 @@ def make_links_clickable(text: str) -> str:
         seen.add(full_match)
         return f'<a href="{match.group(2)}" target="_blank">{match.group(1)}</a>'
 
-    pattern = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
-    return pattern.sub(dedup, text)
+    return MARKDOWN_LINK.sub(dedup, text)
 
 # -----------------------------
 # Session State for Messages
 # -----------------------------
 if "messages" not in st.session_state:
     st.session_state["messages"] = []
+# How many of the latest messages are shown; "Show earlier messages" raises it
+if "history_window" not in st.session_state:
+    st.session_state["history_window"] = CHAT_HISTORY_WINDOW
+# What the agent remembers: recent turns plus a rolling summary, token-capped.
+# With an API service the memory is kept here as plain state and sent along
+# with each question.
+if API_URL:
+    st.session_state.setdefault("memory_state", None)
+elif "memory" not in st.session_state:
+    st.session_state["memory"] = new_conversation_memory()
 
 # -----------------------------
 # Display Chat
 # -----------------------------
-for msg in st.session_state["messages"]:
-    if msg["role"] == "user":
-        st.markdown(f"""
+def render_user(content: str) -> str:
+    return f"""
         <div class="chat-row">
             <div class="user-icon">🙋‍♂️</div>
-            <div class="user-bubble">{msg['content']}</div>
+            <div class="user-bubble">{content}</div>
         </div>
-        """, unsafe_allow_html=True)
-    else:
-        # Convert Markdown links to clickable HTML
-        assistant_text = make_links_clickable(msg['content'])
-        st.markdown(f"""
+        """
+
+def render_assistant(content: str) -> str:
+    # Convert Markdown links to clickable HTML
+    assistant_text = make_links_clickable(content)
+    return f"""
         <div class="chat-row">
             <div class="bot-icon">🤖</div>
             <div class="assistant-bubble">{assistant_text}</div>
         </div>
-        """, unsafe_allow_html=True)
+        """
+
+def add_disclaimer(response: str) -> str:
+    # Append MFA/ICA disclaimer if relevant
+    disclaimer_keywords = ["prohibited", "ica", "apec"]
+    skip_keywords= ["temperature", "climate", "weather"]
+    if any(k in response.lower() for k in disclaimer_keywords) and not any(k in response.lower() for k in skip_keywords):
+        response += "\n\n_This information is based on official MFA/ICA sources (retrieved Nov 2025)._"
+    return response
+
+RENDERERS = {"user": render_user, "assistant": render_assistant}
+
+def render_message(role: str, content: str) -> str:
+    # Dedented so that messages can be joined into one Markdown block
+    return textwrap.dedent(RENDERERS[role](content)).strip()
+
+def add_message(role: str, content: str):
+    # Rendered once here, so reruns only re-emit the stored HTML
+    messages = st.session_state["messages"]
+    messages.append({"role": role, "content": content, "html": render_message(role, content)})
+    del messages[:-CHAT_MAX_MESSAGES]
+
+def show_earlier_messages():
+    st.session_state["history_window"] += CHAT_HISTORY_WINDOW
+
+# Only the latest messages are drawn, as a single HTML block, so a rerun
+# costs the same however long the conversation gets
+messages = st.session_state["messages"]
+window = st.session_state["history_window"]
+if len(messages) > window:
+    st.button(
+        f"Show earlier messages ({len(messages) - window} hidden)",
+        on_click=show_earlier_messages,
+    )
+visible = messages[-window:]
+if visible:
+    st.markdown(
+        "\n".join(m.get("html") or render_message(m["role"], m["content"]) for m in visible),
+        unsafe_allow_html=True,
+    )
+
+# -----------------------------
+# Answer Pending Question (streamed)
+# -----------------------------
+pending = st.session_state.pop("pending_question", None)
+if pending:
+    # Answered from the semantic answer cache or by the tool router when
+    # possible; the agent (streamed) only runs for the remaining questions
+    placeholder = st.empty()
+
+    def show_stream(stream):
+        streamed = ""
+        for token in stream:
+            streamed += token
+            placeholder.markdown(render_assistant(streamed + "▌"), unsafe_allow_html=True)
+        return stream.result
+
+    if API_URL:
+        # Thin client: the API service does all of the above and returns the updated memory
+        stream = RemoteAnswer(pending, st.session_state["memory_state"])
+        response = show_stream(stream)
+        st.session_state["memory_state"] = stream.memory
+    else:
+        memory = st.session_state["memory"]
+        # Follow-ups ("and the weather there?") become standalone questions first
+        question = standalone_question(pending, memory)
+        response, path = answer_without_agent(question)
+        if response is None:
+            with span("agent"):
+                response = show_stream(stream_agent(question))
+            cache_answer(question, response)
+        record_answer(path)
+        memory.add_turn(question, response)
+
+    response = add_disclaimer(response)
+    add_message("assistant", response)
+    placeholder.markdown(st.session_state["messages"][-1]["html"], unsafe_allow_html=True)
 
 # -----------------------------
 # Centered Input Bar
@@ -122,20 +215,10 @@ def submit_message():
     if not user_input:
         return
 
-    # Append user message
-    st.session_state["messages"].append({"role": "user", "content": user_input})
-
-    # Call your agent
-    response = agent.run(user_input)
-
-    # Append MFA/ICA disclaimer if relevant
-    disclaimer_keywords = ["prohibited", "ica", "apec"]
-    skip_keywords= ["temperature", "climate", "weather"]
-    if any(k in response.lower() for k in disclaimer_keywords) and not any(k in response.lower() for k in skip_keywords):
-        response += "\n\n_This information is based on official MFA/ICA sources (retrieved Nov 2025)._"
-
-    # Append assistant message
-    st.session_state["messages"].append({"role": "assistant", "content": response})
+    # Append user message; the answer is streamed on the rerun that follows
+    add_message("user", user_input)
+    st.session_state["pending_question"] = user_input
+    st.session_state["history_window"] = CHAT_HISTORY_WINDOW
 
     # Clear input
     st.session_state["input_text"] = ""
@@ -0,0 +1,41 @@
+import time
+
+from logics import llm
+from logics.answer_cache import SemanticAnswerCache
+from logics.embedding_backends import HashingEmbeddings
+
+
+def make_cache(**kwargs):
+    return SemanticAnswerCache(HashingEmbeddings(dimension=256), threshold=0.6, places=llm.question_places, **kwargs)
+
+
+def test_near_duplicates_share_an_answer():
+    cache = make_cache()
+    cache.store("Do I need a visa for Japan?", "japan answer")
+    assert cache.lookup("do I need a visa for Japan") == "japan answer"
+    assert cache.lookup("Can I bring chewing gum into Singapore?") is None
+
+
+def test_answers_are_only_reused_for_the_same_places():
+    cache = make_cache()
+    cache.store("Do I need a visa for Japan?", "japan answer")
+    cache.store("What is the weather like in Tokyo?", "tokyo answer")
+    assert cache.lookup("Do I need a visa for Korea?") is None
+    assert cache.lookup("Do I need a visa for japan?") == "japan answer"
+    assert cache.lookup("What is the weather like in Osaka?") is None
+    assert cache.lookup("what is the weather like in tokyo") == "tokyo answer"
+
+
+def test_entries_expire_and_are_bounded(monkeypatch):
+    cache = make_cache(ttl_seconds=60, max_entries=2)
+    now = time.time()
+    monkeypatch.setattr("logics.answer_cache.time.time", lambda: now)
+    for country in ["Japan", "France", "Italy"]:
+        cache.store(f"Do I need a visa for {country}?", country)
+    assert cache.stats()["size"] == 2
+    assert cache.lookup("Do I need a visa for Japan?") is None  # Evicted as the oldest
+    assert cache.lookup("Do I need a visa for Italy?") == "Italy"
+
+    monkeypatch.setattr("logics.answer_cache.time.time", lambda: now + 61)
+    assert cache.lookup("Do I need a visa for Italy?") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+
+import pytest
+
+from logics import batch
+
+
+def write_questions(path, n):
+    path.write_text("".join(json.dumps({"question": f"question {i}"}) + "\n" for i in range(1, n + 1)))
+
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_resume_skips_answered_and_retries_failed(tmp_path, monkeypatch):
+    questions, output = tmp_path / "questions.jsonl", tmp_path / "answers.jsonl"
+    write_questions(questions, 3)
+    output.write_text(
+        json.dumps({"id": 1, "answer": "one"}) + "\n"
+        + json.dumps({"id": 2, "error": "timeout"}) + "\n"
+        + '{"id": 3, "ans'  # Torn by a killed run
+    )
+    asked = []
+    monkeypatch.setattr(batch, "target_funcs", lambda: {"agent": lambda q: asked.append(q) or q.upper()})
+
+    stats = batch.run_batch(str(questions), str(output), concurrency=2, rate=0)
+
+    assert sorted(asked) == ["question 2", "question 3"]
+    assert stats["answered"] == 2 and stats["skipped"] == 1 and stats["errors"] == 0
+    lines = output.read_text().splitlines()
+    assert lines[2] == '{"id": 3, "ans'
+    assert {json.loads(line)["id"] for line in lines[3:]} == {2, 3}
+
+
+def test_ctrl_c_keeps_finished_answers_without_waiting(tmp_path, monkeypatch):
+    questions, output = tmp_path / "questions.jsonl", tmp_path / "answers.jsonl"
+    write_questions(questions, 3)
+    fast_done, release = threading.Event(), threading.Event()
+
+    def answer(question):
+        if question == "question 1":
+            fast_done.set()
+            return "fast"
+        release.wait(10)
+        return "slow"
+
+    real_read_items = batch.read_items
+
+    def read_items(path, target):
+        for item in real_read_items(path, target):
+            if item["id"] == 3:
+                fast_done.wait(5)
+                time.sleep(0.05)
+                raise KeyboardInterrupt
+            yield item
+
+    monkeypatch.setattr(batch, "target_funcs", lambda: {"agent": answer})
+    monkeypatch.setattr(batch, "read_items", read_items)
+
+    started = time.perf_counter()
+    with pytest.raises(KeyboardInterrupt):
+        batch.run_batch(str(questions), str(output), concurrency=2, rate=0)
+    assert time.perf_counter() - started < 5
+    release.set()
+
+    assert [(r["id"], r["answer"]) for r in read_output(output)] == [(1, "fast")]
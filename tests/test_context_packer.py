@@ -0,0 +1,38 @@
+from langchain_core.documents import Document
+
+from logics.context_packer import edge_overlap, join_neighbours, pack_context
+from logics.tokens import count_tokens
+
+OVERLAP = "Travellers should declare any medication they bring."
+SOURCE = {"source": "ica", "urls": ["https://www.ica.gov.sg"]}
+
+
+def test_edge_overlap_only_counts_real_overlaps():
+    assert edge_overlap(f"Chewing gum is prohibited. {OVERLAP}", f"{OVERLAP} Vapes are prohibited.") == len(OVERLAP)
+    assert edge_overlap("Short ending.", "Short ending. Another text") == 0  # Under MIN_OVERLAP_CHARS
+    assert edge_overlap(f"{OVERLAP} Then more text.", f"{OVERLAP} Vapes are prohibited.") == 0  # Not at the edge
+
+
+def test_neighbours_are_joined_only_within_a_source():
+    documents = [
+        Document(page_content=f"{OVERLAP} Vapes are prohibited.", metadata=SOURCE),
+        Document(page_content=f"Chewing gum is prohibited. {OVERLAP}", metadata=SOURCE),
+        Document(page_content=f"{OVERLAP} Japan advice.", metadata={"source": "mfa-japan"}),
+    ]
+    assert join_neighbours(documents) == [
+        [0, f"Chewing gum is prohibited. {OVERLAP} Vapes are prohibited."],
+        [2, f"{OVERLAP} Japan advice."],
+    ]
+
+
+def test_pack_context_keeps_the_best_sentences_within_budget():
+    documents = [
+        Document(page_content="Chewing gum is prohibited in Singapore. Cigarettes are dutiable. Alcohol has limits.", metadata=SOURCE),
+        Document(page_content="Passports must be valid for six months. Apply early.", metadata={"source": "mfa"}),
+    ]
+    packed, stats = pack_context(documents, "Can I bring chewing gum?", token_budget=12)
+
+    assert [doc.page_content for doc in packed] == ["Chewing gum is prohibited in Singapore."]
+    assert packed[0].metadata == SOURCE
+    assert stats["packed_tokens"] == count_tokens(packed[0].page_content) <= 12
+    assert stats["retrieved_tokens"] > stats["packed_tokens"]
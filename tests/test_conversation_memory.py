@@ -0,0 +1,60 @@
+import pytest
+
+from logics import llm
+from logics.conversation_memory import ConversationMemory
+
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply, self.prompts = reply, []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return type("Message", (), {"content": self.reply})()
+
+
+@pytest.mark.parametrize("question, condense", [
+    ("Is it safe there?", True),
+    ("And the weather?", True),
+    ("What about vapes?", True),
+    ("Is it safe in Japan?", False),
+    ("Do I need a visa for japan?", False),
+    ("What's the weather in Tokyo and is it safe there?", False),
+    ("Can I bring chewing gum into Singapore?", False),
+])
+def test_needs_condensing(question, condense):
+    assert llm.needs_condensing(question) == condense
+
+
+def test_only_follow_ups_with_references_cost_an_llm_call(monkeypatch):
+    fake = FakeLLM("Is it safe in Japan?")
+    monkeypatch.setattr(llm, "get_llm", lambda: fake)
+    memory = ConversationMemory(lambda summary, lines: summary)
+
+    assert llm.standalone_question("Is it safe there?", memory) == "Is it safe there?"  # Nothing to refer to yet
+    memory.add_turn("Do I need a visa for Japan?", "No, for stays under 90 days.", background=False)
+    assert llm.standalone_question("Is Korea safe?", memory) == "Is Korea safe?"
+    assert fake.prompts == []
+
+    assert llm.standalone_question("Is it safe there?", memory) == "Is it safe in Japan?"
+    assert len(fake.prompts) == 1 and "Do I need a visa for Japan?" in fake.prompts[0]
+
+
+def test_old_turns_fold_into_the_summary_and_state_round_trips():
+    folded = []
+
+    def summarize(summary, lines):
+        folded.append(lines)
+        return f"{summary} {lines.count('User:')} turn(s) folded".strip()
+
+    memory = ConversationMemory(summarize, token_budget=1000, keep_turns=2)
+    for i in range(3):
+        memory.add_turn(f"question {i}", f"answer {i}", background=False)
+
+    assert len(memory) == 2
+    assert folded == ["User: question 0\nAssistant: answer 0"]
+    assert memory.context().startswith("Summary of earlier conversation: 1 turn(s) folded")
+
+    restored = ConversationMemory(summarize, keep_turns=1)
+    restored.load_state(memory.state())
+    assert restored.state() == {"summary": "1 turn(s) folded", "turns": [["question 2", "answer 2"]]}
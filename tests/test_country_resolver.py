@@ -0,0 +1,46 @@
+import pytest
+
+from logics.country_resolver import CountryResolver, normalize_tokens
+from logics.mfa_countries import MFA_COUNTRY_MAP
+
+resolver = CountryResolver(MFA_COUNTRY_MAP, spacy_fallback=False)
+
+
+@pytest.mark.parametrize("question, country", [
+    ("do i need a visa for china", "China"),
+    ("is turkey safe now", "Turkiye"),
+    ("travel advisory for jordan", "Jordan"),
+    ("visa for togo", "Togo"),
+    ("what is the emergency number in south korea?", "South Korea"),
+    ("Is Türkiye safe?", "Turkiye"),
+    ("visa for the US", "United States"),
+    ("entry rules for the usa", "United States"),
+    ("Do I need a visa for the UK?", "United Kingdom"),
+    ("Embassy in Kuala Lumpur", "Malaysia"),
+    ("Trinidad and Tobago visa", "Trinidad and Tobago"),
+])
+def test_resolves_any_case(question, country):
+    assert resolver.resolve(question) == country
+
+
+@pytest.mark.parametrize("question", [
+    "Can I bring turkey ham into Singapore?",
+    "Can I bring back a china plate?",
+    "Is bone china dutiable?",
+    "Can I bring my guinea pig home?",
+    "can us Singaporeans bring chewing gum?",
+    "Where can I polish my shoes?",
+])
+def test_everyday_words_are_not_countries(question):
+    assert resolver.resolve(question) is None
+
+
+def test_places_keep_cities_apart_in_order():
+    assert resolver.places("Weather in Osaka, Tokyo and Japan") == [
+        ("osaka", "Japan"), ("tokyo", "Japan"), ("Japan", "Japan"),
+    ]
+    assert resolver.find_places("Tokyo or Osaka?") != resolver.find_places("Osaka or Kyoto?")
+
+
+def test_normalize_tokens():
+    assert normalize_tokens("Côte d'Ivoire, São Paulo!") == ["cote", "d", "ivoire", "sao", "paulo"]
@@ -0,0 +1,24 @@
+from prometheus_client import REGISTRY
+
+from logics.embedding_backends import HashingEmbeddings
+from logics.embedding_cache import CachedQueryEmbeddings
+
+
+def count(result):
+    return REGISTRY.get_sample_value("travelpal_embedding_cache_total", {"result": result}) or 0
+
+
+def test_hits_and_misses_are_counted_and_exported(tmp_path):
+    db = str(tmp_path / "embeddings.sqlite")
+    before = {result: count(result) for result in ["memory_hit", "disk_hit", "miss"]}
+
+    cache = CachedQueryEmbeddings(HashingEmbeddings(dimension=32), "hashing", db_path=db)
+    vector = cache.embed_query("Do I need a visa for Japan?")
+    assert cache.embed_query("do i need a visa for japan") == vector
+    # A second worker finds it in the shared SQLite tier
+    other = CachedQueryEmbeddings(HashingEmbeddings(dimension=32), "hashing", db_path=db)
+    assert other.embed_query("Do I need a visa for Japan?") == vector
+
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert other.stats()["disk_hits"] == 1
+    assert {result: count(result) - before[result] for result in before} == {"memory_hit": 1, "disk_hit": 1, "miss": 1}
@@ -0,0 +1,35 @@
+import pytest
+from langchain_community.docstore.document import Document
+
+from logics.embedding_backends import HashingEmbeddings
+from logics.index_store import update_index, save_index, load_index, chunk_id
+
+EMBEDDINGS = HashingEmbeddings(dimension=64)
+
+
+def make_docs(n: int, edited: int = None):
+    docs = [Document(page_content=f"Chunk {i}: visa and entry rules for country {i % 37}.", metadata={"n": i}) for i in range(n)]
+    if edited is not None:
+        docs[edited] = Document(page_content="An edited chunk about passport validity.", metadata={"n": edited})
+    return docs
+
+
+@pytest.mark.parametrize("spec", ["Flat", "HNSW16", "IVF16,Flat", "PCA32,IVF16,PQ8"])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_update_after_round_trip(tmp_path, spec, mmap):
+    first, _ = update_index(None, make_docs(300), EMBEDDINGS, index_spec=spec, train_size=256)
+    save_index(first, str(tmp_path / "v1"))
+    previous = load_index(str(tmp_path / "v1"), EMBEDDINGS, mmap=mmap)
+    assert previous is not None and previous.index.ntotal == 300
+
+    docs = make_docs(300, edited=5)
+    second, stats = update_index(previous, docs, EMBEDDINGS, index_spec=spec, train_size=256)
+
+    assert stats == {"added": 1, "removed": 1, "reused": 299}
+    assert second.index.ntotal == 300
+    assert previous.index.ntotal == 300  # The served store is left untouched
+    hit = second.similarity_search("An edited chunk about passport validity.", k=1)[0]
+    assert chunk_id(hit) == chunk_id(docs[5])
+
+    save_index(second, str(tmp_path / "v2"))
+    assert load_index(str(tmp_path / "v2"), EMBEDDINGS).index.ntotal == 300
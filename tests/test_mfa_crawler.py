@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+
+from logics import mfa_crawler
+from logics.advisory_cache import AdvisoryCache
+
+PAGE = """<html><head><title>Travel Page - {country}</title></head><body>
+<h2>Travel Advisory</h2><p>Exercise normal precautions in {country}.</p>
+<h2>Entry Requirements</h2><p>Passports must be valid for six months.</p>
+<h3>Emergency Numbers</h3><p>Police: 112.</p>
+</body></html>"""
+
+
+def fake_mfa(requests):
+    async def ahttp_get(url, headers=None):
+        requests.append((url, dict(headers or {})))
+        request = httpx.Request("GET", url)
+        country = url.rstrip("/").split("/")[-1]
+        if country == "down":
+            raise httpx.ConnectError("connection refused", request=request)
+        if headers and headers.get("If-None-Match") == f'"{country}"':
+            return httpx.Response(304, request=request)
+        html = "<html><h2>Entry" if country == "broken" else PAGE.format(country=country.title())
+        return httpx.Response(200, text=html, headers={"ETag": f'"{country}"'}, request=request)
+    return ahttp_get
+
+
+def crawl(cache, pages, monkeypatch, requests):
+    monkeypatch.setattr(mfa_crawler, "ahttp_get", fake_mfa(requests))
+    return asyncio.run(mfa_crawler.crawl(pages, cache, concurrency=2, rate=0))
+
+
+def test_extract_sections():
+    sections = mfa_crawler.extract_sections(PAGE.format(country="Japan"))
+    assert sections == {
+        "advisories": "Exercise normal precautions in Japan.",
+        "entry_requirements": "Passports must be valid for six months.",
+        "emergency_numbers": "Police: 112.",
+    }
+
+
+def test_revalidates_crawled_pages_but_fetches_title_only_entries(tmp_path, monkeypatch):
+    cache = AdvisoryCache(str(tmp_path / "advisories.sqlite"))
+    pages = {"Japan": "https://mfa.example/japan", "France": "https://mfa.example/france"}
+    # The MFA tool cached France's title and ETag, but no sections
+    cache.put("France", pages["France"], "Travel Page - France", etag='"france"')
+    requests = []
+
+    assert crawl(cache, pages, monkeypatch, requests) == {"fetched": 2, "not_modified": 0, "failed": 0}
+    assert all("If-None-Match" not in headers for _, headers in requests)
+    assert set(cache.sections("France")) == {"advisories", "entry_requirements", "emergency_numbers"}
+
+    requests.clear()
+    assert crawl(cache, pages, monkeypatch, requests) == {"fetched": 0, "not_modified": 2, "failed": 0}
+    assert cache.sections("Japan")["emergency_numbers"] == "Police: 112."
+
+
+def test_one_failing_page_does_not_stop_the_crawl(tmp_path, monkeypatch):
+    cache = AdvisoryCache(str(tmp_path / "advisories.sqlite"))
+    pages = {"Down": "https://mfa.example/down", "Japan": "https://mfa.example/japan", "Broken": "https://mfa.example/broken"}
+    real_extract = mfa_crawler.extract_sections
+
+    def extract(html):
+        if "<h2>Entry" in html and "Travel Page" not in html:
+            raise ValueError("unexpected markup")
+        return real_extract(html)
+
+    monkeypatch.setattr(mfa_crawler, "extract_sections", extract)
+    assert crawl(cache, pages, monkeypatch, []) == {"fetched": 1, "not_modified": 0, "failed": 2}
+    assert cache.sections("Japan")
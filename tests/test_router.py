@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from logics import llm
+from logics.embedding_backends import HashingEmbeddings
+from logics.router import ToolRouter, MONTHS, names_other_month
+
+NEXT_MONTH = MONTHS[datetime.now().month % 12].title()
+
+
+@pytest.fixture
+def router():
+    return ToolRouter(HashingEmbeddings(dimension=256), llm.country_resolver.match, llm.weather_places)
+
+
+@pytest.mark.parametrize("question, places", [
+    ("How hot is Bangkok this month?", "bangkok"),
+    ("Tokyo weather", "tokyo"),
+    ("What is the weather like in Tokyo and Osaka?", "tokyo, osaka"),
+    ("Weather in Tokyo, Japan", "tokyo"),
+    ("What's the weather in Japan?", "Japan"),
+])
+def test_weather_routes_with_the_places_named(router, question, places):
+    route = router.route(question)
+    assert route.intent == "weather"
+    assert route.tool_input == places
+
+
+@pytest.mark.parametrize("question", [
+    "What's the weather like?",
+    "Is it cold in Timbuktu?",
+    f"What's the climate in Sydney in {NEXT_MONTH}?",
+    "Tokyo weather next month",
+    "How cold is Seoul in winter?",
+])
+def test_weather_without_a_place_or_for_another_month_goes_to_the_agent(router, question):
+    assert router.route(question) is None
+
+
+def test_names_other_month():
+    assert names_other_month("Weather in Sydney in December?", month=10)
+    assert not names_other_month("Weather in Sydney in December?", month=12)
+    assert not names_other_month("May I know the weather in Paris?", month=10)
+    assert names_other_month("Paris in May", month=10)
+
+
+def test_route_question_passes_the_places_to_the_tool(router, monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm, "ROUTER_ENABLED", True)
+    monkeypatch.setattr(llm, "get_router", lambda: router)
+    monkeypatch.setitem(llm.ROUTED_TOOLS, "weather", lambda query: calls.append(query) or "sunny")
+    assert llm.route_question("How hot is Bangkok this month?") == "sunny"
+    assert calls == ["bangkok"]
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = []
+
+    def lookup(self, question):
+        return None
+
+    def store(self, question, answer):
+        self.stored.append(answer)
+
+
+@pytest.mark.parametrize("answer, cached", [
+    ("The average temperature in Bangkok in month 10 is around 28.1°C.", True),
+    ("Weather data unavailable.", False),
+    ("The average temperature in Tokyo in month 10 is around 19.0°C.\nSorry, I couldn’t find Tokio.", False),
+    ("I couldn’t detect a valid country for the MFA advisory.", False),
+])
+def test_only_successful_tool_answers_are_cached(monkeypatch, answer, cached):
+    cache = RecordingCache()
+    monkeypatch.setattr(llm, "get_answer_cache", lambda: cache)
+    monkeypatch.setattr(llm, "route_question", lambda question: answer)
+    assert llm.answer_without_agent("How hot is Bangkok?") == (answer, "router")
+    assert cache.stored == ([answer] if cached else [])
+
+
+def test_router_decisions_are_exported(router, monkeypatch):
+    from prometheus_client import REGISTRY
+
+    def count(route):
+        return REGISTRY.get_sample_value("travelpal_router_decisions_total", {"route": route}) or 0
+
+    monkeypatch.setattr(llm, "ROUTER_ENABLED", True)
+    monkeypatch.setattr(llm, "get_router", lambda: router)
+    monkeypatch.setitem(llm.ROUTED_TOOLS, "weather", lambda query: "sunny")
+    weather, fallback = count("weather"), count("fallback")
+
+    llm.route_question("Tokyo weather")
+    llm.route_question("What's the weather like?")
+
+    assert count("weather") == weather + 1
+    assert count("fallback") == fallback + 1
+    assert llm.router_stats()["routed_rate"] == 0.5
@@ -0,0 +1,60 @@
+import asyncio
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from logics.single_flight import SingleFlight, flight_key
+
+
+def test_identical_calls_share_one_run(monkeypatch):
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+    runs, waiting = [], threading.Semaphore(0)
+    monkeypatch.setattr("logics.single_flight.record_coalesced", lambda operation: waiting.release())
+
+    def answer(question):
+        runs.append(question)
+        started.set()
+        release.wait(5)
+        return f"answer to {question}"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flights.do, flight_key("agent", "Is Japan safe?"), answer, "Is Japan safe?")
+        started.wait(5)
+        waiters = [pool.submit(flights.do, flight_key("agent", q), answer, q) for q in ["is japan safe", "IS JAPAN SAFE ?"]]
+        for _ in waiters:
+            assert waiting.acquire(timeout=5)
+        release.set()
+        results = [f.result(5) for f in [leader, *waiters]]
+
+    assert runs == ["Is Japan safe?"]
+    assert results == ["answer to Is Japan safe?"] * 3
+    assert flights.in_flight() == 0
+
+
+def test_waiters_get_the_leaders_exception_and_async_shares_calls():
+    flights = SingleFlight()
+    runs = []
+
+    async def fetch(url):
+        runs.append(url)
+        await asyncio.sleep(0.05)
+        raise TimeoutError(url)
+
+    async def main():
+        key = flight_key("mfa_fetch", "https://example.org/japan")
+        return await asyncio.gather(*(flights.ado(key, fetch, "japan") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert runs == ["japan"]
+    assert all(isinstance(r, TimeoutError) for r in results)
+    with pytest.raises(ValueError):
+        flights.do(("x", 1), lambda: (_ for _ in ()).throw(ValueError()))
+    assert flights.in_flight() == 0
+
+
+def test_importing_single_flight_stays_light():
+    code = "import sys, logics.single_flight; print('langchain_core' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == "False"
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from logics.weather_cache import write_climatology, WeatherStore
+
+
+def table(*temps):
+    return {"cities": {"tokyo": {"name": "Tokyo", "country": "Japan", "latitude": 35.69, "longitude": 139.69,
+                                 "monthly_mean_c": list(temps)}}}
+
+
+def test_a_table_without_temperatures_is_not_written(tmp_path):
+    path = tmp_path / "climatology.json"
+    with pytest.raises(ValueError):
+        write_climatology(table(*[None] * 12), str(path))
+    with pytest.raises(ValueError):
+        write_climatology({"cities": {}}, str(path))
+    assert not path.exists()
+
+
+def test_written_table_seeds_the_store(tmp_path):
+    path = tmp_path / "climatology.json"
+    write_climatology(table(5.2, *[None] * 11), str(path))
+    assert json.loads(path.read_text())["cities"]["tokyo"]["monthly_mean_c"][0] == 5.2
+
+    store = WeatherStore(str(tmp_path / "weather.sqlite"), str(path))
+    assert store.cached_coordinates("Tokyo") == (35.69, 139.69)
+    assert store.cached_temperature(35.69, 139.69, 1) == 5.2
+    assert store.cached_temperature(35.69, 139.69, 2) is None